@@ -1,25 +1,33 @@
 from fileManager import FileManager
 from objAnalizer import ObjAnalyzer
 from customComponents import *
-from PIL import Image
+from imageCache import getImage, preloadImages
+from textureMetadata import writeTextureStats
+from videoMetadata import writeVideoStats
+from fileSizeStats import formatSize, getInputSizeStats, writeSizeStats
+from dependencyPaths import writeRewriteStats
 import customtkinter
+import threading
+import traceback
+import queue
+import time
+import sys
 import os
-import gc
 
 # since app is intended to be run in a different working dir, CURRENT_FILE_DIR is needed for accessing certain data
 CURRENT_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # app
 class App(customtkinter.CTk):
-	def __init__(self, basepath: PathLike[str] | str | None = None, printPaths: bool = False) -> None:
+	def __init__(self, basepath: PathLike[str] | str | None = None, printPaths: bool = False, printStartupTime: bool = False, startTime: float | None = None, printNavigationTime: bool = False) -> None:
+		""" printStartupTime - print the time to first window to stderr, measured from startTime (time.perf_counter() value at program start). \n
+		printNavigationTime - print the time taken by every screen change to stderr
+		"""
 		super().__init__()
 		
 		# init external file related systems
-		self.fileManager = FileManager(basepath or './', os.path.join(CURRENT_FILE_DIR, './settings/dirLayout.json'), os.path.join(CURRENT_FILE_DIR, './settings/presetSettings.json'))
-
-		objFilePath = self.fileManager.getFilePath(endsWith='.obj')
-		if objFilePath != None:
-			self.objAnalyzer = ObjAnalyzer(objFilePath, os.path.join(self.fileManager.outputDir, 'obj_stats.txt'))
+		# NOTE: scanning is deferred until the first window is displayed, see _deferredInit
+		self.fileManager = FileManager(basepath or './', os.path.join(CURRENT_FILE_DIR, './settings/dirLayout.json'), os.path.join(CURRENT_FILE_DIR, './settings/presetSettings.json'), deferScan=True)
 
 		# define theme
 		customtkinter.set_appearance_mode('system')
@@ -35,7 +43,13 @@ class App(customtkinter.CTk):
 		self.title('asset exporter')
 
 		# initalize all other vars
+		# screen name -> (frame, components), see showScreen
+		self.screens = {}
+		self.currentScreen = None
 		self.currentMainFrame = None
+		self.components = {}
+		self.printNavigationTime = printNavigationTime
+		self.navigationStart = 0.0
 		self.selectedPresets = []
 		self.prevSteps = []
 
@@ -43,6 +57,21 @@ class App(customtkinter.CTk):
 		self.maxExportJobCount = 0
 		self.exportJobCount = 0
 
+		# background validation, see startValidation
+		# NOTE: the file manager must only be accessed while holding fileManagerLock until validation is done
+		self.fileManagerLock = threading.Lock()
+		self.validationResults = queue.Queue()
+		self.validationToken = 0
+		self.validationPresets = None
+		self.validationReload = False
+		self.isValidating = False
+		self.isPollingValidation = False
+		self.validatedPresetData = {}
+		self.textureCollection = None
+		self.videoCollection = None
+		# incremented every time validation results are applied
+		self.validatedDataVersion = 0
+
 		# print debug info if specified
 		if printPaths:
 			print(f'base path: {os.path.abspath(self.fileManager.basePath)}')
@@ -51,90 +80,136 @@ class App(customtkinter.CTk):
 		# display first window content
 		self.displayPresetSelect()
 
+		# everything not needed by the first window runs once it is displayed
+		self.startTime = startTime
+		self.printStartupTime = printStartupTime
+		self.after_idle(self._deferredInit)
+
 #---
 # main window contents
 
 	def displayPresetSelect(self) -> None:
-		self.resetMainFrame()
+		if self.showScreen('presetSelect'):
+			# top label
+			self.components['titleLabel'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='select desired presets.')
+			self.components['titleLabel'].grid(column=0, row=0, padx=10, pady=10, sticky='new')
+			self.currentMainFrame.columnconfigure(0, weight=1)
+
+			# checkboxes
+			# NOTE: kept on later visits, they therefore still show the previous selection
+			self.components['checkboxes'] = CheckboxGroupComponent(self.currentMainFrame, self.fileManager.presets)
+			self.components['checkboxes'].grid(column=0, row=1, padx=10, pady=0, sticky='nsew')
+			self.currentMainFrame.rowconfigure(1, weight=1)
+
+			# bottom buttons
+			self.components['actionButtons'] = ConfirmCancelComponent(self.currentMainFrame, self.cancelButtonCB, self.presetSelConfirmCB, self.customColors['grayButton'], self.customColors['blueButton'])
+			self.components['actionButtons'].grid(column=0, row=2, padx=10, pady=(0,10), sticky='se')
+
 		self.geometry('400x500')
 
-		# top label
-		self.components['titleLabel'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='select desired presets.')
-		self.components['titleLabel'].grid(column=0, row=0, padx=10, pady=10, sticky='new')
-		self.currentMainFrame.columnconfigure(0, weight=1)
+#-
+	def displayOverview(self) -> None:
+		if self.showScreen('overview'):
+			# top label
+			self.components['titleLabel'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='overview')
+			self.components['titleLabel'].grid(column=0, row=0, padx=10, pady=10, sticky='new')
+			self.currentMainFrame.columnconfigure(0, weight=1)
+
+			# top buttons
+			self.components['titleFrame'] = customtkinter.CTkFrame(master=self.currentMainFrame, fg_color='transparent')
+			self.components['titleFrame'].grid(column=0, row=0, padx=10, pady=10, sticky='ne')
+			# open dir button
+			self.components['openDirButton'] = OpenDirBottonComponent(self.components['titleFrame'], os.path.abspath(self.fileManager.basePath), buttonTheme=self.customColors['grayButton'])
+			self.components['openDirButton'].grid(column=1, row=0, padx=10, pady=10, sticky='ne')
+			# reload button
+			self.components['reloadButton'] = customtkinter.CTkButton(master=self.components['titleFrame'], width=32, text= '', image=getImage('reload', (16,16)), command=self.reloadDisplayOverviewCB)
+			self.components['reloadButton'].configure(True, **self.customColors['grayButton'])
+			self.components['reloadButton'].grid(column=2, row=0, padx=10, pady=10, sticky='ne')
+
+			# per preset tabs are created by _updateOverviewTabs
+			self.currentMainFrame.rowconfigure(1, weight=1)
+
+			# bottom buttons
+			self.components['actionButtons'] = ConfirmCancelComponent(self.currentMainFrame, self.cancelButtonCB, self.overviewConfirmCB, self.customColors['grayButton'], self.customColors['blueButton'])
+			self.components['actionButtons'].grid(column=0, row=2, padx=10, pady=(0,10), sticky='se')
 
-		# checkboxes
-		self.components['checkboxes'] = CheckboxGroupComponent(self.currentMainFrame, self.fileManager.presets)
-		self.components['checkboxes'].grid(column=0, row=1, padx=10, pady=0, sticky='nsew')
-		self.currentMainFrame.rowconfigure(1, weight=1)
+		self.geometry('800x500')
 
-		# set the checkboxes previously selected
-		if len(self.selectedPresets) != 0:
-			self.components['checkboxes'].set(self.selectedPresets)
-			self.selectedPresets.clear()
+		# compute the data of the selected presets in the background if not already done
+		if any(preset not in self.validatedPresetData for preset in self.selectedPresets):
+			if not self.isValidating or self.validationPresets != self.selectedPresets:
+				self.startValidation()
 
-		# bottom buttons
-		self.components['actionButtons'] = ConfirmCancelComponent(self.currentMainFrame, self.cancelButtonCB, self.presetSelConfirmCB, self.customColors['grayButton'], self.customColors['blueButton'])
-		self.components['actionButtons'].grid(column=0, row=2, padx=10, pady=(0,10), sticky='se')
+		self._updateOverviewTabs()
 
 #-
-	def displayOverview(self) -> None:
-		self.resetMainFrame()
-		self.geometry('800x500')
-		
-		# top label
-		self.components['titleLabel'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='overview')
-		self.components['titleLabel'].grid(column=0, row=0, padx=10, pady=10, sticky='new')
-		self.currentMainFrame.columnconfigure(0, weight=1)
+	def _updateOverviewTabs(self) -> None:
+		""" fills in the per preset tabs of the overview. \n
+		nothing is done if neither the selection nor the validated data changed since the last call, tabs are only recreated if the selection changed.
+		"""
+
+		isValidated = not self.isValidating and all(preset in self.validatedPresetData for preset in self.selectedPresets)
+		tabsState = (tuple(self.selectedPresets), self.validatedDataVersion if isValidated else None)
+		prevTabsState = self.components.get('tabsState')
+		if prevTabsState == tabsState:
+			return
+		self.components['tabsState'] = tabsState
 
-		# top buttons
-		self.components['titleFrame'] = customtkinter.CTkFrame(master=self.currentMainFrame, fg_color='transparent')
-		self.components['titleFrame'].grid(column=0, row=0, padx=10, pady=10, sticky='ne')
-		# open dir button
-		self.components['openDirButton'] = OpenDirBottonComponent(self.components['titleFrame'], os.path.abspath(self.fileManager.basePath), buttonTheme=self.customColors['grayButton'])
-		self.components['openDirButton'].grid(column=1, row=0, padx=10, pady=10, sticky='ne')
-		# reload button
-		icon_reload = customtkinter.CTkImage(light_image=Image.open(os.path.join(CURRENT_FILE_DIR, './images/icon_reload_light.png')), dark_image=Image.open(os.path.join(CURRENT_FILE_DIR, './images/icon_reload_dark.png')), size=(16,16))
-		self.components['reloadButton'] = customtkinter.CTkButton(master=self.components['titleFrame'], width=32, text= '', image=icon_reload, command=self.reloadDisplayOverviewCB)
-		self.components['reloadButton'].configure(True, **self.customColors['grayButton'])
-		self.components['reloadButton'].grid(column=2, row=0, padx=10, pady=10, sticky='ne')
-
-		# per preset tabs
-		self.components['tabs'] = TabsComponent(self.currentMainFrame, self.selectedPresets, (len(self.selectedPresets)*32*2, 32*2))
-		self.components['tabs'].grid(column=0, row=1, padx=10, pady=0, sticky='nsew')
-		self.currentMainFrame.rowconfigure(1, weight=1)
-
-		# tab content
+		if prevTabsState == None or prevTabsState[0] != tabsState[0]:
+			if 'tabs' in self.components:
+				self.components['tabs'].destroy()
+			self.components['tabs'] = TabsComponent(self.currentMainFrame, list(self.selectedPresets), (len(self.selectedPresets)*32*2, 32*2))
+			self.components['tabs'].grid(column=0, row=1, padx=10, pady=0, sticky='nsew')
+		else:
+			for preset in self.selectedPresets:
+				self.components['tabs'].clearTab(preset)
+
+		# tab content, only built once the tab is shown
+		# a placeholder is shown instead while the preset data is computed in the background
 		for preset in self.selectedPresets:
-			data = self.fileManager.getPresetFileData(preset)
-			tab  = self.components['tabs'].getTab(preset)
+			if isValidated:
+				self.components['tabs'].setTabBuilder(preset, lambda tab, preset=preset: self._buildSummaryTab(tab, preset))
+			else:
+				placeholder = customtkinter.CTkLabel(master=self.components['tabs'].getTab(preset), text='validating...')
+				placeholder.grid(column=0, row=0, padx=0, pady=0, sticky='nsew')
 
-			summary = SummaryComponent(tab, data, 32)
-			summary.grid(column=0, row=0, padx=0, pady=0, sticky='nsew')
+#-
+	def _buildSummaryTab(self, tab: customtkinter.CTkFrame, preset: str) -> None:
+		data = self.validatedPresetData[preset]
 
-		# bottom buttons
-		self.components['actionButtons'] = ConfirmCancelComponent(self.currentMainFrame, self.cancelButtonCB, self.overviewConfirmCB, self.customColors['grayButton'], self.customColors['blueButton'])
-		self.components['actionButtons'].grid(column=0, row=2, padx=10, pady=(0,10), sticky='se')
+		summary = SummaryComponent(tab, data, 32)
+		summary.grid(column=0, row=0, padx=0, pady=0, sticky='nsew')
 
 #-
 	def displayTransferProgress(self) -> None:
-		self.resetMainFrame()
+		if self.showScreen('transferProgress'):
+			# top label
+			self.components['titleLabel'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='copying')
+			self.components['titleLabel'].grid(column=0, row=0, padx=10, pady=10, sticky='new')
+			self.currentMainFrame.columnconfigure(0, weight=1)
+
+			# progress bar
+			self.components['progressBar'] = customtkinter.CTkProgressBar(self.currentMainFrame)
+			self.components['progressBar'].grid(column=0, row=1, padx=50, pady=0, sticky='ew')
+			self.currentMainFrame.rowconfigure(1, weight=1)
+
+			# cancel button
+			self.components['cancelButton'] = customtkinter.CTkButton(master=self.currentMainFrame, text='cancel', command=self.cancelTransferCB)
+			self.components['cancelButton'].configure(True, **self.customColors['grayButton'])
+			self.components['cancelButton'].grid(column=0, row=2, padx=100, pady=10, sticky='sew')
+
 		self.geometry('400x200')
-		
-		# top label
-		self.components['titleLabel'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='copying')
-		self.components['titleLabel'].grid(column=0, row=0, padx=10, pady=10, sticky='new')
-		self.currentMainFrame.columnconfigure(0, weight=1)
+		self.components['progressBar'].set(0)
+		self.components['cancelButton'].configure(state='normal')
 
-		# progress bar
-		self.components['progressBar'] = customtkinter.CTkProgressBar(self.currentMainFrame)
-		self.components['progressBar'].grid(column=0, row=1, padx=50, pady=0, sticky='ew')
-		self.currentMainFrame.rowconfigure(1, weight=1)
-		
 		# start transfering files
+		# exports that were cancelled or interrupted (ex: crash) are resumed, skipping the files already written
+		self.fileManager.clearJobResults()
 		for preset in self.selectedPresets:
-			self.fileManager.exportFiles(preset)
+			self.fileManager.exportFiles(preset, resume=self.fileManager.hasUnfinishedExport(preset))
 		self.maxExportJobCount = self.fileManager.getActiveJobCount()
+		resumedFileCount = sum(self.fileManager.resumedFiles.get(preset, 0) for preset in self.selectedPresets)
+		self.components['titleLabel'].configure(text=f'copying {formatSize(self.fileManager.exportByteCount)}' + (f', {resumedFileCount} files already exported' if resumedFileCount != 0 else ''))
 		
 		# go straight to complete if no files to transfer
 		# TODO: change to a warning window instead
@@ -151,45 +226,60 @@ class App(customtkinter.CTk):
 #-
 	def displayPostTransferReport(self) -> None:
 		# prep data
-		failedCategories = set()
-		for job in self.fileManager.failedJobs:
-			# get the lowest level output dir name, ie: output categories
-			failedCategories.add(job.args[2].split('/')[-2])
+		# export path -> error, per file (ex: digest mismatch) rather than per output dir
+		failedFiles = self.fileManager.getFailedFiles()
+		cancelledFiles = self.fileManager.getCancelledFiles()
+		isCancelled = self.fileManager.isExportCancelled
 
-		hasNoFailures = bool(len(failedCategories) == 0)
+		hasNoFailures = bool(len(failedFiles) == 0)
 
 		# create window
-		self.resetMainFrame()
+		# content depends on the failures, always built from scratch
+		self.showScreen('postTransferReport', rebuild=True)
 
 		if hasNoFailures:
 			self.geometry('300x150')
 		else:
-			self.geometry('300x300')
+			self.geometry('500x400')
 		
 		# top label
-		self.components['titleLabel'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='transfer complete.')
+		title = 'transfer complete.'
+		if isCancelled:
+			title = f'transfer cancelled, {len(cancelledFiles)} items not copied.'
+		self.components['titleLabel'] = customtkinter.CTkLabel(master=self.currentMainFrame, text=title)
 		self.components['titleLabel'].grid(column=0, row=0, padx=10, pady=10, sticky='new')
 		self.currentMainFrame.columnconfigure(0, weight=1)
 
-		if hasNoFailures:
+		if hasNoFailures and isCancelled:
+			self.components['statusIcon'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='', image=getImage('warn', (32,32)))
+			self.components['statusIcon'].grid(column=0, row=1, padx=10, pady=0, sticky='ns')
+			self.currentMainFrame.rowconfigure(1, weight=1)
+		elif hasNoFailures:
 			# checkmark icon
-			icon_check = customtkinter.CTkImage(Image.open(os.path.join(CURRENT_FILE_DIR, './images/icon_checkmark.png')), size=(32,32))
-			self.components['statusIcon'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='', image=icon_check)
+			self.components['statusIcon'] = customtkinter.CTkLabel(master=self.currentMainFrame, text='', image=getImage('checkmark', (32,32)))
 			self.components['statusIcon'].grid(column=0, row=1, padx=10, pady=0, sticky='ns')
 			self.currentMainFrame.rowconfigure(1, weight=1)
 		else:
 			# get transfer failure report
 			# report title label
-			icon_warn = customtkinter.CTkImage(Image.open(os.path.join(CURRENT_FILE_DIR, './images/icon_warn.png')), size=(16,16))
-			self.components['reportTitle'] = TextWithImageComponent(self.currentMainFrame, 'One or more items failed to copy \nin the following categories: \n See console for details.', icon_warn, 32)
+			self.components['reportTitle'] = TextWithImageComponent(self.currentMainFrame, f'{len(failedFiles)} items failed to copy or verify. \n See console for details.', getImage('warn', (16,16)), 32)
 			self.components['reportTitle'].grid(column=0, row=1, padx=10, pady=0, sticky='s')
-			# list of failed categories
-			self.components['reportBody'] = TextListComponent(self.currentMainFrame, failedCategories)
-			self.components['reportBody'].grid(column=0, row=2, padx=20, pady=0, sticky='new')
+			# list of failed files, only the visible rows have widgets
+			crossIcon = getImage('cross', (16,16))
+			rows = [(f'{path}: {error}', crossIcon, 0) for (path, error) in sorted(failedFiles.items())]
+			self.components['reportBody'] = VirtualListComponent(self.currentMainFrame, 'failed items', rows, 32)
+			self.components['reportBody'].grid(column=0, row=2, padx=20, pady=0, sticky='nsew')
 			self.currentMainFrame.rowconfigure(2, weight=1)
 
-		self.components['actionButtons'] = customtkinter.CTkButton(master=self, text='ok', command=self.destroy)
-		self.components['actionButtons'].grid(column=0, row=3, padx=100, pady=10, sticky='sew')
+		if isCancelled or not hasNoFailures:
+			# resumed from the journal, see displayTransferProgress
+			self.components['actionButtons'] = ConfirmCancelComponent(self.currentMainFrame, self.destroy, self.displayTransferProgress, self.customColors['grayButton'], self.customColors['blueButton'])
+			self.components['actionButtons'].cancelButton.configure(text='close')
+			self.components['actionButtons'].confirmButton.configure(text='resume')
+			self.components['actionButtons'].grid(column=0, row=3, padx=10, pady=(0,10), sticky='se')
+		else:
+			self.components['actionButtons'] = customtkinter.CTkButton(master=self.currentMainFrame, text='ok', command=self.destroy)
+			self.components['actionButtons'].grid(column=0, row=3, padx=100, pady=10, sticky='sew')
 
 #---
 # button callbacks
@@ -220,11 +310,23 @@ class App(customtkinter.CTk):
 
 #-
 	def overviewConfirmCB(self) -> None:
+		# the file manager is in use until validation is done
+		if self.isValidating:
+			InfoModalWindow(self, 'still validating')
+			return
+
 		# display next window content
 		self.prevSteps.append(self.displayOverview)
 		self.displayTransferProgress()
 		# TODO: add condition if no files to transfer
 
+#-
+	def cancelTransferCB(self) -> None:
+		""" stops the export, the progress loop then goes to the report once the running jobs stopped. """
+		self.fileManager.cancelExport()
+		self.components['cancelButton'].configure(state='disabled')
+		self.components['titleLabel'].configure(text='cancelling')
+
 #---
 # non button callbacks
 
@@ -234,6 +336,17 @@ class App(customtkinter.CTk):
 			self.components['progressBar'].set(1)
 			self.objAnalyzer.awaitCompletion()
 
+		# texture, video and file size sections, appended after the obj stats
+		os.makedirs(self.fileManager.outputDir, exist_ok=True)
+		with open(os.path.join(self.fileManager.outputDir, 'obj_stats.txt'), 'a' if hasattr(self, 'objAnalyzer') else 'w') as statsFile:
+			if self.textureCollection != None:
+				writeTextureStats(self.textureCollection, statsFile, self.fileManager.getRequiredSuffixes('texs', self.selectedPresets))
+			if self.videoCollection != None:
+				writeVideoStats(self.videoCollection, statsFile)
+			presetSizes = {preset: self.fileManager.exportSizes[preset] for preset in self.selectedPresets if preset in self.fileManager.exportSizes}
+			writeSizeStats(getInputSizeStats(self.fileManager.files), presetSizes, statsFile)
+			writeRewriteStats({path: report for preset in self.selectedPresets for (path, report) in self.fileManager.rewriteReports.get(preset, {}).items()}, statsFile)
+
 		self.prevSteps.append(self.displayTransferProgress)
 		self.displayPostTransferReport()
 
@@ -243,28 +356,150 @@ class App(customtkinter.CTk):
 		then updates ui.
 		"""
 
-		self.fileManager.reloadInputFiles()
+		self.startValidation(reload=True)
 		self.displayOverview()
 
 #---
 # other non display functions
 
-	def resetMainFrame(self) -> None:
-		""" resets the main window content. """
+	def _deferredInit(self) -> None:
+		""" heavyweight work not needed for the first window. """
 
-		if(self.currentMainFrame != None):
-			self.currentMainFrame.destroy()
-		# de-ref sub components and clear them from mem
-		self.components = {}
-		gc.collect()
+		if self.printStartupTime and self.startTime != None:
+			# make sure the first window is drawn before measuring
+			self.update_idletasks()
+			print(f'time to first window: {(time.perf_counter() - self.startTime) * 1000:.1f} ms', file=sys.stderr)
+
+		# scans the input files
+		self.startValidation()
+
+		preloadImages()
+
+#-
+	def startValidation(self, reload: bool = False) -> None:
+		""" scans the input files and computes the data of the selected presets on a background thread. \n
+		results are applied on the main thread by _pollValidationResults, results of superseded validations are discarded. \n
+		reload - rescan the input files if already scanned
+		"""
+
+		# sub function
+		@staticmethod
+		def _validate(app: App, token: int, presets: list[str], reload: bool) -> None:
+			fileManager = app.fileManager
+			with app.fileManagerLock:
+				# superseded while waiting for the lock
+				if token != app.validationToken:
+					return
+
+				try:
+					if fileManager.files == None:
+						fileManager.createinputFiles()
+					elif reload:
+						fileManager.reloadInputFiles()
+
+					# header only, used for the metadata requirements and the stats
+					textureCollection = fileManager.loadTextureMetadata()
+					videoCollection = fileManager.loadVideoMetadata()
+
+					presetData = {}
+					for preset in presets:
+						presetData[preset] = fileManager.getPresetFileData(preset)
+						presetData[preset].foreachRecursive(lambda collection: collection.buildIndex() if isinstance(collection, PresetFileCollectionData) else None)
+
+					app.validationResults.put((token, presetData, fileManager.getFilePath(endsWith='.obj'), (textureCollection, videoCollection), None))
+				except Exception as error:
+					traceback.print_exc()
+					app.validationResults.put((token, None, None, (None, None), error))
+
+		# main function
+		# a superseded validation may not have reloaded yet
+		reload = reload or (self.isValidating and self.validationReload)
+
+		self.validationToken += 1
+		self.validationPresets = list(self.selectedPresets)
+		self.validationReload = reload
+		self.isValidating = True
+
+		thread = threading.Thread(target=_validate, args=(self, self.validationToken, self.validationPresets, reload), daemon=True)
+		thread.start()
+		if not self.isPollingValidation:
+			self.isPollingValidation = True
+			self.after(50, self._pollValidationResults)
+
+#-
+	def _pollValidationResults(self) -> None:
+		""" applies the result of the latest validation once available. """
+		while not self.validationResults.empty():
+			(token, presetData, objFilePath, (textureCollection, videoCollection), error) = self.validationResults.get()
+			# superseded by a newer validation
+			if token != self.validationToken:
+				continue
+
+			self.isValidating = False
+			self.isPollingValidation = False
+			if error != None:
+				InfoModalWindow(self, 'validation failed')
+				return
+
+			self.validatedPresetData = presetData
+			self.textureCollection = textureCollection
+			self.videoCollection = videoCollection
+			self.validatedDataVersion += 1
+			if objFilePath != None:
+				self.objAnalyzer = ObjAnalyzer(objFilePath, os.path.join(self.fileManager.outputDir, 'obj_stats.txt'))
+			elif hasattr(self, 'objAnalyzer'):
+				del self.objAnalyzer
+
+			# fill in the overview if displayed
+			if self.currentScreen == 'overview':
+				self._updateOverviewTabs()
+			return
+
+		self.after(50, self._pollValidationResults)
+
+#-
+	def showScreen(self, name: str, rebuild: bool = False) -> bool:
+		""" displays the main window content of a screen. \n
+		a screen's frame and components are created once and only hidden when navigating away, later visits reuse them. \n
+		returns whether the screen is empty and its content needs to be built. \n
+		rebuild - discard the existing content of the screen
+		"""
+
+		self.navigationStart = time.perf_counter()
+
+		if self.currentMainFrame != None:
+			self.currentMainFrame.grid_remove()
+
+		screen = self.screens.get(name)
+		if screen != None and rebuild:
+			screen[0].destroy()
+			screen = None
+
+		isNew = screen == None
+		if isNew:
+			screen = (customtkinter.CTkFrame(master=self, fg_color='transparent'), {})
+			self.screens[name] = screen
+
+		(self.currentMainFrame, self.components) = screen
+		self.currentScreen = name
 
-		# initialize new frame
-		self.currentMainFrame = customtkinter.CTkFrame(master=self, fg_color='transparent')
 		# outer layout
 		self.currentMainFrame.grid(column=0, row=0, padx=0, pady=0, sticky='nsew')
 		self.columnconfigure(0, weight=1)
 		self.rowconfigure(0, weight=1)
 
+		if self.printNavigationTime:
+			# runs once the calling display function is done
+			self.after_idle(self._printNavigationTime, name, isNew)
+
+		return isNew
+
+#-
+	def _printNavigationTime(self, name: str, isNew: bool) -> None:
+		# make sure the screen is drawn before measuring
+		self.update_idletasks()
+		print(f'navigation to {name} ({"built" if isNew else "reused"}): {(time.perf_counter() - self.navigationStart) * 1000:.1f} ms', file=sys.stderr)
+
 #-
 	def updateTransferBarLoop(self) -> None:
 		""" loop for progress bar. """
@@ -276,7 +511,11 @@ class App(customtkinter.CTk):
 		
 		self.exportJobCount = self.fileManager.pollFinishedJobs()
 
-		self.components['progressBar'].set((self.maxExportJobCount - self.exportJobCount) / self.maxExportJobCount)
+		# weighted by the bytes of each job when known
+		progress = self.fileManager.getExportProgress()
+		if progress == None:
+			progress = (self.maxExportJobCount - self.exportJobCount) / self.maxExportJobCount
+		self.components['progressBar'].set(progress)
 
 		if self.exportJobCount == 0:
 			self.transferCompleteCB()
@@ -1,12 +1,39 @@
-from app import App
+import time
+# measured as early as possible for --print-startup-time (time to first window in gui mode)
+START_TIME = time.perf_counter()
 import sys
 
 # commandline syntax:
-# ./assetExporter.py [-path <path>] [--print-paths]
+# ./assetExporter.py [-path <path>] [--print-paths] [--headless [-presets <name,name,...>] [--no-export] [--resume]] [--print-startup-time] [--print-navigation-time]
+# ./assetExporter.py --batch [-paths <path|glob,...>] [-paths-file <file>] [-workers <count>] [-presets <name,name,...>] [--no-export] [--resume]
+# ./assetExporter.py --watch [-path <path>] [-presets <name,name,...>] [--auto-export] [-port <port>] [--poll [-poll-interval <seconds>]]
+# any mode also accepts: [-metrics-log <file.jsonl>] [-metrics-prom <file.prom>] [-profile <file.prof>]
+# --headless runs without gui, prints a json report and exits with:
+#   0: success, 1: validation failed, 2: export failed, 3: error, 4: export cancelled (ctrl+c)
+# --resume skips the files the previous, cancelled or interrupted, export already wrote
+# --batch does the same for many asset roots concurrently and exits with the most severe code
+# --watch revalidates as input files change, the status is served as json on http://127.0.0.1:<port>/status
 
 # default values
 basepath = None
 printPaths = False
+headless = False
+batch = False
+watch = False
+autoExport = False
+port = 8765
+forcePolling = False
+pollInterval = 2.0
+batchPaths = []
+workerCount = None
+presets = None
+export = True
+resume = False
+printStartupTime = False
+printNavigationTime = False
+metricsLogPath = None
+metricsPromPath = None
+profilePath = None
 
 # remove first arg (ie path to program), pre-process the rest
 arguments = list(map(lambda arg: arg.strip(), sys.argv[1:]))
@@ -16,8 +43,65 @@ try:
 		basepath = arguments[arguments.index('-path') + 1]
 	if '--print-paths' in arguments:
 		printPaths = True
+	if '--headless' in arguments:
+		headless = True
+	if '--batch' in arguments:
+		batch = True
+	if '--watch' in arguments:
+		watch = True
+	if '--auto-export' in arguments:
+		autoExport = True
+	if '-port' in arguments:
+		port = int(arguments[arguments.index('-port') + 1])
+	if '--poll' in arguments:
+		forcePolling = True
+	if '-poll-interval' in arguments:
+		pollInterval = float(arguments[arguments.index('-poll-interval') + 1])
+	if '-paths' in arguments:
+		batchPaths.extend(path.strip() for path in arguments[arguments.index('-paths') + 1].split(',') if path.strip() != '')
+	if '-paths-file' in arguments:
+		with open(arguments[arguments.index('-paths-file') + 1]) as pathsFile:
+			batchPaths.extend(line.strip() for line in pathsFile if line.strip() != '')
+	if '-workers' in arguments:
+		workerCount = int(arguments[arguments.index('-workers') + 1])
+	if '-presets' in arguments:
+		presets = [preset.strip() for preset in arguments[arguments.index('-presets') + 1].split(',') if preset.strip() != '']
+	if '--no-export' in arguments:
+		export = False
+	if '--resume' in arguments:
+		resume = True
+	if '--print-startup-time' in arguments:
+		printStartupTime = True
+	if '--print-navigation-time' in arguments:
+		printNavigationTime = True
+	if '-metrics-log' in arguments:
+		metricsLogPath = arguments[arguments.index('-metrics-log') + 1]
+	if '-metrics-prom' in arguments:
+		metricsPromPath = arguments[arguments.index('-metrics-prom') + 1]
+	if '-profile' in arguments:
+		profilePath = arguments[arguments.index('-profile') + 1]
 except IndexError:
 	pass
 
-app = App(basepath, printPaths)
+# instrumentation is disabled unless requested
+if metricsLogPath != None or metricsPromPath != None:
+	import metrics
+	metrics.enableMetrics(metricsLogPath, metricsPromPath)
+if profilePath != None:
+	import metrics
+	metrics.startProfiling(profilePath)
+
+if watch:
+	from watchMode import runWatch
+	sys.exit(runWatch(basepath, presets, autoExport, port, forcePolling, pollInterval))
+if batch:
+	from headless import runBatch
+	sys.exit(runBatch(batchPaths, presets, export, workerCount, printStartupTime, START_TIME, resume))
+if headless:
+	# gui modules are never imported in headless mode
+	from headless import runHeadless
+	sys.exit(runHeadless(basepath, presets, export, printStartupTime, START_TIME, resume))
+
+from app import App
+app = App(basepath, printPaths, printStartupTime, START_TIME, printNavigationTime)
 app.mainloop()
\ No newline at end of file
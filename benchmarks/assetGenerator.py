@@ -0,0 +1,198 @@
+import random
+import struct
+import zlib
+import json
+import sys
+import os
+
+# import type defs
+from os import PathLike
+
+# commandline syntax:
+# ./assetGenerator.py -path <asset root> [-profile <name>] [-seed <seed>]
+
+# NOTE: weights are relative, ex: {3: 1, 4: 3} is 25% tris and 75% quads
+PROFILES = {
+	'small': {
+		'textureSets'      : 4,
+		# suffixes not in presetSettings.json produce failing files
+		'textureSuffixes'  : {'BaseColor': 4, 'Roughness': 3, 'Metallic': 2, 'NormalGL': 3, 'AO': 2, 'Height': 1, 'Unused': 1},
+		'textureExts'      : {'.png': 9, '.exr': 1},
+		'textureResolutions': {1024: 4, 2048: 2, 1000: 1},
+		'textureBytes'     : 16 * 1024,
+		'imagesPerDir'     : 8,
+		'imageBytes'       : 16 * 1024,
+		'videos'           : 1,
+		'videoBytes'       : 256 * 1024,
+		'extraAssets'      : 4,
+		'assetBytes'       : 64 * 1024,
+		'objVertices'      : 10000,
+		'objFaces'         : 10000,
+		'objObjects'       : 4,
+		'faceDegrees'      : {3: 4, 4: 5, 5: 1},
+	},
+	'medium': {
+		'textureSets'      : 50,
+		'textureSuffixes'  : {'BaseColor': 4, 'Roughness': 3, 'Metallic': 2, 'NormalGL': 3, 'AO': 2, 'Height': 1, 'Unused': 1},
+		'textureExts'      : {'.png': 9, '.exr': 1},
+		'textureResolutions': {1024: 4, 2048: 2, 1000: 1},
+		'textureBytes'     : 64 * 1024,
+		'imagesPerDir'     : 40,
+		'imageBytes'       : 64 * 1024,
+		'videos'           : 4,
+		'videoBytes'       : 1024 * 1024,
+		'extraAssets'      : 20,
+		'assetBytes'       : 256 * 1024,
+		'objVertices'      : 200000,
+		'objFaces'         : 200000,
+		'objObjects'       : 20,
+		'faceDegrees'      : {3: 4, 4: 5, 5: 1},
+	},
+	'large': {
+		'textureSets'      : 500,
+		'textureSuffixes'  : {'BaseColor': 4, 'Roughness': 3, 'Metallic': 2, 'NormalGL': 3, 'AO': 2, 'Height': 1, 'Unused': 1},
+		'textureExts'      : {'.png': 9, '.exr': 1},
+		'textureResolutions': {1024: 4, 2048: 2, 1000: 1},
+		'textureBytes'     : 64 * 1024,
+		'imagesPerDir'     : 200,
+		'imageBytes'       : 64 * 1024,
+		'videos'           : 10,
+		'videoBytes'       : 4 * 1024 * 1024,
+		'extraAssets'      : 100,
+		'assetBytes'       : 256 * 1024,
+		'objVertices'      : 2000000,
+		'objFaces'         : 2000000,
+		'objObjects'       : 100,
+		'faceDegrees'      : {3: 4, 4: 5, 5: 1},
+	},
+}
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+#---------------------------------------------------------------------------------------------------
+def generateAssetRoot(rootPath: PathLike[str] | str, dirSettings: dict, config: dict, seed: int = 0) -> dict:
+	""" fills rootPath with a synthetic asset matching the dir layout in dirSettings. \n
+	the 'assets', 'texs', 'imgs' and 'vids' categories are filled with their typical content, any other category with placeholder files. \n
+	returns the number of files generated per category, and the path of the generated obj file.
+	"""
+
+	# sub functions
+	@staticmethod
+	def _weighted(rng: random.Random, weights: dict, count: int) -> list:
+		return rng.choices(list(weights), weights=list(weights.values()), k=count)
+
+	@staticmethod
+	def _writeFile(path: str, header: bytes, size: int) -> None:
+		with open(path, 'wb') as file:
+			file.write(header)
+			if size > len(header):
+				file.write(bytes(size - len(header)))
+
+	@staticmethod
+	def _pngHeader(width: int, height: int) -> bytes:
+		# signature + IHDR chunk, 8 bit rgba
+		ihdrData = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+		return PNG_SIGNATURE + struct.pack('>I', len(ihdrData)) + b'IHDR' + ihdrData + struct.pack('>I', zlib.crc32(b'IHDR' + ihdrData))
+
+	@staticmethod
+	def _fillCategory(rng: random.Random, category: str, dirPath: str, counts: dict, stats: dict) -> None:
+		os.makedirs(dirPath, exist_ok=True)
+		fileCount = 0
+
+		if category == 'assets':
+			objPath = os.path.join(dirPath, 'asset.obj')
+			generateObj(objPath, config['objVertices'], config['objFaces'], config['faceDegrees'], config['objObjects'], rng)
+			with open(os.path.join(dirPath, 'asset.mtl'), 'w') as file:
+				file.write('newmtl material\nmap_Kd ../textures/asset_000_BaseColor.png\n')
+			stats['objPath'] = objPath
+			fileCount += 2
+			for (i, ext) in enumerate(rng.choices(('.fbx', '.blend', '.glb', '.zip'), k=config['extraAssets'])):
+				_writeFile(os.path.join(dirPath, f'asset_{i:03d}{ext}'), b'', config['assetBytes'])
+				fileCount += 1
+
+		elif category == 'texs':
+			for textureSet in range(config['textureSets']):
+				resolution = _weighted(rng, config['textureResolutions'], 1)[0]
+				suffixes = set(_weighted(rng, config['textureSuffixes'], len(config['textureSuffixes'])))
+				for suffix in sorted(suffixes):
+					ext = _weighted(rng, config['textureExts'], 1)[0]
+					header = _pngHeader(resolution, resolution) if ext == '.png' else b''
+					_writeFile(os.path.join(dirPath, f'asset_{textureSet:03d}_{suffix}{ext}'), header, config['textureBytes'])
+					fileCount += 1
+
+		elif category == 'vids':
+			for i in range(config['videos']):
+				_writeFile(os.path.join(dirPath, f'turntable_{i:02d}.mp4'), struct.pack('>I', 16) + b'ftypisom' + bytes(4), config['videoBytes'])
+				fileCount += 1
+
+		else:
+			# ex: imgs sub-categories
+			for i in range(config['imagesPerDir']):
+				_writeFile(os.path.join(dirPath, f'{category}_{i:04d}.png'), _pngHeader(1920, 1080), config['imageBytes'])
+				fileCount += 1
+
+		counts[category] = fileCount
+
+	# main function
+	rng = random.Random(seed)
+	stats = {'fileCounts': {}, 'objPath': None}
+
+	for (category, path) in dirSettings.items():
+		if category == 'output':
+			continue
+		if isinstance(path, str):
+			_fillCategory(rng, category, os.path.normpath(os.path.join(rootPath, path)), stats['fileCounts'], stats)
+		else:
+			for (subCategory, subPath) in path.items():
+				_fillCategory(rng, subCategory, os.path.normpath(os.path.join(rootPath, subPath)), stats['fileCounts'], stats)
+
+	return stats
+
+#-
+def generateObj(path: PathLike[str] | str, vertexCount: int, faceCount: int, faceDegrees: dict, objectCount: int = 1, rng: random.Random | None = None) -> None:
+	""" writes an obj file with vertexCount vertices and faceCount faces split into objectCount objects. \n
+	faceDegrees - relative weight of each face vertex count, ex: {3: 1, 4: 3}
+	"""
+	rng = rng or random.Random(0)
+	degrees = rng.choices(list(faceDegrees), weights=list(faceDegrees.values()), k=faceCount)
+	facesPerObject = max(1, -(-faceCount // max(1, objectCount)))
+
+	with open(path, 'w') as file:
+		file.write('# synthetic benchmark mesh\nmtllib asset.mtl\n')
+
+		lines = []
+		for _ in range(vertexCount):
+			lines.append(f'v {rng.random():.6f} {rng.random():.6f} {rng.random():.6f}\n')
+			if len(lines) == 10000:
+				file.writelines(lines)
+				lines.clear()
+
+		for (i, degree) in enumerate(degrees):
+			if i % facesPerObject == 0:
+				lines.append(f'o object_{i // facesPerObject:04d}\n')
+			lines.append('f ' + ' '.join(str(rng.randrange(vertexCount) + 1) for _ in range(degree)) + '\n')
+			if len(lines) >= 10000:
+				file.writelines(lines)
+				lines.clear()
+
+		file.writelines(lines)
+
+#---------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+	arguments = sys.argv[1:]
+	rootPath = None
+	profile = 'small'
+	seed = 0
+	if '-path' in arguments:
+		rootPath = arguments[arguments.index('-path') + 1]
+	if '-profile' in arguments:
+		profile = arguments[arguments.index('-profile') + 1]
+	if '-seed' in arguments:
+		seed = int(arguments[arguments.index('-seed') + 1])
+	if rootPath == None:
+		sys.exit('-path is required')
+
+	with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../settings/dirLayout.json')) as file:
+		dirSettings = json.load(file)
+
+	print(json.dumps(generateAssetRoot(rootPath, dirSettings, PROFILES[profile], seed), indent=2))
@@ -0,0 +1,57 @@
+import tempfile
+import time
+import sys
+import os
+
+# benchmarks are run from the repo root or this dir, make the modules importable either way
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from fileDataClasses import FileCollection, PresetFileCollectionData, FileCategory
+
+# commandline syntax:
+# ./benchDataClasses.py [-count <file count>] [-repeat <count>]
+
+#---------------------------------------------------------------------------------------------------
+def benchDataClasses(fileCount: int, repeat: int = 5) -> dict:
+	""" times the construction of a collection of fileCount files, and of the dataclasses wrapping it. \n
+	returns the best of repeat runs in seconds.
+	"""
+	fileNames = [f'asset_{i:07d}_BaseColor.png' for i in range(fileCount)]
+	results = {'fileCount': fileCount}
+
+	# sub function
+	@staticmethod
+	def _best(func) -> float:
+		times = []
+		for _ in range(repeat):
+			startTime = time.perf_counter()
+			func()
+			times.append(time.perf_counter() - startTime)
+		return min(times)
+
+	# main function
+	with tempfile.TemporaryDirectory() as dirPath:
+		collection = FileCollection('bench', dirPath, list(fileNames))
+
+		results['collection'] = _best(lambda: FileCollection('bench', dirPath, list(fileNames)))
+		results['presetData'] = _best(lambda: [PresetFileCollectionData('bench', collection, './out/', {'.png'}, ('BaseColor',)) for _ in range(1000)]) / 1000
+		results['category'] = _best(lambda: [FileCategory('bench', [collection]) for _ in range(1000)]) / 1000
+		# alternated so that every call replaces the files
+		reversedNames = fileNames[::-1]
+		results['replaceFiles'] = _best(lambda: [collection.replaceFiles(files) for files in (reversedNames, fileNames)]) / 2
+
+	return results
+
+#---------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+	arguments = sys.argv[1:]
+	fileCount = 100000
+	repeat = 5
+	if '-count' in arguments:
+		fileCount = int(arguments[arguments.index('-count') + 1])
+	if '-repeat' in arguments:
+		repeat = int(arguments[arguments.index('-repeat') + 1])
+
+	results = benchDataClasses(fileCount, repeat)
+	print(f'files: {results.pop("fileCount")}')
+	for (name, duration) in results.items():
+		print(f'{name + ":":<19}{duration * 1000:.3f} ms')
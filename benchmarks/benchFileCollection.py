@@ -0,0 +1,65 @@
+import tracemalloc
+import tempfile
+import time
+import sys
+import os
+
+# benchmarks are run from the repo root or this dir, make the modules importable either way
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from fileDataClasses import FileCollection
+
+# commandline syntax:
+# ./benchFileCollection.py [-count <file count>]
+
+#---------------------------------------------------------------------------------------------------
+def benchFileCollection(fileCount: int) -> dict:
+	""" times add/lookup/remove of fileCount files one at a time, and the memory used by the collection. \n
+	returns the results in seconds and bytes.
+	"""
+	exts = ('.png', '.jpg', '.exr', '.tga', '.obj')
+	fileNames = [f'asset_{i:07d}_BaseColor{exts[i % len(exts)]}' for i in range(fileCount)]
+	results = {'fileCount': fileCount}
+
+	with tempfile.TemporaryDirectory() as dirPath:
+		# add
+		collection = FileCollection('bench', dirPath, [])
+		startTime = time.perf_counter()
+		for fileName in fileNames:
+			collection.add(fileName)
+		results['add'] = time.perf_counter() - startTime
+
+		# lookup
+		startTime = time.perf_counter()
+		for fileName in fileNames:
+			if fileName not in collection:
+				raise RuntimeError(f'{fileName} missing')
+		results['lookup'] = time.perf_counter() - startTime
+
+		# remove, in insertion order
+		startTime = time.perf_counter()
+		for fileName in fileNames:
+			collection.remove(fileName)
+		results['remove'] = time.perf_counter() - startTime
+
+		# memory, measured separately since tracing slows down everything else
+		# NOTE: the file name strings are shared with fileNames, only the collection's own structures are measured
+		tracemalloc.start()
+		collection = FileCollection('bench', dirPath, [])
+		collection.add(fileNames)
+		results['memory'] = tracemalloc.get_traced_memory()[0]
+		tracemalloc.stop()
+
+	return results
+
+#---------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+	arguments = sys.argv[1:]
+	fileCount = 500000
+	if '-count' in arguments:
+		fileCount = int(arguments[arguments.index('-count') + 1])
+
+	results = benchFileCollection(fileCount)
+	print(f'files:  {results["fileCount"]}')
+	for name in ('add', 'lookup', 'remove'):
+		print(f'{name + ":":<8}{results[name]:.3f} s ({results[name] / results["fileCount"] * 1e6:.2f} us/file)')
+	print(f'memory: {results["memory"] / 2**20:.1f} MiB ({results["memory"] / results["fileCount"]:.0f} B/file)')
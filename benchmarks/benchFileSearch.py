@@ -0,0 +1,70 @@
+import tempfile
+import random
+import time
+import sys
+import os
+
+# benchmarks are run from the repo root or this dir, make the modules importable either way
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from fileDataClasses import FileCollection, FileCategory
+from fileIndex import FileSearchIndex
+
+# commandline syntax:
+# ./benchFileSearch.py [-count <file count>]
+
+# (startsWith, endsWith, contains, pattern, ext)
+QUERIES = {
+	'mesh (ext)'          : (None, None, None, None, '.obj'),
+	'lod (glob)'          : (None, None, None, '*_LOD[0-9].fbx', None),
+	# prefix is set to an existing texture set at runtime
+	'texture set (prefix)': ('', None, None, None, None),
+	'suffix'              : (None, '_NormalGL.png', None, None, None),
+	'substring'           : (None, None, '_Roughness', None, None),
+}
+
+#---------------------------------------------------------------------------------------------------
+def benchFileSearch(fileCount: int, collectionCount: int = 4) -> dict:
+	""" times building a search index of fileCount files, and the time to first and all results of typical queries. \n
+	returns the results in seconds.
+	"""
+	random.seed(0)
+	suffixes = ('BaseColor', 'Roughness', 'Metallic', 'NormalGL', 'AO', 'Height', 'LOD0', 'LOD1', 'LOD2')
+	exts = ('.png', '.png', '.png', '.exr', '.fbx', '.obj')
+	results = {'fileCount': fileCount}
+
+	with tempfile.TemporaryDirectory() as dirPath:
+		files = FileCategory('bench')
+		for i in range(collectionCount):
+			fileNames = [f'asset_{random.randrange(fileCount):07d}_{random.choice(suffixes)}{random.choice(exts)}' for _ in range(fileCount // collectionCount)]
+			files.add(FileCollection(f'collection{i}', dirPath, fileNames))
+
+		queries = dict(QUERIES)
+		queries['texture set (prefix)'] = (files.children[0].files[0][:len('asset_0000000_')], None, None, None, None)
+
+		startTime = time.perf_counter()
+		index = FileSearchIndex(files)
+		results['build'] = time.perf_counter() - startTime
+
+		for (name, query) in queries.items():
+			startTime = time.perf_counter()
+			next(index.find(*query), None)
+			firstTime = time.perf_counter() - startTime
+
+			startTime = time.perf_counter()
+			matchCount = sum(1 for _ in index.find(*query))
+			results[name] = (firstTime, time.perf_counter() - startTime, matchCount)
+
+	return results
+
+#---------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+	arguments = sys.argv[1:]
+	fileCount = 100000
+	if '-count' in arguments:
+		fileCount = int(arguments[arguments.index('-count') + 1])
+
+	results = benchFileSearch(fileCount)
+	print(f'files: {results.pop("fileCount")}')
+	print(f'build: {results.pop("build") * 1000:.1f} ms')
+	for (name, (firstTime, allTime, matchCount)) in results.items():
+		print(f'{name + ":":<22}first {firstTime * 1000:.3f} ms, all {allTime * 1000:.3f} ms ({matchCount} matches)')
@@ -0,0 +1,187 @@
+import statistics
+import platform
+import tempfile
+import shutil
+import json
+import time
+import sys
+import os
+
+# benchmarks are run from the repo root or this dir, make the modules importable either way
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..'))
+from fileManager import FileManager
+from objAnalizer import ObjAnalyzer
+from assetGenerator import PROFILES, generateAssetRoot
+
+# commandline syntax:
+# ./benchPipeline.py [-profile <small|medium|large>] [-config <json file>] [-repeat <count>] [-output <results.json>] [-baseline <baseline.json>] [-threshold <ratio>] [--save-baseline]
+# -config overrides profile values, ex: {"objFaces": 500000, "faceDegrees": {"3": 1}}
+# exits with 1 if any phase regressed compared to the baseline
+
+SETTINGS_DIR = os.path.join(BENCHMARKS_DIR, '../settings/')
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+# phases faster than this are too noisy to be compared, in seconds
+NOISE_FLOOR = 0.002
+
+#---------------------------------------------------------------------------------------------------
+def benchPipeline(profile: str = 'small', repeat: int = 5, seed: int = 0, configOverrides: dict | None = None) -> dict:
+	""" times the scan, preset generation, export and obj analysis of a synthetic asset end to end. \n
+	returns the results as a json serializable dict, every phase is timed repeat times, in seconds. \n
+	configOverrides - values replacing those of the profile, see assetGenerator.PROFILES
+	"""
+
+	# sub function
+	@staticmethod
+	def _summary(times: list[float]) -> dict:
+		return {'median': statistics.median(times), 'min': min(times), 'runs': times}
+
+	# main function
+	with open(os.path.join(SETTINGS_DIR, 'dirLayout.json')) as file:
+		dirSettings = json.load(file)
+	with open(os.path.join(SETTINGS_DIR, 'presetSettings.json')) as file:
+		presetSettings = json.load(file)
+
+	config = dict(PROFILES[profile])
+	for (key, value) in (configOverrides or {}).items():
+		if key not in config:
+			raise KeyError(f'unknown config key: {key}')
+		# json object keys are always strings
+		if key in ('faceDegrees', 'textureResolutions'):
+			value = {int(item): weight for (item, weight) in value.items()}
+		config[key] = value
+	phaseTimes = {'reloadInputFiles': [], 'generatePresetFileData': [], 'exportFiles': [], 'ObjAnalyzer': []}
+
+	with tempfile.TemporaryDirectory() as tempDir:
+		# the output dir is relative to the asset root, nest it to keep everything in tempDir
+		rootPath = os.path.join(tempDir, 'asset')
+		generationStart = time.perf_counter()
+		generated = generateAssetRoot(rootPath, dirSettings, config, seed)
+		generationTime = time.perf_counter() - generationStart
+
+		# the copy concurrency learned by previous runs (ex: the user's exports) would change the results
+		fileManager = FileManager(rootPath, None, None, dirSettings, presetSettings, deferScan=True, copyConcurrencyStatePath=None)
+		fileManager.createinputFiles()
+
+		for _ in range(repeat):
+			# scan
+			startTime = time.perf_counter()
+			fileManager.reloadInputFiles()
+			phaseTimes['reloadInputFiles'].append(time.perf_counter() - startTime)
+
+			# preset data, forcibly regenerated
+			startTime = time.perf_counter()
+			for preset in presetSettings:
+				fileManager.generatePresetFileData(preset)
+			phaseTimes['generatePresetFileData'].append(time.perf_counter() - startTime)
+
+			# export, until every copy is done
+			shutil.rmtree(fileManager.outputDir, ignore_errors=True)
+			startTime = time.perf_counter()
+			for preset in presetSettings:
+				fileManager.exportFiles(preset)
+			while fileManager.pollFinishedJobs(noStdOut=True) != 0:
+				time.sleep(0.001)
+			phaseTimes['exportFiles'].append(time.perf_counter() - startTime)
+			if len(fileManager.failedJobs) != 0:
+				raise RuntimeError(f'{len(fileManager.failedJobs)} export jobs failed')
+			fileManager.clearJobResults()
+
+			# obj stats
+			statsPath = os.path.join(tempDir, 'obj_stats.txt')
+			startTime = time.perf_counter()
+			objAnalyzer = ObjAnalyzer(generated['objPath'], statsPath)
+			objAnalyzer.run()
+			objAnalyzer.awaitCompletion()
+			phaseTimes['ObjAnalyzer'].append(time.perf_counter() - startTime)
+
+	return {
+		'meta': {
+			'python': platform.python_version(),
+			'platform': platform.platform(),
+			'cpuCount': os.cpu_count(),
+			'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+		},
+		'profile': profile,
+		'config': config,
+		'repeat': repeat,
+		'fileCounts': generated['fileCounts'],
+		'generation': generationTime,
+		'phases': {phase: _summary(times) for (phase, times) in phaseTimes.items()},
+	}
+
+#-
+def findRegressions(results: dict, baseline: dict, threshold: float = 0.2) -> list[dict]:
+	""" compares the best run of every phase against the baseline. \n
+	the best run is used since it is the least affected by other activity on the machine. \n
+	a phase regressed if it is over threshold (ratio) slower, phases under NOISE_FLOOR in both runs are ignored. \n
+	returns one entry per regressed phase.
+	"""
+	# compared as json since the baseline was read from json
+	if baseline.get('profile') != results['profile'] or baseline.get('config') != json.loads(json.dumps(results['config'])):
+		raise ValueError(f'baseline was recorded with a different profile or config than {results["profile"]}')
+
+	regressions = []
+	for (phase, summary) in results['phases'].items():
+		baselineSummary = baseline.get('phases', {}).get(phase)
+		if baselineSummary == None:
+			continue
+
+		(current, previous) = (summary['min'], baselineSummary['min'])
+		if max(current, previous) < NOISE_FLOOR:
+			continue
+		if current > previous * (1 + threshold):
+			regressions.append({'phase': phase, 'baseline': previous, 'current': current, 'ratio': current / previous if previous != 0 else None})
+
+	return regressions
+
+#---------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+	arguments = sys.argv[1:]
+	profile = 'small'
+	repeat = 5
+	outputPath = None
+	baselinePath = DEFAULT_BASELINE_PATH
+	threshold = 0.2
+	configOverrides = None
+	if '-profile' in arguments:
+		profile = arguments[arguments.index('-profile') + 1]
+	if '-config' in arguments:
+		with open(arguments[arguments.index('-config') + 1]) as file:
+			configOverrides = json.load(file)
+	if '-repeat' in arguments:
+		repeat = int(arguments[arguments.index('-repeat') + 1])
+	if '-output' in arguments:
+		outputPath = arguments[arguments.index('-output') + 1]
+	if '-baseline' in arguments:
+		baselinePath = arguments[arguments.index('-baseline') + 1]
+	if '-threshold' in arguments:
+		threshold = float(arguments[arguments.index('-threshold') + 1])
+
+	results = benchPipeline(profile, repeat, configOverrides=configOverrides)
+
+	# compare against the stored baseline
+	if '--save-baseline' in arguments:
+		with open(baselinePath, 'w') as file:
+			json.dump(results, file, indent=2)
+		results['regressions'] = []
+	elif os.path.isfile(baselinePath):
+		with open(baselinePath) as file:
+			results['regressions'] = findRegressions(results, json.load(file), threshold)
+	else:
+		results['regressions'] = None
+
+	if outputPath != None:
+		with open(outputPath, 'w') as file:
+			json.dump(results, file, indent=2)
+
+	print(f'profile: {profile}, files: {sum(results["fileCounts"].values())}, repeat: {repeat}')
+	for (phase, summary) in results['phases'].items():
+		print(f'{phase + ":":<24}median {summary["median"] * 1000:.2f} ms, min {summary["min"] * 1000:.2f} ms')
+
+	if results['regressions'] == None:
+		print(f'no baseline at {baselinePath}, use --save-baseline to create one')
+	for regression in results['regressions'] or ():
+		print(f'REGRESSION {regression["phase"]}: {regression["baseline"] * 1000:.2f} ms -> {regression["current"] * 1000:.2f} ms', file=sys.stderr)
+
+	sys.exit(1 if results['regressions'] else 0)
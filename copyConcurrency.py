@@ -0,0 +1,165 @@
+from concurrent.futures import CancelledError
+import threading
+import time
+import json
+import os
+
+# import type defs
+from threading import Event
+from os import PathLike
+
+# NOTE: the right number of concurrent copies depends on the drives (ex: ssd, hdd, nas), it is measured rather than configured
+
+# bounds of the concurrent copies per device pair
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 16
+# used for device pairs without any measurement yet
+DEFAULT_CONCURRENCY = 4
+# minimum duration of a measurement, each step of the controller lasts at least this long
+WINDOW_SECONDS = 0.5
+# relative throughput gain needed for a higher concurrency to become the optimum, more copies in flight than needed only add contention
+TOLERANCE = 0.05
+# weight of the latest measurement of a concurrency in its stored throughput
+SMOOTHING = 0.5
+# learned throughputs, shared by every asset processed on this machine, default of FileManager's copyConcurrencyStatePath
+STATE_PATH = os.path.join(os.path.expanduser('~'), '.assetExporter', 'copyConcurrency.json')
+
+#---------------------------------------------------------------------------------------------------
+class CopyConcurrencyController():
+	""" limits the copies in flight between two devices, adjusting the limit to maximize the measured throughput. \n
+	hill climbing: the limit moves a step at a time in one direction and turns around as soon as the throughput drops, it keeps probing around the optimum. \n
+	only windows where copies were waiting for a slot are measured, ie: not the end of an export running out of files. \n
+	state - {'levels': {concurrency: bytes/s}, 'optimum': concurrency} of the device pair, updated in place, see loadConcurrencyState \n
+	shareCount - number of exports copying between the same devices at once (ex: batch workers), each one gets that share of the concurrency
+	"""
+
+	def __init__(self, deviceKey: str, state: dict | None = None, shareCount: int = 1) -> None:
+		self.deviceKey = deviceKey
+		self.state = state if state != None else {}
+		self.state.setdefault('levels', {})
+		self.maxLimit = max(MIN_CONCURRENCY, MAX_CONCURRENCY // shareCount)
+		# starts at the best concurrency of the previous exports
+		self.limit = min(max(self.state.get('optimum', DEFAULT_CONCURRENCY) // shareCount, MIN_CONCURRENCY), self.maxLimit)
+		self.direction = 1
+		self.inFlight = 0
+		self.waiting = 0
+		self._condition = threading.Condition()
+		# current window, see _measure
+		self.windowStart = time.perf_counter()
+		self.windowBytes = 0
+		self.isWindowSaturated = False
+		self.lastThroughput = None
+
+#---
+	def acquire(self, cancelEvent: Event | None = None) -> None:
+		""" waits until a copy can start, raises CancelledError if cancelEvent is set meanwhile. """
+		with self._condition:
+			self.waiting += 1
+			try:
+				while self.inFlight >= self.limit:
+					self.isWindowSaturated = True
+					if cancelEvent != None and cancelEvent.is_set():
+						raise CancelledError('copy cancelled')
+					# woken up by release, the timeout only serves the cancel check
+					self._condition.wait(0.1)
+			finally:
+				self.waiting -= 1
+			self.inFlight += 1
+
+#-
+	def release(self, byteCount: int) -> None:
+		""" ends a copy started with acquire, byteCount - bytes it copied, 0 if it failed. """
+		with self._condition:
+			self.inFlight -= 1
+			self.windowBytes += byteCount
+			if self.waiting != 0:
+				self.isWindowSaturated = True
+			self._measure()
+			self._condition.notify_all()
+
+#-
+	def getStats(self) -> dict:
+		""" {'limit', 'optimum', 'levels': {concurrency: MB/s}} """
+		with self._condition:
+			return {
+				'limit': self.limit,
+				'optimum': self.state.get('optimum'),
+				'levels': {level: round(throughput / 2**20, 2) for (level, throughput) in sorted(self.state['levels'].items(), key=lambda item: int(item[0]))},
+			}
+
+#---
+	def _measure(self) -> None:
+		""" ends the window once long enough, and moves the limit. """
+		now = time.perf_counter()
+		duration = now - self.windowStart
+		if duration < WINDOW_SECONDS:
+			return
+
+		if self.isWindowSaturated:
+			throughput = self.windowBytes / duration
+			levels = self.state['levels']
+			# json keys are strings
+			level = str(self.limit)
+			levels[level] = throughput if level not in levels else SMOOTHING * throughput + (1 - SMOOTHING) * levels[level]
+			self.state['optimum'] = _getOptimum(levels)
+
+			if self.lastThroughput != None and throughput < self.lastThroughput:
+				self.direction = -self.direction
+			nextLimit = self.limit + self.direction
+			if nextLimit < MIN_CONCURRENCY or nextLimit > self.maxLimit:
+				self.direction = -self.direction
+				nextLimit = self.limit + self.direction
+			self.limit = min(max(nextLimit, MIN_CONCURRENCY), self.maxLimit)
+			self.lastThroughput = throughput
+
+		self.windowStart = now
+		self.windowBytes = 0
+		self.isWindowSaturated = self.waiting != 0
+
+#---------------------------------------------------------------------------------------------------
+def getDeviceKey(sourcePath: PathLike[str] | str, outputPath: PathLike[str] | str) -> str:
+	""" identifies the source and destination devices, ex: '2049@/ -> 2049@/' for copies within the same drive. """
+	return f'{_getDevice(sourcePath)} -> {_getDevice(outputPath)}'
+
+#-
+def loadConcurrencyState(statePath: PathLike[str] | str = STATE_PATH) -> dict:
+	""" device key -> state of its controller, see CopyConcurrencyController. \n
+	missing or corrupted state starts over from DEFAULT_CONCURRENCY.
+	"""
+	try:
+		with open(statePath) as file:
+			return json.load(file)
+	except (OSError, ValueError):
+		return {}
+
+#-
+def saveConcurrencyState(states: dict, statePath: PathLike[str] | str = STATE_PATH) -> None:
+	""" stores the state of some device pairs, keeping the others as is, ex: written by another process meanwhile. """
+	allStates = loadConcurrencyState(statePath)
+	allStates.update(states)
+
+	# written to a temp file then renamed, an interrupted write never corrupts the state
+	os.makedirs(os.path.dirname(statePath), exist_ok=True)
+	tempPath = f'{statePath}.{os.getpid()}.tmp'
+	with open(tempPath, 'w') as file:
+		json.dump(allStates, file, indent=2)
+	os.replace(tempPath, statePath)
+
+#---------------------------------------------------------------------------------------------------
+def _getOptimum(levels: dict[str, float]) -> int:
+	""" the lowest concurrency within TOLERANCE of the best throughput. """
+	bestThroughput = max(levels.values())
+	return min(int(level) for (level, throughput) in levels.items() if throughput >= bestThroughput * (1 - TOLERANCE))
+
+#-
+def _getDevice(path: PathLike[str] | str) -> str:
+	""" device of a path, or of its closest existing parent (ex: an output dir not created yet), as '<device number>@<mount point>'. \n
+	device numbers alone are reused across remounts (ex: nas, usb drives), the mount point keeps another device from taking over the state of a previous one.
+	"""
+	path = os.path.abspath(path)
+	while not os.path.exists(path) and os.path.dirname(path) != path:
+		path = os.path.dirname(path)
+	device = os.stat(path).st_dev
+	while not os.path.ismount(path) and os.path.dirname(path) != path:
+		path = os.path.dirname(path)
+	return f'{device}@{path}'
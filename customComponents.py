@@ -1,9 +1,8 @@
-from PIL import Image
+from imageCache import getImage
 import customtkinter
 import subprocess
 import platform
 import shlex
-import os
 
 # import type defs
 from fileDataClasses import FileCategory, PresetFileCollectionData
@@ -13,9 +12,6 @@ from customtkinter import CTkFrame
 from typing import Callable, Any
 from os import PathLike
 
-# since app is intended to be run in a different working dir, CURRENT_FILE_DIR is needed for accessing certain data
-CURRENT_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
-
 # custom components for customtkinter
 #---------------------------------------------------------------------------------------------------
 class ConfirmCancelComponent(CTkFrame):
@@ -42,7 +38,7 @@ class OpenDirBottonComponent(customtkinter.CTkButton):
 	def __init__(self, master: Any, dir: PathLike[str] | str, imageSize: int = 16, buttonTheme: dict = None) -> None:
 		self.targetDir = dir
 		self.imageSize = imageSize
-		self.icon = CTkImage(light_image=Image.open(os.path.join(CURRENT_FILE_DIR, './images/icon_folder_light.png')), dark_image=Image.open(os.path.join(CURRENT_FILE_DIR, './images/icon_folder_dark.png')), size=(self.imageSize,self.imageSize))
+		self.icon = getImage('folder', (self.imageSize,self.imageSize))
 
 		# create the button
 		super().__init__(master=master, text= '', width=imageSize*2, image=self.icon, command=self.openDir)
@@ -127,9 +123,11 @@ class TextListComponent(CTkFrame):
 #---------------------------------------------------------------------------------------------------
 class TabsComponent(customtkinter.CTkTabview):
 	def __init__(self, master: Any, names: Iterable[str], minDim: int) -> None:
-		super().__init__(master=master)
+		super().__init__(master=master, command=self._tabChangedCB)
 		
 		self.tabNames = names
+		# tab name -> function building its content, see setTabBuilder
+		self._tabBuilders = {}
 
 		# create a tab per name
 		for tabName in self.tabNames:
@@ -148,6 +146,34 @@ class TabsComponent(customtkinter.CTkTabview):
 		else:
 			raise TypeError(f'{type(id)} is not a valid type for id')
 
+#---
+	def setTabBuilder(self, id: int | str, builder: Callable[[CTkFrame], None]) -> None:
+		""" sets the function building a tab's content, called with the tab once it is first shown. """
+		tabName = self.tabNames[id] if isinstance(id, int) else id
+		self._tabBuilders[tabName] = builder
+
+		if self.get() == tabName:
+			self._buildTab(tabName)
+
+#-
+	def clearTab(self, id: int | str) -> None:
+		""" destroys a tab's content and drops its pending builder, if any. """
+		tabName = self.tabNames[id] if isinstance(id, int) else id
+		self._tabBuilders.pop(tabName, None)
+
+		for child in self.tab(tabName).winfo_children():
+			child.destroy()
+
+#-
+	def _tabChangedCB(self) -> None:
+		self._buildTab(self.get())
+
+#-
+	def _buildTab(self, tabName: str) -> None:
+		builder = self._tabBuilders.pop(tabName, None)
+		if builder != None:
+			builder(self.tab(tabName))
+
 #---------------------------------------------------------------------------------------------------
 class SummaryComponent(CTkFrame):
 	def __init__(self, master: Any, presets: FileCategory, imgSize: int = 32) -> None:
@@ -155,11 +181,10 @@ class SummaryComponent(CTkFrame):
 		
 		self.imageSize = imgSize
 		self._frameNum = 0
-		self._rowNum = 0
 
 		# get the pass fail icons
-		self.icon_check = CTkImage(Image.open(os.path.join(CURRENT_FILE_DIR, './images/icon_checkmark.png')), size=(self.imageSize/2,self.imageSize/2))
-		self.icon_cross = CTkImage(Image.open(os.path.join(CURRENT_FILE_DIR, './images/icon_X.png')),         size=(self.imageSize/2,self.imageSize/2))
+		self.icon_check = getImage('checkmark', (self.imageSize/2,self.imageSize/2))
+		self.icon_cross = getImage('cross',     (self.imageSize/2,self.imageSize/2))
 
 		self.rowconfigure(0, weight=1)
 
@@ -167,76 +192,184 @@ class SummaryComponent(CTkFrame):
 			# outer layout
 			self.columnconfigure(self._frameNum, weight=1, minsize=self.imageSize)
 
-			# frame
-			frame = customtkinter.CTkScrollableFrame(master=self, label_text=presetData.name, fg_color= customtkinter.ThemeManager.theme["CTk"]["fg_color"])
+			# create the formated list of passing and failing ext
+			rows = []
+			self._summaryFromPresetData(presetData, rows, 1)
+
+			# frame, only the visible rows have widgets
+			frame = VirtualListComponent(self, presetData.name, rows, self.imageSize)
 			frame.grid(column=self._frameNum, row=0, padx=5, pady=10, sticky='nsew')
-			frame.columnconfigure(0, weight=1, minsize=self.imageSize)
 			self._frameNum += 1
 
-			# create the formated list of passing and failing ext
-			self._rowNum = 1
-			self._summaryFromPresetData(presetData, frame, 1)
-
 		# reset incremental values
 		self._frameNum = 0
-		self._rowNum = 0
 
 #---
-	def _summaryFromPresetData(self, presetData: FileCategory | PresetFileCollectionData, master: CTkFrame, depth) -> None:
+	def _summaryFromPresetData(self, presetData: FileCategory | PresetFileCollectionData, rows: list, depth) -> None:
 		if isinstance(presetData, FileCategory):
-			self._addHeading(master, presetData.name, depth)
-			presetData.foreach(self._summaryFromPresetData, master, depth + 1)
+			self._addHeading(rows, presetData.name, depth)
+			presetData.foreach(self._summaryFromPresetData, rows, depth + 1)
 		if isinstance(presetData, PresetFileCollectionData):
 			if presetData.requiredSuffixes == None:
-				self._addExts(master, presetData, None, depth)
+				self._addExts(rows, presetData, None, depth)
 			else:
-				self._addHeading(master, presetData.name, depth)
+				self._addHeading(rows, presetData.name, depth)
 				for suffix in presetData.requiredSuffixes:
-					self._addHeading(master, suffix, depth + 1)
-					self._addExts(master, presetData, suffix, depth + 2)
+					self._addHeading(rows, suffix, depth + 1)
+					self._addExts(rows, presetData, suffix, depth + 2)
+			if presetData.requiredMetadata != None:
+				self._addMetadata(rows, presetData, depth)
 
 #---
-	def _addExts(self, master: Any, presetData: PresetFileCollectionData, suffix: str | None = None, depth: int = 0) -> None:
+	def _addExts(self, rows: list, presetData: PresetFileCollectionData, suffix: str | None = None, depth: int = 0) -> None:
 		""" creates an indented row of all ext in a category. """
 		# add items for passing ext
 		for ext in presetData.getPassingExt():
 			# get number of occurneces of ext in files
-			fileCount = 0
-			for file in presetData.getFilterdFiles(suffix):
-				if file.endswith(ext):
-					fileCount += 1
+			fileCount = presetData.getFileCount(ext, suffix)
 
-			self._addTextImgItem(master, f'{ext} ({str(fileCount)})', self.icon_check, depth)
+			self._addTextImgItem(rows, f'{ext} ({str(fileCount)})', self.icon_check, depth)
 		
 		# add items for failing ext
 		for ext in presetData.getFailingExt():
-			self._addTextImgItem(master, f'{ext} (0)', self.icon_cross, depth)
+			self._addTextImgItem(rows, f'{ext} (0)', self.icon_cross, depth)
 
 #---
-	def _addTextImgItem(self, master: Any, text: str, img: CTkImage, depth: int = 1)-> None:
-		""" add indentable TextWithImageComponent. """
-		item = TextWithImageComponent(master, text, img, self.imageSize)
+	def _addMetadata(self, rows: list, presetData: PresetFileCollectionData, depth: int = 0) -> None:
+		""" creates a row per file failing the metadata requirements, or a single passing row. """
+		failures = presetData.getMetadataFailures()
+		if len(failures) == 0:
+			self._addTextImgItem(rows, 'metadata', self.icon_check, depth)
+			return
+
+		self._addHeading(rows, 'metadata', depth)
+		for (fileName, reasons) in failures.items():
+			self._addTextImgItem(rows, f'{fileName}: {", ".join(reasons)}', self.icon_cross, depth + 1)
+
+#---
+	def _addTextImgItem(self, rows: list, text: str, img: CTkImage, depth: int = 1)-> None:
+		""" add indentable text with image row. """
+		rows.append((text, img, depth))
+
+#---
+	def _addHeading(self, rows: list, text: str, depth: int = 1)-> None:
+		""" add indentable heading row. """
+		rows.append((text, None, depth))
+
+#---------------------------------------------------------------------------------------------------
+class VirtualListComponent(CTkFrame):
+	""" scrollable list of indentable text with image rows. \n
+	only the visible rows have widgets, they are reused while scrolling. \n
+	rows - list of (text, image or None for headings, depth)
+	"""
+	def __init__(self, master: Any, title: str, rows: list[tuple[str, CTkImage | None, int]], size: int = 32) -> None:
+		super().__init__(master=master, fg_color=customtkinter.ThemeManager.theme["CTk"]["fg_color"])
+
+		self.rows = rows
+		self.rowSize = size
+		self._firstRow = 0
+		self._rowWidgets = []
+
+		# title, styled like the label of a CTkScrollableFrame
+		self.titleLabel = customtkinter.CTkLabel(master=self, text=title, corner_radius=6, fg_color=customtkinter.ThemeManager.theme["CTkScrollableFrame"]["label_fg_color"])
+		self.titleLabel.grid(column=0, row=0, columnspan=2, padx=6, pady=(6,0), sticky='ew')
+		# rows
+		self.body = CTkFrame(master=self, fg_color='transparent')
+		self.body.grid(column=0, row=1, padx=0, pady=4, sticky='nsew')
+		self.body.columnconfigure(0, weight=1, minsize=self.rowSize)
+		# scrollbar
+		self.scrollbar = customtkinter.CTkScrollbar(master=self, command=self._scrollCB)
+		self.scrollbar.grid(column=1, row=1, padx=(0,4), pady=4, sticky='ns')
 		# layout
-		item.grid(column=0, row=self._rowNum, padx=(depth*8,4), pady=2, sticky='nw')
-		master.rowconfigure(self._rowNum, minsize=self.imageSize+4)
+		self.columnconfigure(0, weight=1)
+		self.rowconfigure(1, weight=1)
 
-		self._rowNum += 1
+		# the number of row widgets depends on the visible height
+		self.body.bind('<Configure>', self._resizeCB)
+		self._bindScroll(self.body)
 
 #---
-	def _addHeading(self, master: Any, text: str, depth: int = 1)-> None:
-		""" add indentable heading. """
-		frame = CTkFrame(master=master, fg_color='transparent')
-		frame.grid(column=0, row=self._rowNum, padx=(depth*8,4), pady=2, sticky='nw')
+	def setRows(self, rows: list[tuple[str, CTkImage | None, int]]) -> None:
+		""" replaces all rows, keeping the scroll position if possible. """
+		self.rows = rows
+		self._render()
 
-		heading = customtkinter.CTkLabel(master=frame, text=text)
-		heading.grid(column=0, row=0, padx=4, pady=2, sticky='nsw')
+#---
+	def _getRowHeight(self) -> float:
+		""" height of a row in pixels, see _render for the layout. """
+		return (self.rowSize + 4 + 4) * self._get_widget_scaling()
+
+#-
+	def _resizeCB(self, event: Any) -> None:
+		visibleCount = max(1, int(event.height // self._getRowHeight()))
+
+		# create missing rows, rows no longer visible are only hidden
+		while len(self._rowWidgets) < visibleCount:
+			row = TextWithImageComponent(self.body, '', None, self.rowSize)
+			self._bindScroll(row)
+			self._rowWidgets.append(row)
+
+		self._visibleCount = visibleCount
+		self._render()
+
+#-
+	def _render(self) -> None:
+		visibleCount = getattr(self, '_visibleCount', 0)
+		self._firstRow = max(0, min(self._firstRow, len(self.rows) - visibleCount))
+
+		for i, row in enumerate(self._rowWidgets):
+			rowIndex = self._firstRow + i
+			if i >= visibleCount or rowIndex >= len(self.rows):
+				row.grid_remove()
+				continue
+
+			(text, image, depth) = self.rows[rowIndex]
+			row.setText(text)
+			row.setImage(image)
+			row.grid(column=0, row=i, padx=(depth*8,4), pady=2, sticky='nw')
+			self.body.rowconfigure(i, minsize=self.rowSize+4)
+
+		# scrollbar shows the visible fraction of the rows
+		if len(self.rows) == 0:
+			self.scrollbar.set(0, 1)
+		else:
+			self.scrollbar.set(self._firstRow / len(self.rows), min(1, (self._firstRow + visibleCount) / len(self.rows)))
 
-		frame.columnconfigure(0, minsize=self.imageSize+4)
-		frame.rowconfigure(0, weight=1, minsize=self.imageSize+4)
+#---
+	def _scrollCB(self, action: str, value: str | float, unit: str | None = None) -> None:
+		""" same arguments as a tkinter scrollbar command. """
+		if action == 'moveto':
+			self._firstRow = int(round(float(value) * len(self.rows)))
+		elif action == 'scroll':
+			step = int(value)
+			if unit == 'pages':
+				step *= max(1, getattr(self, '_visibleCount', 1))
+			self._firstRow += step
+		self._render()
+
+#-
+	def _mouseWheelCB(self, event: Any) -> None:
+		# linux reports wheel steps as buttons 4 and 5
+		if event.num == 4:
+			step = -1
+		elif event.num == 5:
+			step = 1
+		elif platform.system() == "Windows":
+			step = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+		else:
+			step = -event.delta
+		self._scrollCB('scroll', step, 'units')
 
-		master.rowconfigure(self._rowNum, minsize=self.imageSize+4)
-		self._rowNum += 1
+#-
+	def _bindScroll(self, widget: Any) -> None:
+		""" scroll the list with the mouse wheel while over widget or its labels. """
+		widgets = [widget]
+		if isinstance(widget, TextWithImageComponent):
+			widgets.extend((widget.imageComponent, widget.textComponent))
 
+		for item in widgets:
+			for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+				item.bind(sequence, self._mouseWheelCB)
 
 #---------------------------------------------------------------------------------------------------
 class TextWithImageComponent(CTkFrame):
@@ -257,13 +390,30 @@ class TextWithImageComponent(CTkFrame):
 		self.columnconfigure((0,1), weight=1, minsize=int(self.frameSize*1.5+8))
 		self.rowconfigure(0, weight=1, minsize=self.frameSize+4)
 
+		# no image, ex: headings
+		if self.image == None:
+			self.imageComponent.grid_remove()
+			self.columnconfigure(0, minsize=0)
+
 #---
-	def setImage(self, newImg: CTkImage)-> None:
+	def setImage(self, newImg: CTkImage | None)-> None:
+		""" None hides the image. """
+		if newImg is self.image:
+			return
+
 		self.image = newImg
-		self.imageComponent.configure(image=self.image)
+		if self.image == None:
+			self.imageComponent.grid_remove()
+			self.columnconfigure(0, minsize=0)
+		else:
+			self.imageComponent.configure(image=self.image)
+			self.imageComponent.grid()
+			self.columnconfigure(0, minsize=int(self.frameSize*1.5+8))
 
 #---
 	def setText(self, newText: str) -> None:
+		if newText == self.text:
+			return
 		self.text = newText
 		self.textComponent.configure(text=self.text)
 
@@ -287,7 +437,7 @@ class InfoModalWindow(customtkinter.CTkToplevel):
 		self.msgFrame = CTkFrame(master=self, fg_color='transparent')
 		self.msgFrame.grid(column=0, row=0, padx=20, pady=10, sticky='new')
 		# img
-		self.image = customtkinter.CTkImage(Image.open(os.path.join(CURRENT_FILE_DIR, './images/icon_info.png')), size=(32,32))
+		self.image = getImage('info', (32,32))
 		self.imageComponent = customtkinter.CTkLabel(master=self.msgFrame, text='', image=self.image, )
 		self.imageComponent.grid(column=0, row=0, padx=0, pady=0, sticky='ns')
 		# text
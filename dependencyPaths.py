@@ -0,0 +1,266 @@
+from urllib.parse import quote, unquote
+import json
+import os
+
+from imageStages import StageJob
+from objOptimizer import optimizeObj
+from verifiedCopy import HashingWriter
+
+# import type defs
+from concurrent.futures import Executor
+from collections.abc import Iterable
+from typing import BinaryIO, Callable, TextIO
+from os import PathLike
+
+# exts of the files whose references are rewritten on export, see rewriteDependencies
+REWRITTEN_EXTS = {'.obj', '.mtl', '.gltf'}
+# obj files are streamed in chunks of whole lines of about this size
+CHUNK_SIZE = 1024 * 1024
+
+# mtl statements taking a file, the file is the last argument after the options
+_MTL_MAP_STATEMENTS = {b'map_ka', b'map_kd', b'map_ks', b'map_ns', b'map_d', b'map_bump', b'map_disp', b'map_pr', b'map_pm', b'map_ps', b'map_ke', b'map_rma', b'map_orm', b'map_aat', b'bump', b'disp', b'decal', b'refl', b'norm'}
+# mtl map option -> (min, max) argument count
+_MTL_MAP_OPTIONS = {b'-blendu': (1, 1), b'-blendv': (1, 1), b'-boost': (1, 1), b'-cc': (1, 1), b'-clamp': (1, 1), b'-bm': (1, 1), b'-imfchan': (1, 1), b'-texres': (1, 1), b'-type': (1, 1), b'-mm': (2, 2), b'-o': (1, 3), b'-s': (1, 3), b'-t': (1, 3)}
+
+#---------------------------------------------------------------------------------------------------
+def dispatchPathRewrite(executor: Executor, inputPath: PathLike[str] | str, fileNames: Iterable[str], outputPath: PathLike[str] | str, pathMap: dict[str, str] | None, onComplete: Callable[[dict, dict], None] | None = None, objSettings: dict | None = None) -> StageJob:
+	""" rewrites the references of every file on the executor, written to the output dir under the same name. \n
+	pathMap, objSettings - see rewriteDependencies \n
+	onComplete - see StageJob, results are the reports of rewriteDependencies
+	"""
+
+	# sub function
+	@staticmethod
+	def _reportResults(job: StageJob, results: dict, errors: dict) -> None:
+		for (fileName, report) in results.items():
+			for (reference, newReference) in report['changed']:
+				job.messages.append(f'{fileName}: {reference} -> {newReference}')
+			for reference in report['unresolved']:
+				job.messages.append(f'{fileName}: unresolved reference {reference}')
+			if 'optimized' in report:
+				job.messages.append(f'{fileName}: {_formatCounts(report["optimized"]["before"])} -> {_formatCounts(report["optimized"]["after"])}, {report["optimized"]["degenerateFaces"]} degenerate faces dropped')
+		if onComplete != None:
+			onComplete(results, errors)
+
+	# main function
+	os.makedirs(outputPath, exist_ok=True)
+	tasks = {}
+	for fileName in fileNames:
+		sourcePath = os.path.abspath(os.path.join(inputPath, fileName))
+		tasks[executor.submit(rewriteDependencies, sourcePath, os.path.join(os.path.abspath(outputPath), fileName), pathMap, objSettings)] = fileName
+
+	job = StageJob('rewritePaths', inputPath, outputPath, tasks)
+	job.onComplete = lambda results, errors: _reportResults(job, results, errors)
+	return job
+
+#-
+def rewriteDependencies(sourcePath: str, outputPath: str, pathMap: dict[str, str] | None, objSettings: dict | None = None) -> dict:
+	""" copies an obj, mtl or gltf file, rewriting its references to other files to where they are exported. \n
+	obj files are streamed in chunks and mtl files line by line, in constant memory, gltf files are parsed as a whole since their binary data lives in separate files. \n
+	a reference is resolved relative to the source file, or by file name if that does not match an exported file (ex: an absolute path from another machine). \n
+	pathMap - absolute source path -> absolute export path, of every exported file, None to keep the references as is \n
+	objSettings - obj files are optimized while rewritten if specified, see objOptimizer.optimizeObj \n
+	the output is hashed as it is written, its digest is reported for the preset's manifest. \n
+	returns {'changed': [[reference, new reference], ...], 'unresolved': [reference, ...], 'output': {'digest', 'bytes', 'method'}}, optimized obj files add 'optimized': see optimizeObj
+	"""
+	report = {'changed': [], 'unresolved': []}
+	resolver = _Resolver(os.path.dirname(sourcePath), os.path.dirname(outputPath), pathMap, report)
+
+	# written to a temp file then renamed, an interrupted export never leaves a partial file behind
+	tempPath = f'{outputPath}.tmp'
+	ext = os.path.splitext(sourcePath)[1].lower()
+	try:
+		with open(sourcePath, 'rb') as source, open(tempPath, 'wb') as outputFile:
+			output = HashingWriter(outputFile)
+			if ext == '.gltf':
+				_rewriteGltf(source, output, resolver)
+			elif ext == '.obj' and objSettings != None:
+				report['optimized'] = optimizeObj(source, output, objSettings, (lambda line: _rewriteObjLine(line, resolver)) if pathMap != None else None)
+			elif ext == '.obj':
+				_rewriteObj(source, output, resolver)
+			else:
+				for line in source:
+					output.write(_rewriteMtlLine(line, resolver))
+		report['output'] = output.getReport('rewritePaths')
+		os.replace(tempPath, outputPath)
+	finally:
+		if os.path.exists(tempPath):
+			os.remove(tempPath)
+
+	return report
+
+#-
+def writeRewriteStats(reports: dict[str, dict], file: TextIO) -> None:
+	""" writes a dependency path section to a stats file. \n
+	reports - rewritten file path -> see rewriteDependencies
+	"""
+	file.write('Dependency paths:\n')
+	for (path, report) in reports.items():
+		file.write(f'  {path}: {len(report["changed"])} changed, {len(report["unresolved"])} unresolved\n')
+		for (reference, newReference) in report['changed']:
+			file.write(f'    {reference} -> {newReference}\n')
+		for reference in report['unresolved']:
+			file.write(f'    unresolved: {reference}\n')
+		if 'optimized' in report:
+			file.write(f'    optimized: {_formatCounts(report["optimized"]["before"])} -> {_formatCounts(report["optimized"]["after"])}, {report["optimized"]["degenerateFaces"]} degenerate faces dropped\n')
+	file.write('\n')
+
+#---------------------------------------------------------------------------------------------------
+class _Resolver():
+	""" maps references from a source file to its exported copy. """
+
+	def __init__(self, sourceDir: str, outputDir: str, pathMap: dict[str, str] | None, report: dict) -> None:
+		self.sourceDir = sourceDir
+		self.outputDir = outputDir
+		self.pathMap = pathMap
+		self.report = report
+		# file name -> export path, None if several exported files share the name, built on first use
+		self._nameIndex = None
+
+#---
+	def resolve(self, reference: str) -> str:
+		""" returns the reference to use in the exported copy, the original one if unresolved or without pathMap. """
+		if self.pathMap == None:
+			return reference
+
+		# windows separators are common in files authored on windows
+		normalizedReference = reference.replace('\\', '/')
+		exportPath = self.pathMap.get(os.path.normpath(os.path.join(self.sourceDir, normalizedReference)))
+
+		if exportPath == None:
+			if self._nameIndex == None:
+				self._nameIndex = {}
+				for path in self.pathMap.values():
+					name = os.path.basename(path)
+					self._nameIndex[name] = None if name in self._nameIndex else path
+			exportPath = self._nameIndex.get(normalizedReference.rsplit('/', 1)[-1])
+
+		if exportPath == None:
+			self.report['unresolved'].append(reference)
+			return reference
+
+		newReference = os.path.relpath(exportPath, self.outputDir).replace(os.sep, '/')
+		if newReference != normalizedReference:
+			self.report['changed'].append([reference, newReference])
+			return newReference
+		return reference
+
+#---------------------------------------------------------------------------------------------------
+# line rewriters, each takes and returns a line including its line ending
+
+def _splitLineEnding(line: bytes) -> tuple[bytes, bytes]:
+	content = line.rstrip(b'\r\n')
+	return (content, line[len(content):])
+
+#-
+def _rewriteObj(source: BinaryIO, output: BinaryIO, resolver: _Resolver) -> None:
+	""" only chunks containing a mtllib statement are split into lines, the vertex data making up nearly all of the file is written as is. """
+	remainder = b''
+	while True:
+		chunk = source.read(CHUNK_SIZE)
+		if len(chunk) == 0:
+			break
+
+		# split after the last whole line, the rest goes with the next chunk
+		data = remainder + chunk
+		lineEnd = data.rfind(b'\n') + 1
+		(data, remainder) = (data[:lineEnd], data[lineEnd:])
+		if b'mtllib' in data:
+			data = b''.join(_rewriteObjLine(line, resolver) for line in data.splitlines(keepends=True))
+		output.write(data)
+
+	if len(remainder) != 0:
+		output.write(_rewriteObjLine(remainder, resolver))
+
+#-
+def _rewriteObjLine(line: bytes, resolver: _Resolver) -> bytes:
+	if not line.startswith(b'mtllib'):
+		return line
+
+	(content, lineEnding) = _splitLineEnding(line)
+	statement = content.split(None, 1)
+	if statement[0] != b'mtllib' or len(statement) == 1:
+		return line
+
+	# several files separated by spaces, unless the whole argument is a single file with spaces in its name
+	argument = statement[1].strip()
+	references = [argument] if b' ' not in argument or _isExported(argument, resolver) else argument.split()
+	newReferences = [_resolveBytes(reference, resolver) for reference in references]
+	if newReferences == references:
+		return line
+	return b'mtllib ' + b' '.join(newReferences) + lineEnding
+
+#-
+def _rewriteMtlLine(line: bytes, resolver: _Resolver) -> bytes:
+	(content, lineEnding) = _splitLineEnding(line)
+	tokens = content.split()
+	if len(tokens) < 2 or tokens[0].lower() not in _MTL_MAP_STATEMENTS:
+		return line
+
+	# skip the options, the rest is the file name, which may contain spaces
+	i = 1
+	while i < len(tokens) - 1 and tokens[i].lower() in _MTL_MAP_OPTIONS:
+		(minArgs, maxArgs) = _MTL_MAP_OPTIONS[tokens[i].lower()]
+		i += 1 + minArgs
+		for _ in range(maxArgs - minArgs):
+			if i < len(tokens) - 1 and _isNumber(tokens[i]):
+				i += 1
+	if i >= len(tokens):
+		return line
+
+	# keep everything before the file name as is, ex: indentation and option formatting
+	position = 0
+	for token in tokens[:i]:
+		position = content.index(token, position) + len(token)
+	referenceStart = content.index(tokens[i], position)
+	reference = content[referenceStart:].rstrip()
+	newReference = _resolveBytes(reference, resolver)
+	if newReference == reference:
+		return line
+	return content[:referenceStart] + newReference + lineEnding
+
+#-
+def _rewriteGltf(source: BinaryIO, output: BinaryIO, resolver: _Resolver) -> None:
+	data = source.read()
+	gltf = json.loads(data)
+
+	isChanged = False
+	for key in ('buffers', 'images'):
+		for item in gltf.get(key, ()):
+			uri = item.get('uri')
+			# embedded data
+			if uri == None or uri.startswith('data:'):
+				continue
+			reference = unquote(uri)
+			newReference = resolver.resolve(reference)
+			if newReference != reference:
+				item['uri'] = quote(newReference)
+				isChanged = True
+
+	# re-serializing would reformat the whole file, ex: a minified gltf, only done when a uri changed
+	if not isChanged:
+		output.write(data)
+		return
+	output.write(json.dumps(gltf, indent=2, ensure_ascii=False).encode('utf-8'))
+
+#-
+def _resolveBytes(reference: bytes, resolver: _Resolver) -> bytes:
+	# undecodable bytes are kept as is through surrogateescape
+	return resolver.resolve(reference.decode('utf-8', 'surrogateescape')).encode('utf-8', 'surrogateescape')
+
+#-
+def _isExported(reference: bytes, resolver: _Resolver) -> bool:
+	path = os.path.normpath(os.path.join(resolver.sourceDir, reference.decode('utf-8', 'surrogateescape').replace('\\', '/')))
+	return path in resolver.pathMap or os.path.isfile(path)
+
+#-
+def _formatCounts(counts: dict) -> str:
+	return ', '.join(f'{count} {name}' for (name, count) in counts.items())
+
+#-
+def _isNumber(token: bytes) -> bool:
+	try:
+		float(token)
+		return True
+	except ValueError:
+		return False
@@ -0,0 +1,131 @@
+import threading
+import json
+import os
+
+# import type defs
+from os import PathLike
+
+#---------------------------------------------------------------------------------------------------
+class ExportJournal():
+	""" append-only record of the files of a preset's export that are written, one json object per line. \n
+	a line is appended as soon as a file is in place, ie: after its temp file was renamed, a crash loses at most the files being written. \n
+	lines are flushed to the os but not synced, they survive the process dying, not necessarily the machine. \n
+	the last line is {'complete': true} once every file of the export succeeded, see complete. \n
+	entries: {'path': export path relative to the preset dir, 'job': job name (ex: 'copy'), 'source': [size, mtime], 'output': size, 'report': job result} \n
+	a file removed from the export is recorded as {'path': export path, 'removed': true}, see remove.
+	"""
+
+	def __init__(self, journalPath: PathLike[str] | str, resume: bool = False) -> None:
+		""" resume - keep the entries of the previous export and append to it, otherwise the journal starts over. """
+		self.journalPath = journalPath
+		# export path -> entry
+		self.entries = loadJournal(journalPath)[0] if resume else {}
+		# written to by the worker threads, see record
+		self._lock = threading.Lock()
+
+		os.makedirs(os.path.dirname(journalPath), exist_ok=True)
+		isLineCut = resume and _endsWithoutNewline(journalPath)
+		self._file = open(journalPath, 'a' if resume else 'w', encoding='utf-8')
+		# a line cut short by a crash is ended, the next entry would otherwise be appended to it and lost with it
+		if isLineCut:
+			self._file.write('\n')
+			self._file.flush()
+
+#---
+	def isDone(self, exportPath: str, sourcePath: PathLike[str] | str, outputPath: PathLike[str] | str) -> bool:
+		""" whether a file was written by a previous run from the same source, and is still there as written. """
+		entry = self.entries.get(exportPath)
+		if entry == None:
+			return False
+		try:
+			return entry['source'] == _fileIdentity(sourcePath) and entry['output'] == os.path.getsize(outputPath)
+		except OSError:
+			return False
+
+#-
+	def record(self, exportPath: str, jobName: str, sourcePath: PathLike[str] | str, outputPath: PathLike[str] | str, report: dict | list | None = None) -> None:
+		""" appends a written file, thread safe. """
+		entry = {'path': exportPath, 'job': jobName, 'source': _fileIdentity(sourcePath), 'output': os.path.getsize(outputPath), 'report': report}
+		line = json.dumps(entry) + '\n'
+		with self._lock:
+			# ex: a late copy finishing after the export was closed
+			if self._file == None:
+				return
+			self._file.write(line)
+			self._file.flush()
+			self.entries[exportPath] = entry
+
+#-
+	def remove(self, exportPath: str) -> None:
+		""" forgets a written file, ex: its output was deleted since its source is no longer exported, thread safe. """
+		line = json.dumps({'path': exportPath, 'removed': True}) + '\n'
+		with self._lock:
+			if self._file == None:
+				return
+			self._file.write(line)
+			self._file.flush()
+			self.entries.pop(exportPath, None)
+
+#-
+	def complete(self) -> None:
+		""" marks the export as complete, a resumed export then has nothing left to do. """
+		with self._lock:
+			if self._file != None:
+				self._file.write(json.dumps({'complete': True}) + '\n')
+				self._file.flush()
+
+#-
+	def close(self) -> None:
+		with self._lock:
+			if self._file != None:
+				self._file.close()
+				self._file = None
+
+#---------------------------------------------------------------------------------------------------
+def loadJournal(journalPath: PathLike[str] | str) -> tuple[dict[str, dict], bool]:
+	""" returns (export path -> entry, whether the export completed), ({}, False) if there is no journal. \n
+	a line cut short by a crash is ignored, like every line that is not valid json.
+	"""
+	entries = {}
+	isComplete = False
+	try:
+		with open(journalPath, encoding='utf-8') as file:
+			for line in file:
+				try:
+					entry = json.loads(line)
+				except ValueError:
+					continue
+				if entry.get('complete'):
+					isComplete = True
+				elif entry.get('removed'):
+					entries.pop(entry.get('path'), None)
+					isComplete = False
+				elif 'path' in entry:
+					entries[entry['path']] = entry
+					isComplete = False
+	except OSError:
+		pass
+	return (entries, isComplete)
+
+#-
+def isExportUnfinished(journalPath: PathLike[str] | str) -> bool:
+	""" whether a journal records an export that was cancelled, failed or interrupted. """
+	if not os.path.isfile(journalPath):
+		return False
+	return not loadJournal(journalPath)[1]
+
+#-
+def _endsWithoutNewline(path: PathLike[str] | str) -> bool:
+	try:
+		with open(path, 'rb') as file:
+			if file.seek(0, os.SEEK_END) == 0:
+				return False
+			file.seek(-1, os.SEEK_END)
+			return file.read(1) != b'\n'
+	except OSError:
+		return False
+
+#-
+def _fileIdentity(path: PathLike[str] | str) -> list[int]:
+	fileStat = os.stat(path)
+	return [fileStat.st_size, fileStat.st_mtime_ns]
@@ -1,15 +1,19 @@
 #from __future__ import annotations
+import sys
 import os
 from dataclasses import *
+from abc import ABCMeta
+from collections import Counter
+from itertools import repeat
 
 # import type defs
 from types import GenericAlias, UnionType
-from collections.abc import Iterable
+from collections.abc import Collection, Iterable
 from typing import Callable, Any
 from os import PathLike
 
 
-@dataclass
+@dataclass(slots = True)
 class FileDataBaseClass():
 	name: str
 
@@ -19,144 +23,266 @@ class FileDataBaseClass():
 
 #-
 	def _TypeVerificaton(self) -> None:
-		# sub function
-		@staticmethod
-		def _checkType(name, itemTypes: tuple, value) -> None:
-			""" typecheck for value and its components. """
-			"""
-			given: list[tuple[str | int] | str]] | set[str]
-			and acounting for all possible value type:
-
-			list ->
-				baseTypes = (list, set)
-				subTypes  = (tuple[str | int], str)
-
-				list[tuple] ->
-					baseTypes = (tuple, str)
-					subTypes  = (str, int)
-					
-					list[tuple[str]] ->
-						baseTypes = (str, int)
-						subTypes  = None
-
-					list[tuple[int]] ->
-						baseTypes = (str, int)
-						subTypes  = None
-
-				list[str] -> baseTypes = (tuple, str)
-						subTypes  = None
-			
-			set ->
-				baseTypes = (list, set)
-				subTypes  = (str)
-
-				set[str] ->
-					baseTypes = (str)
-					subTypes  = None
-			"""
-
-			baseTypes = list()
-			subTypes = None
-
-			# extract types from Unions
-			flatenedItemTypes = list()
-			for itemType in itemTypes:
-				if isinstance(itemType, UnionType):
-					flatenedItemTypes.extend(itemType.__args__)
-				else:
-					flatenedItemTypes.append(itemType)
-
-			for itemType in flatenedItemTypes:
-				# account for parameterized generic typedefs
-				if isinstance(itemType, GenericAlias):
-					baseTypes.append(itemType.__origin__)
-					# get subtypes only if value matches current basetype, to account for multiple subtype groups
-					if isinstance(value, itemType.__origin__):
-						subTypes = itemType.__args__
-				else:
-					baseTypes.append(itemType)
-
-			if not isinstance(value, tuple(baseTypes)):
-				raise TypeError(f'Expected {name} to be {baseTypes}, got {type(value)}.')
-
-			if subTypes != None:
+		""" typecheck for all fields and their components. """
+		for (fieldName, validator) in _getValidators(type(self)):
+			validator(getattr(self, fieldName))
+
+#---------------------------------------------------------------------------------------------------
+# type verification
+
+# dataclass -> ((field name, validator), ...), see _getValidators
+_validatorCache = {}
+# dataclass -> {field name: validator}, see _getFieldValidator
+_fieldValidatorCache = {}
+
+def _getValidators(cls: type) -> tuple:
+	""" validators for each field of a dataclass, annotations are only resolved once per class. """
+	validators = _validatorCache.get(cls)
+	if validators == None:
+		validators = tuple((classField.name, _compileValidator(classField.name, (classField.type,))) for classField in fields(cls))
+		_validatorCache[cls] = validators
+	return validators
+
+#-
+def _getFieldValidator(cls: type, fieldName: str) -> Callable[[Any], None]:
+	""" validator of a single field of a dataclass, ex: to check a value before assigning it. """
+	validators = _fieldValidatorCache.get(cls)
+	if validators == None:
+		validators = dict(_getValidators(cls))
+		_fieldValidatorCache[cls] = validators
+	return validators[fieldName]
+
+#-
+def _compileValidator(name: str, itemTypes: tuple) -> Callable[[Any, bool], None]:
+	""" creates a typecheck function for value and its components. \n
+	given: list[tuple[str | int] | str] | set[str] \n
+	the value must be a list or a set, \n
+	if it is a list its items are checked against tuple[str | int] | str, recursively \n
+	if it is a set its items are checked against str
+	"""
+
+	baseTypes = []
+	# (generic base type, item validator)
+	itemValidators = []
+
+	# extract types from Unions
+	flatenedItemTypes = []
+	for itemType in itemTypes:
+		if isinstance(itemType, UnionType):
+			flatenedItemTypes.extend(itemType.__args__)
+		else:
+			flatenedItemTypes.append(itemType)
+
+	for itemType in flatenedItemTypes:
+		# generics that are not containers (ex: PathLike[str]) have no items to check, only their base type
+		if isinstance(itemType, GenericAlias) and not issubclass(itemType.__origin__, Collection):
+			baseTypes.append(itemType.__origin__)
+		# account for parameterized generic typedefs
+		elif isinstance(itemType, GenericAlias):
+			baseTypes.append(itemType.__origin__)
+			# ignore the ellipsis of variable length tuples, ex: tuple[str, ...]
+			subTypes = tuple(subType for subType in itemType.__args__ if subType is not Ellipsis)
+			itemValidators.append((itemType.__origin__, _compileValidator(f'item in {name}', subTypes)))
+		else:
+			baseTypes.append(itemType)
+
+	# plain classes first, isinstance only reaches the slower abc checks (ex: PathLike) for values that are not one of them
+	baseTypes = tuple(sorted(baseTypes, key=lambda baseType: isinstance(baseType, ABCMeta)))
+
+	def _validator(value) -> None:
+		if not isinstance(value, baseTypes):
+			raise TypeError(f'Expected {name} to be {list(baseTypes)}, got {type(value)}.')
+
+		for (genericType, itemValidator) in itemValidators:
+			# get subtypes only if value matches current basetype, to account for multiple subtype groups
+			if isinstance(value, genericType):
+				# items without subtypes are checked in bulk, the slow path only runs to raise the error
+				if itemValidator.isLeaf and all(map(isinstance, value, repeat(itemValidator.baseTypes))):
+					return
 				for item in value:
-					_checkType(f'item in {name}', tuple(subTypes), item)
+					itemValidator(item)
+				return
+
+	_validator.baseTypes = baseTypes
+	_validator.itemValidators = itemValidators
+	_validator.isLeaf = len(itemValidators) == 0
+	return _validator
 
-		# main function
-		for field in fields(self):
-			_checkType(field.name, (field.type,), getattr(self, field.name))
+#-
+def _internName(name: PathLike[str] | str) -> PathLike[str] | str:
+	""" the shared copy of a file name, ex: a rescan returns new strings for the same names. \n
+	only exact str can be interned, other names are kept as is.
+	"""
+	return sys.intern(name) if type(name) is str else name
 
 # type def
 FileDataType = FileDataBaseClass
 
 
-@dataclass
+# slots since collections can hold a very large number of files
+@dataclass(slots = True)
 class FileCollection(FileDataBaseClass):
 	""" collection of files in a directory. \n
+	file names are unique within a collection, adding an already present name has no effect. \n
+	file names are interned, the same name is a single string shared by files, metadata, fileSizes and other collections. \n
 
 	name - name of the file collection, ex: 'images' \n
 	dirPath - path to the directory the files are stores in, ex: '../a/b/' \n
 	files - list of file names, ex: ['textFile.txt', 'imageFile.png'] \n
 	fileExts - set of extentions present in files, ex: {'.png', '.txt'} \n
+	version - incremented every time files changes \n
+	metadata - file name -> data read from the file, ex: TextureMetadata, see textureMetadata.readCollectionMetadata \n
+	fileSizes - file name -> size in bytes, as of the last scan, see FileManager.reloadInputFiles \n
 	"""
 
 	dirPath: PathLike | str
 	files: list[PathLike[str] | str] = field(default_factory = list)
 	# not set by user
 	fileExts: set[str] = field(default_factory = set, init = False)
+	version: int = field(default = 0, init = False)
+	metadata: dict = field(default_factory = dict, init = False, repr = False, compare = False)
+	fileSizes: dict = field(default_factory = dict, init = False, repr = False, compare = False)
+	# file name -> position in files, ext -> number of files with that ext
+	_positions: dict = field(default_factory = dict, init = False, repr = False, compare = False)
+	_extCounts: dict = field(default_factory = dict, init = False, repr = False, compare = False)
 
 #-
 	def __post_init__(self) -> None:
-		super().__post_init__()
+		# NOTE: zero argument super() does not work in slots dataclasses
+		FileDataBaseClass.__post_init__(self)
 	
 		# verify dir path
 		self.dirPath = os.path.normpath(self.dirPath)
 		if not os.path.isdir(self.dirPath):
 			raise ValueError(f'dirPath must be a valid directory.')
 		
-		# clean up file names
-		for i in range(len(self.files)):
-			self.files[i] = os.path.basename(self.files[i])
+		# clean up file names, only needed for paths
+		for i, fileName in enumerate(self.files):
+			if not isinstance(fileName, str) or os.sep in fileName or (os.altsep != None and os.altsep in fileName):
+				self.files[i] = os.path.basename(fileName)
 
 		self.recalculateImplicitData()
 
 #-
 	def recalculateImplicitData(self) -> None:
-		self.fileExts = {os.path.splitext(file)[1] for file in self.files}
+		""" rebuilds fileExts and the name index from files, removing duplicate names. \n
+		only needed if files was modified directly, add/remove/replaceFiles keep them up to date.
+		"""
+		# keeps the first occurrence of each name
+		uniqueFiles = dict.fromkeys(map(_internName, self.files))
+		self.files[:] = uniqueFiles
+
+		self._positions = dict(zip(self.files, range(len(self.files))))
+		# drop the metadata and sizes of files no longer present
+		for name in [name for name in self.metadata if name not in self._positions]:
+			del self.metadata[name]
+		for name in [name for name in self.fileSizes if name not in self._positions]:
+			del self.fileSizes[name]
+		# interned so every count shares the same ext string
+		self._extCounts = {sys.intern(ext): count for (ext, count) in Counter(os.path.splitext(fileName)[1] for fileName in self.files).items()}
+		self.fileExts.clear()
+		self.fileExts.update(self._extCounts)
+		self.version += 1
+
+#-
+	def _countExt(self, fileName: str, delta: int) -> None:
+		""" updates the ext multiset and fileExts for an added (1) or removed (-1) file. """
+		# interned so every count shares the same ext string
+		ext = sys.intern(os.path.splitext(fileName)[1])
+		count = self._extCounts.get(ext, 0) + delta
+
+		if count <= 0:
+			self._extCounts.pop(ext, None)
+			self.fileExts.discard(ext)
+		else:
+			self._extCounts[ext] = count
+			self.fileExts.add(ext)
 
 #-
 	def add(self, fileName: PathLike[str] | str | Iterable[PathLike[str] | str]) -> None:
 		""" add a file to the files list"""
 		if isinstance(fileName, (PathLike, str)):
-			self.files.append(os.path.basename(fileName))
+			fileNames = (fileName,)
 		elif isinstance(fileName, Iterable):
-			self.files.extend([os.path.basename(file) for file in fileName])
+			fileNames = fileName
 		else:
 			raise TypeError(f'Expected fileName to be PathLike[str] | str | Iterable[PathLike[str] | str], got {type(fileName)}.')
-		self.recalculateImplicitData()
+
+		isFilesUpdated = False
+		for name in fileNames:
+			name = _internName(os.path.basename(name))
+			if name in self._positions:
+				continue
+
+			self._positions[name] = len(self.files)
+			self.files.append(name)
+			self._countExt(name, 1)
+			isFilesUpdated = True
+
+		if isFilesUpdated:
+			self.version += 1
 
 #-
 	def remove(self, fileName: PathLike[str] | str) -> None:
-		""" remove the first file matching the provided name from the files list. """
+		""" remove the file matching the provided name from the files list. \n
+		NOTE: the last file takes the place of the removed one, files order is not preserved.
+		"""
 		try:
-			self.files.remove(os.path.basename(fileName))
-			isFilesUpdated = True
+			name = os.path.basename(fileName)
+			position = self._positions.pop(name)
 		except:
-			isFilesUpdated = False
+			return
 
-		if isFilesUpdated:
-			self.recalculateImplicitData()
+		# swap with the last file so that nothing needs to be shifted
+		lastName = self.files.pop()
+		if position != len(self.files):
+			self.files[position] = lastName
+			self._positions[lastName] = position
+
+		self._countExt(name, -1)
+		self.metadata.pop(name, None)
+		self.fileSizes.pop(name, None)
+		self.version += 1
 
+#-
 	def replaceFiles(self, files: Iterable[PathLike[str] | str]) -> None:
-		""" replaces all files in the collection. """
+		""" replaces all files in the collection. \n
+		the files are type checked like on construction.
+		"""
 		if not isinstance(files, Iterable):
 			raise TypeError(f'Expected files to be Iterable[PathLike[str] | str], got {type(files)}.')
 		
-		self.files.clear()
-		self.files.extend(files)
+		files = list(files)
+		_getFieldValidator(type(self), 'files')(files)
+		# keep the version as is if nothing changed, ex: reloading an unchanged dir
+		if files == self.files:
+			return
+
+		self.files[:] = files
 		self.recalculateImplicitData()
 
+#-
+	def getTotalSize(self, files: Iterable[str] | None = None) -> int:
+		""" summed size in bytes of some files, all files if None. \n
+		files without a known size (ie: added since the last scan) count as 0.
+		"""
+		if files == None:
+			return sum(self.fileSizes.values())
+		return sum(self.fileSizes.get(fileName, 0) for fileName in files)
+
+#-
+	def getExtCount(self, ext: str) -> int:
+		""" number of files with a given ext. """
+		return self._extCounts.get(ext, 0)
+
+#-
+	def __contains__(self, fileName: PathLike[str] | str) -> bool:
+		return os.path.basename(fileName) in self._positions
+
+#-
+	def __len__(self) -> int:
+		return len(self.files)
+
 
 # TODO: find a better name for this class
 @dataclass()
@@ -166,19 +292,77 @@ class PresetFileCollectionData(FileDataBaseClass):
 	name - name of the file collection, ex: 'images'\n
 	exportDirPath - the preset output path \n
 	requiredExts - set of required extentions, ex: {'.png', '.txt'} \n
-	requiredSuffix - list of required prefix placed prior to ext (case sensitive), ex: '_Color'
+	requiredSuffix - list of required prefix placed prior to ext (case sensitive), ex: '_Color' \n
+	requiredMetadata - requirements checked against fileCollection.metadata, ex: {'minResolution': [1920, 1080]}, see METADATA_CHECKS \n
+	collectionVersion - version of fileCollection this data was computed from
 	"""
 
 	fileCollection: FileCollection
 	exportDirPath: PathLike[str] | str
 	requiredExts: set[str] | None = None
 	requiredSuffixes: tuple[str, ...] | None = None
+	requiredMetadata: dict | None = None
+	# not set by user
+	collectionVersion: int = field(default = -1, init = False)
+	# suffix -> ext -> files, see _getIndex
+	_index: dict | None = field(default = None, init = False, repr = False, compare = False)
 
 #-
 	def __post_init__(self) -> None:
 		super().__post_init__()
 
 		self.exportDirPath = os.path.normpath(self.exportDirPath)
+		self.collectionVersion = self.fileCollection.version
+
+#-
+	def isStale(self) -> bool:
+		""" whether fileCollection changed since this data was computed. """
+		return self.collectionVersion != self.fileCollection.version
+
+#-
+	def refresh(self) -> None:
+		""" updates this data to the current state of fileCollection. """
+		self.collectionVersion = self.fileCollection.version
+		self._index = None
+
+#-
+	def buildIndex(self) -> None:
+		""" builds the classification index ahead of time, ex: on a background thread. """
+		self._getIndex()
+
+#-
+	def _getIndex(self) -> dict:
+		""" classifies every file once into suffix -> ext -> files buckets. \n
+		the None suffix bucket contains files matching any required suffix (all files if there are no required suffixes). \n
+		buckets are not filtered by requiredExts, rebuilt when fileCollection changes.
+		"""
+		if self.isStale():
+			self.refresh()
+		if self._index != None:
+			return self._index
+
+		index = {None: {}}
+		if self.requiredSuffixes != None:
+			for suffix in self.requiredSuffixes:
+				index[suffix] = {}
+
+		for fileName in self.fileCollection.files:
+			(baseName, extName) = os.path.splitext(fileName)
+
+			if self.requiredSuffixes == None:
+				index[None].setdefault(extName, []).append(fileName)
+				continue
+
+			isMatched = False
+			for suffix in self.requiredSuffixes:
+				if baseName.endswith(suffix):
+					index[suffix].setdefault(extName, []).append(fileName)
+					isMatched = True
+			if isMatched:
+				index[None].setdefault(extName, []).append(fileName)
+
+		self._index = index
+		return index
 
 	def _fileFilter(self, fileName: str, suffix: str | None) -> bool:
 		(baseName, extName) =  os.path.splitext(fileName)
@@ -210,10 +394,52 @@ class PresetFileCollectionData(FileDataBaseClass):
 		
 		self.requiredExts = exts
 		self.requiredSuffixes = suffixes
+		self._index = None
 
 #-
 	def getFilterdFiles(self, suffix: str | None = None) -> tuple[PathLike[str] | str, ...]:
-		return tuple(filter(lambda file: self._fileFilter(file, suffix=suffix), self.fileCollection.files))
+		""" files matching the requirments, in the order of fileCollection.files. \n
+		suffix - only match this suffix instead of any required suffix
+		"""
+		if self.requiredExts == None:
+			return ()
+
+		index = self._getIndex()
+		if self.requiredSuffixes == None:
+			# suffix has no effect without required suffixes
+			buckets = index[None]
+		elif suffix in index:
+			buckets = index[suffix]
+		else:
+			# not a required suffix, not indexed
+			return tuple(filter(lambda file: self._fileFilter(file, suffix=suffix), self.fileCollection.files))
+
+		# buckets are in collection order, a single one is already the result
+		matchedBuckets = [buckets[ext] for ext in self.requiredExts if ext in buckets]
+		if len(matchedBuckets) == 0:
+			return ()
+		if len(matchedBuckets) == 1:
+			return tuple(matchedBuckets[0])
+
+		# requiredExts is a set, its order would change from run to run
+		matchedFiles = set().union(*matchedBuckets)
+		return tuple(fileName for fileName in self.fileCollection.files if fileName in matchedFiles)
+
+#-
+	def getFileCount(self, ext: str, suffix: str | None = None) -> int:
+		""" number of files matching the requirments with a given ext. \n
+		suffix - only match this suffix instead of any required suffix
+		"""
+		if self.requiredExts == None or ext not in self.requiredExts:
+			return 0
+
+		index = self._getIndex()
+		if self.requiredSuffixes == None:
+			return len(index[None].get(ext, ()))
+		elif suffix in index:
+			return len(index[suffix].get(ext, ()))
+		else:
+			return sum(1 for file in self.getFilterdFiles(suffix) if file.endswith(ext))
 
 #-
 	def getPassingExt(self) -> set[str]:
@@ -229,20 +455,88 @@ class PresetFileCollectionData(FileDataBaseClass):
 		else:
 			return self.requiredExts.difference(self.fileCollection.fileExts)
 
+#-
+	def getMetadataFailures(self) -> dict[str, list[str]]:
+		""" checks the metadata of the filtered files against requiredMetadata. \n
+		the metadata must have been read beforehand, ex: with FileManager.loadCollectionMetadata, files without metadata fail. \n
+		returns file name -> reasons, only for failing files.
+		"""
+		if self.requiredMetadata == None:
+			return {}
+
+		failures = {}
+		for fileName in self.getFilterdFiles():
+			metadata = self.fileCollection.metadata.get(fileName)
+			if metadata == None:
+				failures[fileName] = ['no metadata']
+				continue
+
+			reasons = []
+			for (checkName, requirement) in self.requiredMetadata.items():
+				check = METADATA_CHECKS.get(checkName)
+				if check == None:
+					raise ValueError(f'unknown metadata requirement: {checkName}, expected one of: {", ".join(METADATA_CHECKS)}')
+				try:
+					reason = check(metadata, requirement)
+				except AttributeError:
+					reason = f'{checkName} unsupported for {metadata.format}'
+				if reason != None:
+					reasons.append(reason)
+			if len(reasons) != 0:
+				failures[fileName] = reasons
+
+		return failures
+
+#-
+# requirement name -> check(metadata, requirement), returns the failure reason or None
+# metadata is a textureMetadata.TextureMetadata or videoMetadata.VideoMetadata
+METADATA_CHECKS = {
+	'minResolution': lambda metadata, size: None if metadata.width >= size[0] and metadata.height >= size[1] else f'{metadata.width}x{metadata.height} below {size[0]}x{size[1]}',
+	'maxResolution': lambda metadata, size: None if metadata.width <= size[0] and metadata.height <= size[1] else f'{metadata.width}x{metadata.height} above {size[0]}x{size[1]}',
+	'powerOfTwo': lambda metadata, isRequired: None if not isRequired or metadata.isPowerOfTwo() else f'{metadata.width}x{metadata.height} not a power of two',
+	'minDuration': lambda metadata, seconds: None if metadata.duration >= seconds else f'{metadata.duration:.2f} s shorter than {seconds} s',
+	'minFps': lambda metadata, fps: None if metadata.fps != None and metadata.fps >= fps else f'{metadata.fps or 0:.2f} fps below {fps} fps',
+	'codecs': lambda metadata, codecs: None if metadata.codec in codecs else f'codec {metadata.codec} not in {", ".join(codecs)}',
+}
+
 @dataclass
 class FileCategory(FileDataBaseClass):
 	""" categorical collection of any fileDataTypes. \n
 
 	name - the name of the category, ex: 'images' \n
 	children - list containing references to either any fileDataType objects. \n
+	NOTE: use add/remove rather than modifying children directly, to keep the name index up to date.
 	"""
 	children: list[FileDataType] = field(default_factory = list)
+	# child name -> first child with that name
+	_childIndex: dict = field(default_factory = dict, init = False, repr = False, compare = False)
+
+#-
+	def __post_init__(self) -> None:
+		super().__post_init__()
 
+		for child in self.children:
+			self._childIndex.setdefault(child.name, child)
+
+#-
 	def get(self, name: str) -> FileDataType:
 		""" get child from name. """
-		for child in self.children:
-			if child.name == name:
-				return child
+		return self._childIndex.get(name)
+
+#-
+	def resolve(self, path: str) -> FileDataType | None:
+		""" get a descendant from its path of names, ex: 'imgs/beauty'. \n
+		returns None if any part of the path does not exist.
+		"""
+		item = self
+		for name in path.strip('/').split('/'):
+			if not isinstance(item, FileCategory):
+				return None
+			item = item._childIndex.get(name)
+			if item == None:
+				return None
+		return item
+
 #-
 	def add(self, item: FileDataType) -> None:
 		""" append a child to the chidren list."""
@@ -250,15 +544,27 @@ class FileCategory(FileDataBaseClass):
 			raise TypeError(f'Expected item to be a FileDataType, got {type(item)}')
 
 		self.children.append(item)
+		self._childIndex.setdefault(item.name, item)
 
 #-
 	def remove(self, childName: str) -> None:
 		""" remove the first occurence of a child who's name matches the privided one."""
+		child = self._childIndex.pop(childName, None)
+		if child == None:
+			return
+
+		# compared by identity, dataclass equality could match an other child
 		for i in range(len(self.children)):
-			if self.children[i].name == childName:
+			if self.children[i] is child:
 				self.children.pop(i)
 				break
 
+		# a later child with the same name takes its place in the index
+		for otherChild in self.children:
+			if otherChild.name == childName:
+				self._childIndex[childName] = otherChild
+				break
+
 #-
 	def foreach(self, func: Callable[[FileDataType, Any], Any | None], *args, breakOnReturn: bool = False) -> Any | None:
 		""" iterate over children. \n
@@ -0,0 +1,164 @@
+from bisect import bisect_left, bisect_right
+from fnmatch import fnmatchcase
+from array import array
+import re
+import os
+
+from fileDataClasses import FileCategory, FileCollection
+
+# import type defs
+from collections.abc import Iterator
+from os import PathLike
+
+# highest possible character, used as the upper bound of prefix ranges
+_MAX_CHAR = '\U0010ffff'
+# separates names in the substring search blob, cannot be part of a file name
+_NAME_SEPARATOR = '\0'
+# candidate sources matching more than 1/_DENSE_RATIO of all files are not used
+_DENSE_RATIO = 16
+# glob wildcards and character sets, ex: '*', '?', '[!abc]'
+_GLOB_WILDCARD_PATTERN = re.compile(r'[*?]|\[!?\]?[^\]]*\]')
+
+#---------------------------------------------------------------------------------------------------
+class FileSearchIndex():
+	""" search index of all files in a FileCategory structure, see FileManager.findFiles. \n
+	answers prefix, suffix, substring, glob and ext queries without scanning every file. \n
+	files are identified by their position in scan order, results are always yielded in that order.
+	"""
+
+	def __init__(self, files: FileCategory) -> None:
+
+		# sub function
+		@staticmethod
+		def _gatherCollections(collection, collections: list) -> None:
+			if isinstance(collection, FileCollection):
+				collections.append(collection)
+
+		# main function
+		self._collections = []
+		files.foreachRecursive(_gatherCollections, self._collections)
+		# used to detect changes made after the index was built
+		self._versions = [collection.version for collection in self._collections]
+
+		# per file data
+		self._names = []
+		self._collectionIds = array('I')
+		# ext -> ids
+		self._extMap = {}
+
+		for collectionId, collection in enumerate(self._collections):
+			for fileName in collection.files:
+				fileId = len(self._names)
+				self._names.append(fileName)
+				self._collectionIds.append(collectionId)
+				self._extMap.setdefault(os.path.splitext(fileName)[1], array('I')).append(fileId)
+
+		# sorted names and reversed names, for prefix and suffix ranges
+		prefixOrder = sorted(range(len(self._names)), key=self._names.__getitem__)
+		self._sortedNames = [self._names[fileId] for fileId in prefixOrder]
+		self._sortedIds = array('I', prefixOrder)
+
+		reversedNames = [fileName[::-1] for fileName in self._names]
+		suffixOrder = sorted(range(len(reversedNames)), key=reversedNames.__getitem__)
+		self._sortedReversedNames = [reversedNames[fileId] for fileId in suffixOrder]
+		self._sortedReversedIds = array('I', suffixOrder)
+
+		# all names in a single string, for substring search at C speed
+		self._blob = _NAME_SEPARATOR.join(self._names)
+		self._offsets = array('Q')
+		offset = 0
+		for fileName in self._names:
+			self._offsets.append(offset)
+			offset += len(fileName) + 1
+
+#---
+	def isStale(self) -> bool:
+		""" whether any indexed collection changed since the index was built. """
+		return any(collection.version != version for (collection, version) in zip(self._collections, self._versions))
+
+#-
+	def __len__(self) -> int:
+		return len(self._names)
+
+#---
+	def find(self, startsWith: str | None = None, endsWith: str | None = None, contains: str | None = None, pattern: str | None = None, ext: str | None = None) -> Iterator[PathLike[str] | str]:
+		""" lazily yields the path of every file matching all of the specified criteria, in scan order. \n
+		pattern - glob pattern matched against the file name (case sensitive), ex: '*_Normal??.png' \n
+		ext - extention including the dot, ex: '.obj'
+		"""
+		if startsWith == None and endsWith == None and contains == None and pattern == None and ext == None:
+			raise ValueError('at least one of the following arguments must be specified: startsWith, endsWith, contains, pattern, ext')
+
+		# the literal parts of a glob narrow the candidates the same way the other criteria do
+		globPrefix = globSuffix = globLiteral = ''
+		if pattern != None:
+			literals = _GLOB_WILDCARD_PATTERN.split(pattern)
+			if len(literals) == 1:
+				# no wildcards, exact name
+				globPrefix = globSuffix = pattern
+			else:
+				globPrefix = literals[0]
+				globSuffix = literals[-1]
+				globLiteral = max(literals, key=len)
+
+		prefix = max((startsWith or '', globPrefix), key=len)
+		suffix = max((endsWith or '', globSuffix), key=len)
+		substring = max((contains or '', globLiteral), key=len)
+
+		# pick the most selective candidate source, as (size, ids getter, whether ids are in scan order)
+		# range sizes are known without building them, ids in ranges need sorting before yielding
+		sources = []
+		if len(prefix) != 0:
+			(start, end) = self._prefixRange(self._sortedNames, prefix)
+			sources.append((end - start, lambda: sorted(self._sortedIds[start:end]), False))
+		if len(suffix) != 0:
+			(reversedStart, reversedEnd) = self._prefixRange(self._sortedReversedNames, suffix[::-1])
+			sources.append((reversedEnd - reversedStart, lambda: sorted(self._sortedReversedIds[reversedStart:reversedEnd]), False))
+		if ext != None:
+			extIds = self._extMap.get(ext, ())
+			sources.append((len(extIds), lambda: extIds, True))
+
+		(candidateCount, getCandidates, isOrdered) = min(sources, key=lambda source: source[0], default=(len(self._names), None, True))
+		# with many candidates, sorting them costs more than walking the files in order
+		# in order walks are also lazy, so the first matches come quickly
+		if getCandidates != None and (isOrdered or candidateCount * _DENSE_RATIO <= len(self._names)):
+			candidates = getCandidates()
+		elif len(substring) != 0:
+			candidates = self._substringIds(substring)
+		else:
+			candidates = range(len(self._names))
+
+		for fileId in candidates:
+			fileName = self._names[fileId]
+			if startsWith != None and not fileName.startswith(startsWith):
+				continue
+			if endsWith != None and not fileName.endswith(endsWith):
+				continue
+			if contains != None and contains not in fileName:
+				continue
+			if ext != None and os.path.splitext(fileName)[1] != ext:
+				continue
+			if pattern != None and not fnmatchcase(fileName, pattern):
+				continue
+			yield os.path.join(self._collections[self._collectionIds[fileId]].dirPath, fileName)
+
+#---
+	def _prefixRange(self, sortedNames: list[str], prefix: str) -> tuple[int, int]:
+		""" start and end positions of the names starting with prefix. """
+		start = bisect_left(sortedNames, prefix)
+		return (start, bisect_left(sortedNames, prefix + _MAX_CHAR, start))
+
+#-
+	def _substringIds(self, substring: str) -> Iterator[int]:
+		""" lazily yields the ids of names containing substring, in scan order. """
+		position = self._blob.find(substring)
+		while position != -1:
+			fileId = bisect_right(self._offsets, position) - 1
+			nameEnd = self._offsets[fileId] + len(self._names[fileId])
+			# matches spanning a separator are not part of a single name
+			if position + len(substring) <= nameEnd:
+				yield fileId
+				position = nameEnd + 1
+			else:
+				position += 1
+			position = self._blob.find(substring, position)
@@ -1,18 +1,41 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import subprocess
+import threading
 import platform
 import json
+import stat
+import time
+import sys
 import os
 
 from fileDataClasses import *
+from presetCache import PresetDataCache
+from fileIndex import FileSearchIndex
+from textureMetadata import readCollectionMetadata, readTextureMetadata
+from videoMetadata import readVideoMetadata
+from imageStages import IMAGE_STAGES, StageJob, dispatchImageStage
+from fileSizeStats import getPresetSizeStats
+from dependencyPaths import REWRITTEN_EXTS, dispatchPathRewrite
+from verifiedCopy import dispatchVerifiedCopy, writeManifest
+from exportJournal import ExportJournal, isExportUnfinished
+from copyConcurrency import MAX_CONCURRENCY, STATE_PATH, CopyConcurrencyController, getDeviceKey, loadConcurrencyState, saveConcurrencyState
+import metrics
 
 # import type defs
-from collections.abc import Iterable
+from concurrent.futures import Future
+from collections.abc import Iterable, Iterator
 from subprocess import Popen
 from os import PathLike
 
 #---------------------------------------------------------------------------------------------------
 class FileManager():
-	def __init__(self, basePath: PathLike, dirSettingsPath: PathLike, presetsSettingsPath: PathLike) -> None:
+	def __init__(self, basePath: PathLike, dirSettingsPath: PathLike, presetsSettingsPath: PathLike, dirSettings: dict | None = None, presetSettings: dict | None = None, deferScan: bool = False, imageStageWorkers: int | None = None, copyConcurrencyStatePath: PathLike[str] | str | None = STATE_PATH, copyConcurrencyShare: int = 1) -> None:
+		""" dirSettings, presetSettings - already parsed settings, skips reading the json files when specified (ex: batch processing). \n
+		deferScan - do not scan the input files, createinputFiles() must then be called before accessing them. \n
+		imageStageWorkers - see getImageStageExecutor \n
+		copyConcurrencyStatePath - where the copy concurrency learned by previous exports is read from and stored, None to neither (ex: benchmarks) \n
+		copyConcurrencyShare - number of FileManagers exporting at once (ex: batch workers), see getCopyController
+		"""
 		
 		# paths
 		self.basePath = basePath
@@ -20,19 +43,60 @@ class FileManager():
 		self.presetsSettingsPath = presetsSettingsPath
 
 		# input/output dirs
-		dirSettings = self.__fetchJsonData(self.dirSettingsPath)
-		self.outputDir = dirSettings.pop('output', './tmp/')
+		if dirSettings == None:
+			dirSettings = self.__fetchJsonData(self.dirSettingsPath)
+		else:
+			# copy since the output entry is poped
+			dirSettings = dict(dirSettings)
+		self.outputDir = self.resolvePath(dirSettings.pop('output', './tmp/'))
 		self.inputDirs = dirSettings
 		# presets
-		self.presets = self.__fetchJsonData(self.presetsSettingsPath)
+		self.presets = presetSettings if presetSettings != None else self.__fetchJsonData(self.presetsSettingsPath)
 
 		# init other vars
+		self.presetDataCache = PresetDataCache()
 		self.exportJobs = []
 		self.successfullJobs = []
 		self.failedJobs = []
+		# job -> (start time, output path, file count), only filled while metrics are enabled
+		self._jobMetrics = {}
+		# export sizing, see exportFiles and getExportProgress
+		# preset -> size stats of the files it exports, job -> bytes it processes
+		self.exportSizes = {}
+		self.jobByteCounts = {}
+		self.exportByteCount = 0
+		self.finishedByteCount = 0
+		# preset -> exported file path relative to outputDir -> references report, see dispatchPathRewrites
+		self.rewriteReports = {}
+		# preset -> {'files': {path: digest report}, 'failures': {path: error}}, paths relative to the preset dir, see copyFiles
+		self.manifests = {}
+		# see getImageStageExecutor and getCopyExecutor
+		self.imageStageWorkers = imageStageWorkers
+		self.imageStageExecutor = None
+		# device key -> thread pool and concurrency controller of the copies between those devices, see copyConcurrency
+		self.copyExecutors = {}
+		self.copyControllers = {}
+		# device key -> learned concurrency state, loaded on first use
+		self.copyConcurrencyStatePath = copyConcurrencyStatePath
+		self.copyConcurrencyShare = copyConcurrencyShare
+		self.copyConcurrencyState = None
+		# preset -> journal of its running export, closed once all jobs finished, see exportJournal
+		self.journals = {}
+		# preset -> number of files skipped by a resumed export since its journal records them as written
+		self.resumedFiles = {}
+		# preset -> number of outputs deleted by a pruning export since their file is no longer part of the preset
+		self.prunedFiles = {}
+		# system copy command job -> (preset, [(export path, source path, output path), ...]), journaled once the job succeeds
+		self._journaledCopies = {}
+		# see cancelExport
+		self.cancelEvent = threading.Event()
+		self.isExportCancelled = False
 
 		# generates self.files struct
-		self.createinputFiles()
+		self.files = None
+		self.fileIndex = None
+		if not deferScan:
+			self.createinputFiles()
 
 #---
 # input data management
@@ -42,18 +106,22 @@ class FileManager():
 		structure format: FileCategory[FileCollection | FileCategory[FileCollection]] \n
 		"""
 
+		# cached preset structures reference the previous collections
+		self.presetDataCache.invalidate()
+
+		# empty, filled by the scan, see scanCollection
 		self.files = FileCategory('inputFiles')
 		for directory in self.inputDirs:
 			if(type(self.inputDirs[directory]) is str):
 			# no sub-categories
-				self.files.add(FileCollection(directory, os.path.normpath(self.inputDirs[directory]), []))
+				self.files.add(FileCollection(directory, self.resolvePath(self.inputDirs[directory]), []))
 			else:
 			# with sub-categories
 				childCategory = FileCategory(directory)
 				self.files.add(childCategory)
 				for subDir in self.inputDirs[directory]:
 				# same as above, just one level down
-					childCategory.add(FileCollection(subDir, os.path.normpath(self.inputDirs[directory][subDir]), []))
+					childCategory.add(FileCollection(subDir, self.resolvePath(self.inputDirs[directory][subDir]), []))
 
 		self.reloadInputFiles()
 
@@ -65,15 +133,67 @@ class FileManager():
 
 		# sub function
 		@staticmethod
-		def _populateCollections(collection, basePath) -> None:
+		def _populateCollections(collection, fileManager: FileManager) -> None:
 			if isinstance(collection, FileCollection):
-				# get entries from dir
-				allEntries = os.listdir(os.path.join(basePath, collection.dirPath))
-				# filter out non file entries (ie: subdir)
-				collection.replaceFiles([entry for entry in allEntries if os.path.isfile(os.path.join(basePath, collection.dirPath, entry))])
+				fileManager.scanCollection(collection)
 		
 		# main function
-		self.files.foreachRecursive(_populateCollections, self.basePath)
+		with metrics.span('scan', basePath=self.basePath):
+			self.files.foreachRecursive(_populateCollections, self)
+			with metrics.span('buildFileIndex'):
+				self.fileIndex = FileSearchIndex(self.files)
+
+#-
+	def scanCollection(self, collection: FileCollection) -> None:
+		""" (re)loads the files of a single collection, ex: after a change in its dir. \n
+		its version is only incremented if its file names changed.
+		"""
+		with metrics.span('scanCollection', dirPath=collection.dirPath) as scanSpan:
+			# file name -> size, from the single stat needed to filter out non file entries (ie: subdir)
+			# NOTE: free on windows, where scandir already holds the stat data
+			fileSizes = {}
+			with os.scandir(collection.dirPath) as entries:
+				for entry in entries:
+					try:
+						entryStat = entry.stat()
+					except OSError:
+						# removed since listed, or broken link
+						continue
+					if stat.S_ISREG(entryStat.st_mode):
+						# interned like the collection's names, an unchanged rescan keeps no second copy of them
+						fileSizes[sys.intern(entry.name)] = entryStat.st_size
+
+			collection.replaceFiles(fileSizes)
+			collection.fileSizes = fileSizes
+			scanSpan.set(files=len(collection), bytes=sum(fileSizes.values()))
+
+#-
+	def loadCollectionMetadata(self, collectionPath: str, reader: Callable[[str], Any], eventName: str = 'collectionMetadata') -> FileCollection | None:
+		""" reads the metadata of every file in a collection into its metadata, see textureMetadata.readCollectionMetadata. \n
+		only changed files are read again on later calls. \n
+		collectionPath - path of the collection in the dir layout, ex: 'texs' or 'imgs/beauty' \n
+		reader - function reading the metadata of a file, ex: readTextureMetadata \n
+		eventName - name of the metrics event timing the read \n
+		returns the collection, None if not in the dir layout.
+		"""
+		collection = self.files.resolve(collectionPath)
+		if not isinstance(collection, FileCollection):
+			return None
+
+		with metrics.span(eventName, dirPath=collection.dirPath) as metadataSpan:
+			readCollectionMetadata(collection, reader)
+			metadataSpan.set(files=len(collection))
+		return collection
+
+#-
+	def loadTextureMetadata(self, collectionPath: str = 'texs') -> FileCollection | None:
+		""" reads the header metadata of every texture in a collection, see loadCollectionMetadata. """
+		return self.loadCollectionMetadata(collectionPath, readTextureMetadata, 'textureMetadata')
+
+#-
+	def loadVideoMetadata(self, collectionPath: str = 'vids') -> FileCollection | None:
+		""" reads the container metadata of every video in a collection, see loadCollectionMetadata. """
+		return self.loadCollectionMetadata(collectionPath, readVideoMetadata, 'videoMetadata')
 
 #---
 # file searching
@@ -81,38 +201,25 @@ class FileManager():
 		""" searches gathered input files for specific match. \n
 		returns the first match.
 		"""
-
-		# sub function
-		@staticmethod
-		def _matchFile(fileData: FileDataType, startsWith: str | None = None, endsWith: str | None = None, contains: str | None = None) -> PathLike[str] | str | None:
-			# get files
-			if isinstance(fileData, FileCollection):
-				files = fileData.files
-				basePath = fileData.dirPath
-			elif isinstance(fileData, PresetFileCollectionData):
-				files = fileData.fileCollection.files
-				basePath = fileData.fileCollection.dirPath
-			else:
-				return None
-
-			# find matching file
-			for fileName in files:
-				if startsWith != None and fileName.startswith(startsWith) != True:
-					continue
-				if endsWith != None and fileName.endswith(endsWith) != True:
-					continue
-				if contains != None and fileName.find(contains) == -1:
-					continue
-				# if passes all req return
-				return os.path.join(basePath, fileName)
-
-			return None
-
-		# main function
 		if startsWith == None and endsWith == None and contains == None:
 			raise ValueError('at least one of the following arguments must be specified: startsWith, EndsWith, Contains')
 
-		return self.files.foreachRecursive(_matchFile, startsWith, endsWith, contains, breakOnReturn = True)
+		return next(self.findFiles(startsWith, endsWith, contains), None)
+
+#-
+	def findFiles(self, startsWith: str | None = None, endsWith: str | None = None, contains: str | None = None, pattern: str | None = None, ext: str | None = None) -> Iterator[PathLike[str] | str]:
+		""" lazily yields the path of every gathered input file matching all of the specified criteria, in scan order. \n
+		pattern - glob pattern matched against the file name (case sensitive), ex: '*_Normal??.png' \n
+		ext - extention including the dot, ex: '.obj'
+		"""
+		return self.getFileIndex().find(startsWith, endsWith, contains, pattern, ext)
+
+#-
+	def getFileIndex(self) -> FileSearchIndex:
+		""" get the search index of the input files, rebuilt if the files changed since the last scan. """
+		if self.fileIndex == None or self.fileIndex.isStale():
+			self.fileIndex = FileSearchIndex(self.files)
+		return self.fileIndex
 
 #---
 # preset data management
@@ -121,8 +228,8 @@ class FileManager():
 		structure format: FileCategory[PresetFileCollectionData[FileCollection] | FileCategory[PresetFileCollectionData[FileCollection]]]
 		"""
 
-		# generates the data if not yet created
-		data = getattr(self, f'{preset}_presetData', None)
+		# generates the data if not yet created, or if the preset's definition changed
+		data = self.presetDataCache.get(preset, self.presets[preset])
 		if data == None:
 			data = self.generatePresetFileData(preset)
 		return data
@@ -136,62 +243,195 @@ class FileManager():
 
 		# sub function
 		@staticmethod
-		def _PresetFromInputData(parent: FileCategory, inputCollection: FileCollection | FileCategory, outputPath: PathLike[str] | str, suffixes: list | None, exts: set | None) -> None:
+		def _PresetFromInputData(parent: FileCategory, inputCollection: FileCollection | FileCategory, outputPath: PathLike[str] | str, suffixes: list | None, exts: set | None, metadataReqs: dict | None) -> None:
 			if isinstance(inputCollection, FileCollection):
 				if suffixes == None:
-					parent.add(PresetFileCollectionData(inputCollection.name, inputCollection, outputPath, exts, None))
+					parent.add(PresetFileCollectionData(inputCollection.name, inputCollection, outputPath, exts, None, metadataReqs))
 				else:
 					#for suffix in suffixes:
-					parent.add(PresetFileCollectionData(inputCollection.name, inputCollection, outputPath, exts, tuple(suffixes)))
+					parent.add(PresetFileCollectionData(inputCollection.name, inputCollection, outputPath, exts, tuple(suffixes), metadataReqs))
 
 			if isinstance(inputCollection, FileCategory):
 				child = FileCategory(inputCollection.name)
 				parent.add(child)
 
 				for subCollection in inputCollection.children:
-					_PresetFromInputData(child, subCollection, outputPath, suffixes, exts)
+					_PresetFromInputData(child, subCollection, outputPath, suffixes, exts, metadataReqs)
 
 		# main function
 		presetReqs = self.presets[preset]['req']
 		presetStruct = FileCategory(preset)
 
-		for category in self.files.children:
+		with metrics.span('presetData', preset=preset):
+			for category in self.files.children:
 
-			# get preset data for this category
-			outputPath = self.presets[preset]['output'].get(f'{category.name}', './default/')
-			reqSuffixes = presetReqs.get(f'{category.name}_suffix', None)
-			reqExts = presetReqs.get(f'{category.name}_format', None)
-			if reqExts != None:
-				reqExts = set(reqExts)
+				# get preset data for this category
+				outputPath = self.presets[preset]['output'].get(f'{category.name}', './default/')
+				reqSuffixes = presetReqs.get(f'{category.name}_suffix', None)
+				reqExts = presetReqs.get(f'{category.name}_format', None)
+				if reqExts != None:
+					reqExts = set(reqExts)
+				# checked against the metadata read by loadCollectionMetadata, see PresetFileCollectionData.getMetadataFailures
+				reqMetadata = presetReqs.get(f'{category.name}_metadata', None)
 
-			# populate structure
-			_PresetFromInputData(presetStruct, category, outputPath, reqSuffixes, reqExts)
+				# populate structure
+				_PresetFromInputData(presetStruct, category, outputPath, reqSuffixes, reqExts, reqMetadata)
 		
-		# asign and return result
-		setattr(self, f'{preset}_presetData', presetStruct)
+		# cache and return result
+		self.presetDataCache.set(preset, self.presets[preset], presetStruct)
 		return presetStruct
 
+#-
+	def getRequiredSuffixes(self, categoryName: str, presets: Iterable[str] | None = None) -> tuple[str, ...]:
+		""" suffixes required by any of the presets (all presets if None) for a category, ex: 'texs' -> ('BaseColor', 'Packed_MRA', ...). """
+		if presets == None:
+			presets = self.presets
+		suffixes = {}
+		for preset in presets:
+			for suffix in self.presets[preset]['req'].get(f'{categoryName}_suffix') or ():
+				suffixes.setdefault(suffix, None)
+		return tuple(suffixes)
+
 #---
 # file copying
 
-	def exportFiles(self, preset: str)-> None:
-		""" copies all files in a preset to their respective output dirs. """
+	def exportFiles(self, preset: str, resume: bool = False, prune: bool = False)-> None:
+		""" copies all files in a preset to their respective output dirs. \n
+		every written file is recorded in the preset's journal, see getJournalPath. \n
+		resume - skip the files the journal records as written from the same source by the previous export, ex: after a cancel or a crash \n
+		prune - with resume, delete the outputs the journal records for files no longer part of the preset, ex: their source was deleted, see pruneJournaledFiles
+		"""
+
+		# sub function
+		@staticmethod
+		def _copyPresetCollection(collection, fileManager: FileManager, presetName: str, replacedFiles: dict) -> None:
+			if isinstance(collection, PresetFileCollectionData):
+				files = collection.getFilterdFiles()
+				if id(collection) in replacedFiles:
+					files = [file for file in files if file not in replacedFiles[id(collection)]]
+				files = fileManager.skipJournaledFiles(presetName, collection, files)
+				fileManager.copyFiles(collection.fileCollection.dirPath, collection.exportDirPath, files, presetName, collection.fileCollection.getTotalSize(files))
+
+		# main function
+		# a new export, progress restarts
+		if self.getActiveJobCount() == 0:
+			self.exportByteCount = 0
+			self.finishedByteCount = 0
+			self.cancelEvent.clear()
+			self.isExportCancelled = False
+
+		with metrics.span('exportDispatch', preset=preset) as dispatchSpan:
+			presetFileData = self.getPresetFileData(preset)
+			self.manifests[preset] = {'files': {}, 'failures': {}}
+			self.resumedFiles[preset] = 0
+			self.prunedFiles[preset] = 0
+			if preset in self.journals:
+				self.journals[preset].close()
+			journal = ExportJournal(self.getJournalPath(preset), resume)
+			self.journals[preset] = journal
+			if prune:
+				self.pruneJournaledFiles(preset, presetFileData)
+			# files written by the previous export are part of this one's results
+			for (exportPath, entry) in journal.entries.items():
+				if entry['job'] == 'copy' and entry['report'] != None:
+					self.manifests[preset]['files'][exportPath] = entry['report']
+				elif entry['job'] == 'rewritePaths' and entry['report'] != None:
+					self.rewriteReports.setdefault(preset, {})[os.path.join(preset, exportPath)] = entry['report']
+					# journaled before rewrites were hashed
+					if 'output' in entry['report']:
+						self.manifests[preset]['files'][exportPath] = entry['report']['output']
+			# sized from the scan before anything is dispatched
+			self.exportSizes[preset] = getPresetSizeStats(presetFileData)
+			dispatchSpan.set(files=self.exportSizes[preset]['files'], bytes=self.exportSizes[preset]['bytes'])
+
+			# files written by image stages in place of their source are not copied
+			jobCount = len(self.exportJobs)
+			replacedFiles = self.dispatchImageStages(preset, presetFileData)
+			# neither are files written with their references rewritten
+			self.dispatchPathRewrites(preset, presetFileData, replacedFiles)
+			presetFileData.foreachRecursive(_copyPresetCollection, self, preset, replacedFiles)
+			dispatchSpan.set(resumedFiles=self.resumedFiles[preset])
+
+			# nothing to write (ex: empty preset, or resumed with every file journaled), no job will close the journal, see closeJournals
+			if len(self.exportJobs) == jobCount:
+				journal.complete()
+				journal.close()
+				del self.journals[preset]
+
+#-
+	def pruneJournaledFiles(self, preset: str, presetFileData: FileCategory) -> list[str]:
+		""" deletes the outputs the preset's journal records whose file is no longer part of the preset, returns their export paths. \n
+		only journaled outputs are known, ie: copies and path rewrites, image stage outputs are left in place. \n
+		an output that cannot be deleted stays journaled and is tried again by the next pruning export.
+		"""
 
 		# sub function
 		@staticmethod
-		def _copyPresetCollection(collection, copyFunc: Callable[[PathLike[str] | str, PathLike[str] | str, tuple[PathLike[str] | str, ...], str], None], presetName: str) -> None:
+		def _gatherExportPaths(collection, exportPaths: set) -> None:
 			if isinstance(collection, PresetFileCollectionData):
-				copyFunc(collection.fileCollection.dirPath, collection.exportDirPath, collection.getFilterdFiles(), presetName)
+				exportPaths.update(os.path.normpath(os.path.join(collection.exportDirPath, fileName)) for fileName in collection.getFilterdFiles())
 
 		# main function
-		presetFileData = self.getPresetFileData(preset)
-		presetFileData.foreachRecursive(_copyPresetCollection, self.copyFiles, preset)
+		journal = self.journals.get(preset)
+		if journal == None or len(journal.entries) == 0:
+			return []
+
+		exportPaths = set()
+		presetFileData.foreachRecursive(_gatherExportPaths, exportPaths)
+		prunedFiles = []
+		for exportPath in [exportPath for exportPath in journal.entries if exportPath not in exportPaths]:
+			try:
+				os.remove(os.path.join(self.outputDir, preset, exportPath))
+			except FileNotFoundError:
+				pass
+			except OSError as error:
+				print(f'could not prune {exportPath} from {preset}: {error}', file=sys.stderr)
+				continue
+			journal.remove(exportPath)
+			prunedFiles.append(exportPath)
+		self.prunedFiles[preset] = len(prunedFiles)
+		return prunedFiles
+
+#-
+	def skipJournaledFiles(self, preset: str, collection: PresetFileCollectionData, fileNames: Iterable[str]) -> list[str]:
+		""" the files of a collection still to export, ie: without those the preset's journal records as written, see exportFiles. """
+		journal = self.journals.get(preset)
+		if journal == None or len(journal.entries) == 0:
+			return list(fileNames)
+
+		outputPath = os.path.join(self.outputDir, f'{preset}/', collection.exportDirPath)
+		remainingFiles = []
+		for fileName in fileNames:
+			if journal.isDone(os.path.normpath(os.path.join(collection.exportDirPath, fileName)), os.path.join(collection.fileCollection.dirPath, fileName), os.path.join(outputPath, fileName)):
+				self.resumedFiles[preset] = self.resumedFiles.get(preset, 0) + 1
+			else:
+				remainingFiles.append(fileName)
+		return remainingFiles
+
+#-
+	def getExportSizeStats(self, preset: str) -> dict:
+		""" file count, byte totals, largest files and size histogram of the files a preset exports, see fileSizeStats.getPresetSizeStats. \n
+		computed from the sizes gathered by the scan, no file is accessed.
+		"""
+		return getPresetSizeStats(self.getPresetFileData(preset))
 
 #-
-	def copyFiles(self, inputPath: PathLike[str] | str, relOutputPath: PathLike[str] | str, files: Iterable[PathLike[str] | str], presetName: str = '.') -> None:
+	def getExportProgress(self) -> float | None:
+		""" fraction of the bytes of the dispatched export jobs that finished processing, from 0 to 1. \n
+		returns None if the jobs hold no data, ex: only empty files.
+		"""
+		if self.exportByteCount == 0:
+			return None
+		return self.finishedByteCount / self.exportByteCount
+
+#-
+	def copyFiles(self, inputPath: PathLike[str] | str, relOutputPath: PathLike[str] | str, files: Iterable[PathLike[str] | str], presetName: str = '.', byteCount: int | None = None) -> None:
 		""" copy some files. \n
 		full output path is as follows: \n
 		outputDir(as defined by dirSettings) -> presetName -> relOutputPath\n
+		byteCount - summed size of the files, ex: from FileCollection.getTotalSize, read from disk if None \n
+		files are hashed while copied and the copies verified, see verifiedCopy.copyAndVerify, their digests are stored in the preset's manifest. \n
+		setting the preset's 'verifyCopies' to false uses the system's copy command (cp/robocopy) instead, without manifest. \n
 		NOTE: created to work on window/linux/darwin. However has only been tested on windows.\n
 		"""
 
@@ -200,7 +440,7 @@ class FileManager():
 		def _copyFiles_Windows(basePath: PathLike, inputPath: PathLike, outputPath: PathLike, files: Iterable[PathLike]) -> Popen:
 			# for syntax info see: https://learn.microsoft.com/en-us/windows-server/administration/windows-commands/robocopy
 			# define program and paths
-			cmdArgs = ['robocopy', inputPath, outputPath]
+			cmdArgs = ['robocopy', os.path.abspath(inputPath), os.path.abspath(outputPath)]
 			# define files to copy
 			cmdArgs.extend(files)
 			# define copy options
@@ -217,23 +457,358 @@ class FileManager():
 			# define files to copy
 			cmdArgs.extend(files)
 			# define output path
-			cmdArgs.append(outputPath)
+			# NOTE: unlike robocopy, cp does not create missing dirs
+			os.makedirs(outputPath, exist_ok=True)
+			cmdArgs.append(os.path.abspath(outputPath))
 
 			return subprocess.Popen(cmdArgs, cwd=os.path.abspath(inputPath), stderr=subprocess.STDOUT, stdout=subprocess.PIPE)
 		
 		# main function
 		if len(files) == 0:
 			return
+		outputPath = os.path.join(self.outputDir, f'{presetName}/', relOutputPath)
+		if byteCount == None:
+			byteCount = sum(os.path.getsize(os.path.join(inputPath, file)) for file in files)
+
+		if self.presets.get(presetName, {}).get('verifyCopies', True):
+			deviceKey = getDeviceKey(inputPath, outputPath)
+			copyJob = dispatchVerifiedCopy(self.getCopyExecutor(deviceKey), inputPath, files, outputPath, lambda results, errors: self.recordManifest(presetName, relOutputPath, results, errors), self.cancelEvent, self.getCopyController(deviceKey))
+			self.journalJob(copyJob, presetName, relOutputPath)
 		# copy methods difer per platform
-		if platform.system() == "Windows":
-			copyJob = _copyFiles_Windows(self.basePath, inputPath, os.path.join(self.outputDir, f'{presetName}/', relOutputPath), files)
+		elif platform.system() == "Windows":
+			copyJob = _copyFiles_Windows(self.basePath, inputPath, outputPath, files)
 		elif platform.system() == "Darwin" or platform.system() == "Linux":
 			# darwin uses the same system as linux
-			copyJob = _copyFiles_Linux(inputPath, os.path.join(self.outputDir, f'{presetName}/', relOutputPath), files)
+			copyJob = _copyFiles_Linux(inputPath, outputPath, files)
 		else:
 			raise Exception('unsupported system/OS.')
-		
-		self.exportJobs.append(copyJob)
+
+		# whole command at once since it does not report per file
+		if not isinstance(copyJob, StageJob) and presetName in self.journals:
+			self._journaledCopies[copyJob] = (presetName, [(os.path.normpath(os.path.join(relOutputPath, file)), os.path.join(inputPath, file), os.path.join(outputPath, file)) for file in files])
+
+		self.addExportJob(copyJob, byteCount)
+		if metrics.isEnabled():
+			self._jobMetrics[copyJob] = (time.perf_counter(), outputPath, len(files))
+
+#-
+	def recordManifest(self, preset: str, relOutputPath: PathLike[str] | str, reports: dict[str, dict], errors: dict[str, Exception]) -> None:
+		""" adds written files to the preset's manifest and writes it, unless the preset's 'verifyCopies' is false. \n
+		relOutputPath - output dir of the files relative to the preset dir \n
+		reports - file name -> {'digest', 'bytes', 'method'}, see verifiedCopy.writeManifest \n
+		errors - file name -> error, of the files that failed
+		"""
+		if not self.presets.get(preset, {}).get('verifyCopies', True):
+			return
+
+		manifest = self.manifests.setdefault(preset, {'files': {}, 'failures': {}})
+		for (fileName, report) in reports.items():
+			manifest['files'][os.path.normpath(os.path.join(relOutputPath, fileName))] = report
+		for (fileName, error) in errors.items():
+			manifest['failures'][os.path.normpath(os.path.join(relOutputPath, fileName))] = f'{type(error).__name__}: {error}'
+		writeManifest(self.getManifestPath(preset), preset, manifest['files'], manifest['failures'])
+
+#-
+	def addExportJob(self, job: Popen, byteCount: int) -> None:
+		""" tracks a job until it finishes, see pollFinishedJobs. \n
+		byteCount - bytes the job processes, used for the export progress
+		"""
+		self.exportJobs.append(job)
+		self.jobByteCounts[job] = byteCount
+		self.exportByteCount += byteCount
+
+#-
+	def journalJob(self, job: StageJob, preset: str, relOutputPath: PathLike[str] | str) -> None:
+		""" records every file of a job in the preset's journal as soon as it is written, ie: from the worker thread. \n
+		relOutputPath - output dir of the job relative to the preset dir
+		"""
+
+		# sub function
+		@staticmethod
+		def _recordTask(journal: ExportJournal, jobName: str, future: Future, exportPath: str, sourcePath: str, outputPath: str) -> None:
+			if future.cancelled() or future.exception() != None:
+				return
+			journal.record(exportPath, jobName, sourcePath, outputPath, future.result())
+
+		# main function
+		journal = self.journals.get(preset)
+		if journal == None:
+			return
+
+		(jobName, inputPath, outputPath) = job.args
+		for (future, fileName) in job.tasks.items():
+			exportPath = os.path.normpath(os.path.join(relOutputPath, fileName))
+			future.add_done_callback(lambda future, exportPath=exportPath, fileName=fileName: _recordTask(journal, jobName, future, exportPath, os.path.join(inputPath, fileName), os.path.join(outputPath, fileName)))
+
+#-
+	def cancelExport(self) -> None:
+		""" stops the running export jobs, their results are then polled as usual. \n
+		queued files are dropped, copies stop between chunks, image stages and path rewrites finish the files they started and system copy commands are terminated. \n
+		files are written to temp files then renamed, a cancelled file never replaces its destination. \n
+		the export can be resumed from the journal, see exportFiles.
+		"""
+		self.isExportCancelled = True
+		self.cancelEvent.set()
+		for job in self.exportJobs:
+			if isinstance(job, StageJob):
+				job.cancel()
+			else:
+				job.terminate()
+
+#-
+	def hasUnfinishedExport(self, preset: str) -> bool:
+		""" whether the preset's last export was cancelled, failed or interrupted, ie: can be resumed. """
+		return isExportUnfinished(self.getJournalPath(preset))
+
+#-
+	def getJournalPath(self, preset: str) -> str:
+		""" path of a preset's export journal, kept out of the preset dir so that it is never exported. """
+		return os.path.join(self.outputDir, '.journal', f'{preset}.jsonl')
+
+#-
+	def dispatchImageStages(self, preset: str, presetFileData: FileCategory | None = None) -> dict[int, set[str]]:
+		""" starts the image stages (ex: mipmaps, watermark) defined in a preset's 'imageStages' settings, as export jobs. \n
+		stage settings: \n
+		collections - paths of the collections processed, ex: ['texs'], defaults to the stage's \n
+		exts - only process files with these exts, ex: ['.png'], defaults to all files passing the preset \n
+		output - output dir relative to the collection's export dir, default './' \n
+		any other entry is passed to the stage, see imageStages. \n
+		returns the names of the files the stages write in place of their source, per id of PresetFileCollectionData.
+		"""
+
+		# sub functions
+		@staticmethod
+		def _gatherCollections(collection, collections: list) -> None:
+			if isinstance(collection, PresetFileCollectionData):
+				collections.append(collection)
+
+		@staticmethod
+		def _recordOutputs(fileManager: FileManager, relOutputPath: str, results: dict, errors: dict) -> None:
+			# source file name -> {output name: report}
+			fileManager.recordManifest(preset, relOutputPath, {outputName: report for outputs in results.values() for (outputName, report) in outputs.items()}, errors)
+
+		# main function
+		if presetFileData == None:
+			presetFileData = self.getPresetFileData(preset)
+
+		replacedFiles = {}
+		for (stageName, settings) in self.presets[preset].get('imageStages', {}).items():
+			stage = IMAGE_STAGES.get(stageName)
+			if stage == None:
+				raise ValueError(f'unknown image stage in preset {preset}: {stageName}')
+
+			# paths in settings are relative to the asset root
+			settings = dict(settings)
+			for key in stage['pathSettings']:
+				settings[key] = os.path.abspath(self.resolvePath(settings[key]))
+			isReplacingSource = stage['replacesSource'] and os.path.normpath(settings.get('output', './')) == '.'
+
+			for collectionPath in settings.get('collections', stage['collections']):
+				item = presetFileData.resolve(collectionPath)
+				collections = []
+				if isinstance(item, PresetFileCollectionData):
+					collections.append(item)
+				elif isinstance(item, FileCategory):
+					item.foreachRecursive(_gatherCollections, collections)
+
+				for collection in collections:
+					fileNames = collection.getFilterdFiles()
+					if 'exts' in settings:
+						fileNames = [fileName for fileName in fileNames if os.path.splitext(fileName)[1] in settings['exts']]
+					if len(fileNames) == 0:
+						continue
+					# including up to date files, their existing output must not be overwritten by a copy either
+					if isReplacingSource:
+						replacedFiles.setdefault(id(collection), set()).update(fileNames)
+
+					outputPath = os.path.join(self.outputDir, f'{preset}/', collection.exportDirPath, settings.get('output', './'))
+					# kept out of the preset dirs so that it is never exported
+					cachePath = os.path.join(self.outputDir, '.imageStageCache', preset, f'{stageName}_{collectionPath.strip("/").replace("/", "_")}_{collection.name}.json')
+					relOutputPath = os.path.normpath(os.path.join(collection.exportDirPath, settings.get('output', './')))
+					onOutputs = lambda results, errors, relOutputPath=relOutputPath: _recordOutputs(self, relOutputPath, results, errors)
+					job = dispatchImageStage(self.getImageStageExecutor(), stageName, settings, collection.fileCollection.dirPath, fileNames, outputPath, cachePath, onOutputs, lambda outputs, onOutputs=onOutputs: onOutputs(outputs, {}))
+					if job != None:
+						self.addExportJob(job, collection.fileCollection.getTotalSize(job.tasks.values()))
+
+		return replacedFiles
+
+#-
+	def dispatchPathRewrites(self, preset: str, presetFileData: FileCategory, replacedFiles: dict[int, set[str]]) -> None:
+		""" starts export jobs writing the obj, mtl and gltf files of a preset with their references to other files (ex: mtllib, map_Kd, uri) pointing to where those are exported. \n
+		disabled by setting the preset's 'rewritePaths' to false, the files are then copied as is. \n
+		setting the preset's 'optimizeObj' to true or to settings (ex: {'triangulate': true}) also optimizes the obj files, see objOptimizer.optimizeObj, even if 'rewritePaths' is false. \n
+		replacedFiles - see dispatchImageStages, updated in place with the rewritten files \n
+		the changed and unresolved references are stored in rewriteReports once the jobs are done.
+		"""
+
+		# sub functions
+		@staticmethod
+		def _gatherCollections(collection, collections: list) -> None:
+			if isinstance(collection, PresetFileCollectionData):
+				collections.append(collection)
+
+		@staticmethod
+		def _storeReports(fileManager: FileManager, reports: dict, relOutputPath: str, exportDirPath: str, results: dict, errors: dict) -> None:
+			for (fileName, report) in results.items():
+				reports[os.path.join(relOutputPath, fileName)] = report
+			fileManager.recordManifest(preset, exportDirPath, {fileName: report['output'] for (fileName, report) in results.items()}, errors)
+
+		# main function
+		isRewritingPaths = self.presets[preset].get('rewritePaths', True)
+		objSettings = self.presets[preset].get('optimizeObj', False)
+		if objSettings == True:
+			objSettings = {}
+		elif objSettings == False:
+			objSettings = None
+		if not isRewritingPaths and objSettings == None:
+			return
+
+		collections = []
+		presetFileData.foreachRecursive(_gatherCollections, collections)
+
+		# every exported file, ie: where references may point to
+		pathMap = None
+		rewrittenExts = REWRITTEN_EXTS
+		if isRewritingPaths:
+			pathMap = {}
+			for collection in collections:
+				outputPath = os.path.join(self.outputDir, f'{preset}/', collection.exportDirPath)
+				for fileName in collection.getFilterdFiles():
+					pathMap[os.path.abspath(os.path.join(collection.fileCollection.dirPath, fileName))] = os.path.abspath(os.path.join(outputPath, fileName))
+		else:
+			rewrittenExts = {'.obj'}
+
+		reports = self.rewriteReports.setdefault(preset, {})
+		for collection in collections:
+			skippedFiles = replacedFiles.get(id(collection), ())
+			fileNames = [fileName for fileName in collection.getFilterdFiles() if os.path.splitext(fileName)[1].lower() in rewrittenExts and fileName not in skippedFiles]
+			if len(fileNames) == 0:
+				continue
+			replacedFiles.setdefault(id(collection), set()).update(fileNames)
+			fileNames = self.skipJournaledFiles(preset, collection, fileNames)
+			if len(fileNames) == 0:
+				continue
+
+			relOutputPath = os.path.normpath(os.path.join(preset, collection.exportDirPath))
+			outputPath = os.path.join(self.outputDir, relOutputPath)
+			# rewriting is file io and bytes operations releasing the GIL, it runs on the copy threads rather than paying for a process
+			# the obj optimization is a python loop, it runs on the image stage processes
+			optimizedFiles = [fileName for fileName in fileNames if objSettings != None and os.path.splitext(fileName)[1].lower() == '.obj']
+			rewrittenFiles = [fileName for fileName in fileNames if fileName not in optimizedFiles]
+			jobs = []
+			if len(rewrittenFiles) != 0:
+				jobs.append((self.getCopyExecutor(getDeviceKey(collection.fileCollection.dirPath, outputPath)), rewrittenFiles))
+			if len(optimizedFiles) != 0:
+				jobs.append((self.getImageStageExecutor(), optimizedFiles))
+
+			for (executor, jobFiles) in jobs:
+				job = dispatchPathRewrite(executor, collection.fileCollection.dirPath, jobFiles, outputPath, pathMap, lambda results, errors, relOutputPath=relOutputPath, exportDirPath=collection.exportDirPath: _storeReports(self, reports, relOutputPath, exportDirPath, results, errors), objSettings)
+				self.journalJob(job, preset, collection.exportDirPath)
+				self.addExportJob(job, collection.fileCollection.getTotalSize(jobFiles))
+
+#-
+	def getImageStageExecutor(self) -> ProcessPoolExecutor | ThreadPoolExecutor:
+		""" process pool shared by every image stage and obj optimization, created on first use. \n
+		processes rather than threads since PIL holds the GIL for most of its work. \n
+		its size is imageStageWorkers, the cpu count if None, 0 runs the stages one at a time on a thread of this process instead, \n
+		ex: in batch mode, where every asset already has its own process.
+		"""
+		if self.imageStageExecutor == None:
+			if self.imageStageWorkers == 0:
+				self.imageStageExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='imageStage')
+			else:
+				self.imageStageExecutor = ProcessPoolExecutor(max_workers=self.imageStageWorkers)
+		return self.imageStageExecutor
+
+#-
+	def getCopyExecutor(self, deviceKey: str) -> ThreadPoolExecutor:
+		""" thread pool running the verified copies between two devices, see copyConcurrency.getDeviceKey, created on first use. \n
+		threads are enough since hashing and file io release the GIL. \n
+		sized for the maximum concurrency, the copies in flight are limited by the device pair's controller, see getCopyController.
+		"""
+		if deviceKey not in self.copyExecutors:
+			self.copyExecutors[deviceKey] = ThreadPoolExecutor(MAX_CONCURRENCY, thread_name_prefix=f'copy_{deviceKey}')
+		return self.copyExecutors[deviceKey]
+
+#-
+	def getCopyController(self, deviceKey: str) -> CopyConcurrencyController:
+		""" controller adjusting the copies in flight between two devices to their measured throughput. \n
+		it starts from the best concurrency learned by previous exports, stored by saveCopyConcurrency. \n
+		with a copyConcurrencyShare above 1, it only uses its share of the concurrency, and what it measures competes with the other exports so it is not stored.
+		"""
+		if deviceKey not in self.copyControllers:
+			if self.copyConcurrencyState == None:
+				self.copyConcurrencyState = loadConcurrencyState(self.copyConcurrencyStatePath) if self.copyConcurrencyStatePath != None else {}
+			self.copyControllers[deviceKey] = CopyConcurrencyController(deviceKey, self.copyConcurrencyState.setdefault(deviceKey, {}), self.copyConcurrencyShare)
+		return self.copyControllers[deviceKey]
+
+#-
+	def getCopyConcurrencyStats(self) -> dict[str, dict]:
+		""" device key -> see CopyConcurrencyController.getStats, of the device pairs copied between. """
+		return {deviceKey: controller.getStats() for (deviceKey, controller) in self.copyControllers.items()}
+
+#-
+	def saveCopyConcurrency(self) -> None:
+		""" stores what the controllers learned, for the next exports to start at the best concurrency. """
+		if len(self.copyControllers) == 0 or self.copyConcurrencyStatePath == None or self.copyConcurrencyShare > 1:
+			return
+		try:
+			saveConcurrencyState({deviceKey: controller.state for (deviceKey, controller) in self.copyControllers.items()}, self.copyConcurrencyStatePath)
+		except OSError as error:
+			# ex: read only home dir, the next export measures again
+			print(f'could not save the copy concurrency: {error}', file=sys.stderr)
+
+#-
+	def getManifestPath(self, preset: str) -> str:
+		""" path of a preset's manifest, kept out of the preset dir so that it is never exported. """
+		return os.path.join(self.outputDir, '.manifests', f'{preset}.json')
+
+#-
+	def getFailedFiles(self) -> dict[str, str]:
+		""" export path relative to outputDir -> error, of every file that failed in the finished jobs. \n
+		jobs without per file results (ie: cp/robocopy) report their output dir instead, ex: 'Cgtrader/textures/'. \n
+		cancelled files are not failures, see getCancelledFiles.
+		"""
+		failedFiles = {}
+		for job in self.failedJobs:
+			outputPath = self._getJobOutputPath(job)
+			if isinstance(job, StageJob):
+				for (fileName, error) in job.failedFiles.items():
+					failedFiles[os.path.join(outputPath, fileName)] = error
+			# terminated by cancelExport
+			elif not self.isExportCancelled:
+				failedFiles[os.path.join(outputPath, '')] = f'{job.args[0]} exited with {job.returncode}'
+		return failedFiles
+
+#-
+	def getCancelledFiles(self) -> list[str]:
+		""" export paths relative to outputDir of the files not exported because the export was cancelled. \n
+		jobs without per file results (ie: cp/robocopy) report their output dir instead.
+		"""
+		cancelledFiles = []
+		for job in self.failedJobs:
+			outputPath = self._getJobOutputPath(job)
+			if isinstance(job, StageJob):
+				cancelledFiles.extend(os.path.join(outputPath, fileName) for fileName in job.cancelledFiles)
+			elif self.isExportCancelled:
+				cancelledFiles.append(os.path.join(outputPath, ''))
+		return sorted(cancelledFiles)
+
+#-
+	def _getJobOutputPath(self, job: Popen | StageJob) -> str:
+		""" output dir of a job relative to outputDir. """
+		# stage jobs and robocopy: (program, input dir, output dir, ...), cp: (program, files..., output dir)
+		return os.path.relpath(job.args[-1] if job.args[0] == 'cp' else job.args[2], os.path.abspath(self.outputDir))
+
+#-
+	def shutdownImageStages(self) -> None:
+		""" waits for running image stages and copies and stops their workers, new pools are created if needed again. """
+		if self.imageStageExecutor != None:
+			self.imageStageExecutor.shutdown()
+			self.imageStageExecutor = None
+		for executor in self.copyExecutors.values():
+			executor.shutdown()
+		self.copyExecutors.clear()
 
 #-
 	def pollFinishedJobs(self, noStdOut: bool = False) -> int:
@@ -261,11 +836,27 @@ class FileManager():
 				continue
 			else:
 				self.exportJobs[i] = None
-				if _isSuccessExitCode(exitCode):
+				isSuccess = _isSuccessExitCode(exitCode)
+				if isSuccess:
 					self.successfullJobs.append(job)
 				else:
 					self.failedJobs.append(job)
 
+				journaledCopies = self._journaledCopies.pop(job, None)
+				if isSuccess and journaledCopies != None:
+					(preset, files) = journaledCopies
+					for (exportPath, sourcePath, outputPath) in files:
+						self.journals[preset].record(exportPath, 'copy', sourcePath, outputPath)
+
+				byteCount = self.jobByteCounts.pop(job, 0)
+				self.finishedByteCount += byteCount
+
+				# NOTE: the duration includes the time until this poll
+				jobMetrics = self._jobMetrics.pop(job, None)
+				if jobMetrics != None:
+					(startTime, outputPath, fileCount) = jobMetrics
+					metrics.record('copyJob', time.perf_counter() - startTime, outputPath=outputPath, files=fileCount, bytes=byteCount, success=isSuccess)
+
 				# pipe subprocess stdout to python console
 				# NOTE: this assumes stderr to be merges with stdout
 				if not noStdOut:
@@ -273,8 +864,21 @@ class FileManager():
 
 		# removes finshed jobs from exportJobs
 		self.exportJobs = [job for job in self.exportJobs if job is not None]
+		if self.getActiveJobCount() == 0:
+			self.closeJournals()
+			self.saveCopyConcurrency()
 		return self.getActiveJobCount()
 
+#-
+	def closeJournals(self) -> None:
+		""" closes the journals of the finished exports, marked as complete if nothing failed nor was cancelled. """
+		isComplete = not self.isExportCancelled and len(self.failedJobs) == 0
+		for journal in self.journals.values():
+			if isComplete:
+				journal.complete()
+			journal.close()
+		self.journals.clear()
+
 #-
 	def getActiveJobCount(self) -> int:
 		return len(self.exportJobs)
@@ -287,6 +891,11 @@ class FileManager():
 #---
 # other
 
+	def resolvePath(self, path: PathLike[str] | str) -> PathLike[str] | str:
+		""" resolves a settings path relative to the base path. """
+		return os.path.normpath(os.path.join(self.basePath, path))
+
+#-
 	# intended to be stored externaly since data is irrelevant to files
 	# but still included in this class for its use of __fetchJsonData
 	def getCustomColors(self, path: PathLike[str] | str) -> dict:
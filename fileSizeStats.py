@@ -0,0 +1,122 @@
+import bisect
+import heapq
+
+from fileDataClasses import FileCategory, FileCollection, PresetFileCollectionData
+
+# import type defs
+from collections.abc import Iterable
+from typing import TextIO
+
+# NOTE: sizes come from FileCollection.fileSizes, filled by the scan, nothing here touches the disk
+
+# upper bounds of the histogram buckets, in bytes, the last bucket holds everything above
+SIZE_BUCKETS = (64 * 2**10, 2**20, 16 * 2**20, 256 * 2**20, 2**30)
+
+#---------------------------------------------------------------------------------------------------
+def formatSize(byteCount: int) -> str:
+	""" human readable size, ex: '1.5 MiB'. """
+	for unit in ('B', 'KiB', 'MiB', 'GiB'):
+		if byteCount < 1024 or unit == 'GiB':
+			break
+		byteCount /= 1024
+	# without trailing zeros, ex: '64 KiB'
+	return f'{byteCount:.2f}'.rstrip('0').rstrip('.') + f' {unit}'
+
+#-
+def getHistogramLabels() -> list[str]:
+	""" labels of the histogram buckets, in order. """
+	labels = [f'< {formatSize(SIZE_BUCKETS[0])}']
+	for (lower, upper) in zip(SIZE_BUCKETS, SIZE_BUCKETS[1:]):
+		labels.append(f'{formatSize(lower)} - {formatSize(upper)}')
+	labels.append(f'>= {formatSize(SIZE_BUCKETS[-1])}')
+	return labels
+
+#-
+def buildSizeStats(sizes: Iterable[tuple[str, int]], largestCount: int = 10) -> dict:
+	""" totals of some files. \n
+	sizes - (file name or path, size in bytes) pairs \n
+	returns {'files', 'bytes', 'largest': [[name, size], ...] largest first, 'histogram': {label: file count}}
+	"""
+	sizes = list(sizes)
+	histogram = [0] * (len(SIZE_BUCKETS) + 1)
+	for (_, size) in sizes:
+		histogram[bisect.bisect_right(SIZE_BUCKETS, size)] += 1
+
+	return {
+		'files': len(sizes),
+		'bytes': sum(size for (_, size) in sizes),
+		'largest': [[name, size] for (name, size) in heapq.nlargest(largestCount, sizes, key=lambda item: item[1])],
+		'histogram': dict(zip(getHistogramLabels(), histogram)),
+	}
+
+#-
+def getInputSizeStats(inputFiles: FileCategory, largestCount: int = 10) -> dict:
+	""" size stats of every scanned input file, see buildSizeStats. \n
+	adds 'collections': {collection path: {'files', 'bytes'}}, file names in 'largest' are prefixed by their collection path.
+	"""
+	collections = {}
+	sizes = []
+	for (path, collection) in _iterCollections(inputFiles, FileCollection):
+		collections[path] = {'files': len(collection), 'bytes': collection.getTotalSize()}
+		sizes.extend((f'{path}/{fileName}', collection.fileSizes.get(fileName, 0)) for fileName in collection.files)
+
+	stats = buildSizeStats(sizes, largestCount)
+	stats['collections'] = collections
+	return stats
+
+#-
+def getPresetSizeStats(presetData: FileCategory, largestCount: int = 10) -> dict:
+	""" size stats of the files passing a preset's requirments, ie: the files it exports, see getInputSizeStats. """
+	collections = {}
+	sizes = []
+	for (path, collection) in _iterCollections(presetData, PresetFileCollectionData):
+		fileSizes = collection.fileCollection.fileSizes
+		files = collection.getFilterdFiles()
+		collections[path] = {'files': len(files), 'bytes': collection.fileCollection.getTotalSize(files)}
+		sizes.extend((f'{path}/{fileName}', fileSizes.get(fileName, 0)) for fileName in files)
+
+	stats = buildSizeStats(sizes, largestCount)
+	stats['collections'] = collections
+	return stats
+
+#-
+def writeSizeStats(inputStats: dict, presetStats: dict[str, dict], file: TextIO) -> None:
+	""" writes a file size section to a stats file. \n
+	inputStats - see getInputSizeStats \n
+	presetStats - preset name -> see getPresetSizeStats
+	"""
+
+	# sub function
+	@staticmethod
+	def _writeStats(stats: dict, title: str, file: TextIO) -> None:
+		file.write(f'{title}: {stats["files"]} files, {formatSize(stats["bytes"])}\n')
+		for (path, collectionStats) in stats['collections'].items():
+			file.write(f'  {path}: {collectionStats["files"]} files, {formatSize(collectionStats["bytes"])}\n')
+		file.write('\n')
+
+		if len(stats['largest']) != 0:
+			file.write('  Largest files:\n')
+			for (name, size) in stats['largest']:
+				file.write(f'    {name}: {formatSize(size)}\n')
+			file.write('\n')
+
+		file.write('  Size histogram:\n')
+		for (label, count) in stats['histogram'].items():
+			file.write(f'    {label}: {count}\n')
+		file.write('\n')
+
+	# main function
+	file.write('File sizes:\n')
+	_writeStats(inputStats, 'Input', file)
+	for (preset, stats) in presetStats.items():
+		_writeStats(stats, f'Preset {preset}', file)
+
+#---------------------------------------------------------------------------------------------------
+def _iterCollections(category: FileCategory, collectionType: type, parentPath: str = ''):
+	""" yields (path, collection) of every collectionType in a category, ex: ('imgs/beauty', collection). """
+	for child in category.children:
+		path = f'{parentPath}{child.name}'
+		if isinstance(child, collectionType):
+			yield (path, child)
+		elif isinstance(child, FileCategory):
+			yield from _iterCollections(child, collectionType, f'{path}/')
@@ -0,0 +1,384 @@
+from fileManager import FileManager
+from objAnalizer import ObjAnalyzer
+from textureMetadata import analyzeTextures, writeTextureStats
+from videoMetadata import writeVideoStats
+from fileSizeStats import getInputSizeStats, writeSizeStats
+from dependencyPaths import writeRewriteStats
+import metrics
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import signal
+import json
+import glob
+import time
+import sys
+import os
+
+# import type defs
+from fileDataClasses import FileCategory, PresetFileCollectionData
+from collections.abc import Iterable
+from os import PathLike
+
+# NOTE: this module is the non gui entry point, it must not import customtkinter, PIL or anything importing them
+
+# since app is intended to be run in a different working dir, CURRENT_FILE_DIR is needed for accessing certain data
+CURRENT_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+DIR_SETTINGS_PATH = os.path.join(CURRENT_FILE_DIR, './settings/dirLayout.json')
+PRESET_SETTINGS_PATH = os.path.join(CURRENT_FILE_DIR, './settings/presetSettings.json')
+
+# exit codes
+EXIT_SUCCESS = 0
+EXIT_VALIDATION_FAILED = 1
+EXIT_EXPORT_FAILED = 2
+EXIT_ERROR = 3
+EXIT_CANCELLED = 4
+# most severe first, the exit code of a batch is the most severe one of its assets
+EXIT_CODE_PRIORITY = (EXIT_ERROR, EXIT_CANCELLED, EXIT_EXPORT_FAILED, EXIT_VALIDATION_FAILED, EXIT_SUCCESS)
+
+#---------------------------------------------------------------------------------------------------
+def buildValidationReport(presetData: FileCategory) -> dict:
+	""" builds a machine readable report of the requirments in a preset. \n
+	a preset is valid if every required ext and every required suffix is matched by at least one file, and every file meets the metadata requirements. \n
+	NOTE: metadata must be loaded beforehand, see FileManager.loadCollectionMetadata
+	"""
+
+	# sub functions
+	@staticmethod
+	def _collectionReport(collection: PresetFileCollectionData, path: str) -> dict:
+		report = {
+			'path': path,
+			'exportDirPath': collection.exportDirPath,
+			'passingExts': {},
+			'failingExts': sorted(collection.getFailingExt()),
+		}
+
+		for ext in sorted(collection.getPassingExt()):
+			report['passingExts'][ext] = collection.getFileCount(ext)
+
+		if collection.requiredSuffixes != None:
+			report['suffixes'] = {}
+			report['missingSuffixes'] = []
+			for suffix in collection.requiredSuffixes:
+				suffixFileCount = sum(collection.getFileCount(ext, suffix) for ext in collection.requiredExts or ())
+				report['suffixes'][suffix] = suffixFileCount
+				if suffixFileCount == 0:
+					report['missingSuffixes'].append(suffix)
+
+		if collection.requiredMetadata != None:
+			report['metadataFailures'] = collection.getMetadataFailures()
+
+		report['valid'] = len(report['failingExts']) == 0 and len(report.get('missingSuffixes', ())) == 0 and len(report.get('metadataFailures', ())) == 0
+		return report
+
+	@staticmethod
+	def _walk(category: FileCategory, parentPath: str, reports: list) -> None:
+		for child in category.children:
+			path = f'{parentPath}{child.name}'
+			if isinstance(child, PresetFileCollectionData):
+				reports.append(_collectionReport(child, path))
+			elif isinstance(child, FileCategory):
+				_walk(child, f'{path}/', reports)
+
+	# main function
+	collections = []
+	_walk(presetData, '', collections)
+
+	return {
+		'valid': all(collection['valid'] for collection in collections),
+		'collections': collections,
+	}
+
+#---------------------------------------------------------------------------------------------------
+def loadSettings() -> tuple[dict, dict]:
+	""" reads the dir layout and preset settings. \n
+	returns (dirSettings, presetSettings)
+	"""
+	with open(DIR_SETTINGS_PATH) as file:
+		dirSettings = json.load(file)
+	with open(PRESET_SETTINGS_PATH) as file:
+		presetSettings = json.load(file)
+
+	return (dirSettings, presetSettings)
+
+#-
+def processAsset(basePath: PathLike[str] | str | None = None, presets: list[str] | None = None, export: bool = True, dirSettings: dict | None = None, presetSettings: dict | None = None, resume: bool = False, imageStageWorkers: int | None = None, copyConcurrencyShare: int = 1) -> dict:
+	""" runs scan -> preset validation -> export -> stats on a single asset root. \n
+	never raises, errors are stored in the returned report. \n
+	ctrl+c during the export cancels it, the files already written are reported and the export can be resumed. \n
+	presets - names of the presets to process, all presets if None \n
+	resume - skip the files the previous export of each preset already wrote, see FileManager.exportFiles \n
+	dirSettings, presetSettings - already parsed settings, read from the settings dir if None \n
+	imageStageWorkers, copyConcurrencyShare - see FileManager
+	"""
+
+	timings = {}
+	report = {'basePath': os.path.abspath(basePath or './')}
+
+	fileManager = None
+	try:
+		# scan
+		phaseStart = time.perf_counter()
+		fileManager = FileManager(basePath or './', DIR_SETTINGS_PATH, PRESET_SETTINGS_PATH, dirSettings, presetSettings, imageStageWorkers=imageStageWorkers, copyConcurrencyShare=copyConcurrencyShare)
+		timings['scan'] = time.perf_counter() - phaseStart
+
+		if presets == None:
+			presets = list(fileManager.presets)
+		unknownPresets = [preset for preset in presets if preset not in fileManager.presets]
+		if len(unknownPresets) != 0:
+			raise ValueError(f'unknown presets: {", ".join(unknownPresets)}')
+
+		# texture and video metadata, from headers only, needed by the validation's metadata requirements
+		phaseStart = time.perf_counter()
+		textureCollection = fileManager.loadTextureMetadata()
+		if textureCollection != None:
+			report['textures'] = analyzeTextures((textureCollection.metadata.get(fileName) for fileName in textureCollection.files), fileManager.getRequiredSuffixes('texs', presets))
+		timings['textures'] = time.perf_counter() - phaseStart
+
+		phaseStart = time.perf_counter()
+		videoCollection = fileManager.loadVideoMetadata()
+		if videoCollection != None:
+			report['videos'] = {fileName: _metadataReport(videoCollection.metadata.get(fileName)) for fileName in videoCollection.files}
+		timings['videos'] = time.perf_counter() - phaseStart
+
+		# validation
+		phaseStart = time.perf_counter()
+		report['presets'] = {preset: buildValidationReport(fileManager.getPresetFileData(preset)) for preset in presets}
+		timings['validation'] = time.perf_counter() - phaseStart
+		isValid = all(presetReport['valid'] for presetReport in report['presets'].values())
+
+		# file sizes, from the scan
+		report['sizes'] = {
+			'input': getInputSizeStats(fileManager.files),
+			'presets': {preset: fileManager.getExportSizeStats(preset) for preset in presets},
+		}
+
+		# export
+		isExported = True
+		if export:
+			phaseStart = time.perf_counter()
+			try:
+				for preset in presets:
+					fileManager.exportFiles(preset, resume)
+				while fileManager.pollFinishedJobs(noStdOut=True) != 0:
+					time.sleep(0.05)
+			except KeyboardInterrupt:
+				# the jobs still running are awaited so that their results are reported and journaled
+				fileManager.cancelExport()
+				while fileManager.pollFinishedJobs(noStdOut=True) != 0:
+					time.sleep(0.05)
+			timings['export'] = time.perf_counter() - phaseStart
+
+			report['export'] = {'succeeded': len(fileManager.successfullJobs), 'failed': len(fileManager.failedJobs), 'bytes': fileManager.exportByteCount, 'rewrites': fileManager.rewriteReports}
+			report['export']['failures'] = fileManager.getFailedFiles()
+			report['export']['manifests'] = {preset: fileManager.getManifestPath(preset) for preset in presets if preset in fileManager.manifests}
+			report['export']['cancelled'] = fileManager.isExportCancelled
+			report['export']['cancelledFiles'] = fileManager.getCancelledFiles()
+			report['export']['resumedFiles'] = {preset: fileManager.resumedFiles.get(preset, 0) for preset in presets}
+			report['export']['journals'] = {preset: fileManager.getJournalPath(preset) for preset in presets}
+			report['export']['copyConcurrency'] = fileManager.getCopyConcurrencyStats()
+			isExported = len(fileManager.failedJobs) == 0
+
+			# stats
+			objFilePath = fileManager.getFilePath(endsWith='.obj')
+			phaseStart = time.perf_counter()
+			statsPath = os.path.join(fileManager.outputDir, 'obj_stats.txt')
+			os.makedirs(fileManager.outputDir, exist_ok=True)
+
+			if objFilePath != None:
+				objAnalyzer = ObjAnalyzer(objFilePath, statsPath)
+				objAnalyzer.run()
+				objAnalyzer.awaitCompletion()
+			# appended after the obj stats
+			with open(statsPath, 'a' if objFilePath != None else 'w') as statsFile:
+				if textureCollection != None:
+					writeTextureStats(textureCollection, statsFile, fileManager.getRequiredSuffixes('texs', presets))
+				if videoCollection != None:
+					writeVideoStats(videoCollection, statsFile)
+				writeSizeStats(report['sizes']['input'], report['sizes']['presets'], statsFile)
+				writeRewriteStats({path: rewriteReport for presetReports in fileManager.rewriteReports.values() for (path, rewriteReport) in presetReports.items()}, statsFile)
+			timings['stats'] = time.perf_counter() - phaseStart
+			report['stats'] = statsPath
+
+		if fileManager.isExportCancelled:
+			exitCode = EXIT_CANCELLED
+		elif not isExported:
+			exitCode = EXIT_EXPORT_FAILED
+		elif not isValid:
+			exitCode = EXIT_VALIDATION_FAILED
+		else:
+			exitCode = EXIT_SUCCESS
+
+	except Exception as error:
+		report['error'] = f'{type(error).__name__}: {error}'
+		exitCode = EXIT_ERROR
+
+	if fileManager != None:
+		fileManager.shutdownImageStages()
+
+	report['timings'] = timings
+	report['exitCode'] = exitCode
+	return report
+
+#-
+def _metadataReport(metadata) -> dict | None:
+	""" json friendly metadata, None if the file could not be read. """
+	if metadata == None:
+		return None
+	return {fieldName: getattr(metadata, fieldName) for fieldName in metadata.__dataclass_fields__ if fieldName not in ('name', 'mtimeNs')}
+
+#-
+def runHeadless(basePath: PathLike[str] | str | None = None, presets: list[str] | None = None, export: bool = True, printStartupTime: bool = False, startTime: float | None = None, resume: bool = False) -> int:
+	""" processes a single asset root without any gui. \n
+	prints a json report to stdout and returns the exit code. \n
+	startTime - time.perf_counter() value at program start, used for the startup time measurement
+	"""
+
+	startupTime = _measureStartup(printStartupTime, startTime)
+
+	report = processAsset(basePath, presets, export, resume=resume)
+	if startupTime != None:
+		report['timings']['startup'] = startupTime
+	print(json.dumps(report, indent=2))
+
+	return report['exitCode']
+
+#---------------------------------------------------------------------------------------------------
+# batch processing
+
+# settings shared by all assets processed by a batch worker process, and the number of workers exporting at once, set by _initBatchWorker
+_batchSettings = (None, None)
+_batchWorkerCount = 1
+
+def _initBatchWorker(dirSettings: dict, presetSettings: dict, workerCount: int, metricsLogPath: PathLike[str] | str | None, isMetricsEnabled: bool) -> None:
+	global _batchSettings, _batchWorkerCount
+	_batchSettings = (dirSettings, presetSettings)
+	_batchWorkerCount = workerCount
+	# ignored by the main process, see runBatch, each worker cancels its own export
+	signal.signal(signal.SIGINT, signal.default_int_handler)
+
+	# workers append to the same log, their totals are sent back with each report
+	if isMetricsEnabled:
+		metrics.enableMetrics(metricsLogPath)
+
+#-
+def _processBatchAsset(basePath: PathLike[str] | str, presets: list[str] | None, export: bool, resume: bool) -> dict:
+	# each worker is already one of cpu count processes, a process pool per asset would run up to cpu count² processes
+	# the workers copy between the same devices at once, each one gets its share of the copy concurrency
+	report = processAsset(basePath, presets, export, *_batchSettings, resume, imageStageWorkers=0, copyConcurrencyShare=_batchWorkerCount)
+	if metrics.isEnabled():
+		report['_metricsTotals'] = metrics.getRecorder().takeTotals()
+	return report
+
+#-
+def expandBatchPaths(patterns: Iterable[str]) -> list[str]:
+	""" expands glob patterns into a list of asset root dirs, keeping the given order and removing duplicates. """
+	paths = {}
+	for pattern in patterns:
+		if glob.has_magic(pattern):
+			matches = sorted(glob.glob(pattern))
+		else:
+			matches = [pattern]
+		for path in matches:
+			if os.path.isdir(path):
+				paths.setdefault(os.path.normpath(path), None)
+			else:
+				# kept so that it shows up as an error in the report
+				paths.setdefault(path, None)
+
+	return list(paths)
+
+#-
+def getSharedOutputDirs(basePaths: Iterable[str], dirSettings: dict) -> dict[str, list[str]]:
+	""" output dir -> asset roots, for the output dirs resolved from more than one asset root, see FileManager.resolvePath. """
+	outputDirs = {}
+	for basePath in basePaths:
+		outputDir = os.path.normpath(os.path.join(os.path.abspath(basePath), dirSettings.get('output', './tmp/')))
+		outputDirs.setdefault(outputDir, []).append(basePath)
+
+	return {outputDir: paths for (outputDir, paths) in outputDirs.items() if len(paths) > 1}
+
+#-
+def getMostSevereExitCode(exitCodes: Iterable[int]) -> int:
+	""" see EXIT_CODE_PRIORITY, EXIT_SUCCESS if there are none. """
+	exitCodes = set(exitCodes)
+	return next((exitCode for exitCode in EXIT_CODE_PRIORITY if exitCode in exitCodes), EXIT_SUCCESS)
+
+#-
+def runBatch(basePaths: Iterable[str], presets: list[str] | None = None, export: bool = True, workerCount: int | None = None, printStartupTime: bool = False, startTime: float | None = None, resume: bool = False) -> int:
+	""" processes many asset roots concurrently on a process pool. \n
+	settings are read once and shared with every worker. a failure in one asset does not abort the others. \n
+	ctrl+c cancels the exports of the assets being processed, see processAsset, the report is still printed. \n
+	when exporting, asset roots whose output dirs resolve to the same dir are rejected before anything is processed. \n
+	prints an aggregated json report to stdout and returns the most severe exit code of all assets, see EXIT_CODE_PRIORITY. \n
+	basePaths - asset root dirs or glob patterns \n
+	workerCount - number of worker processes, defaults to the cpu count
+	"""
+
+	startupTime = _measureStartup(printStartupTime, startTime)
+	batchStart = time.perf_counter()
+
+	basePaths = expandBatchPaths(basePaths)
+	try:
+		settings = loadSettings()
+		# assets exporting to the same dir would overwrite each other's journals, manifests, stats and files
+		if export:
+			sharedOutputDirs = getSharedOutputDirs(basePaths, settings[0])
+			if len(sharedOutputDirs) != 0:
+				conflicts = '; '.join(f'{outputDir} <- {", ".join(paths)}' for (outputDir, paths) in sharedOutputDirs.items())
+				raise ValueError(f'asset roots sharing an output dir, set a distinct "output" in dirLayout.json: {conflicts}')
+	except Exception as error:
+		print(json.dumps({'error': f'{type(error).__name__}: {error}', 'exitCode': EXIT_ERROR}, indent=2))
+		return EXIT_ERROR
+
+	reports = [None] * len(basePaths)
+	if len(basePaths) != 0:
+		recorder = metrics.getRecorder()
+		metricsArgs = (recorder.logPath, True) if recorder != None else (None, False)
+		# the workers receive ctrl+c too, the main process waits for their reports
+		previousHandler = signal.signal(signal.SIGINT, signal.SIG_IGN)
+		# processes actually running at once
+		workerCount = min(workerCount or os.cpu_count() or 1, len(basePaths))
+		with ProcessPoolExecutor(max_workers=workerCount, initializer=_initBatchWorker, initargs=(*settings, workerCount, *metricsArgs)) as executor:
+			futures = {executor.submit(_processBatchAsset, basePath, presets, export, resume): i for i, basePath in enumerate(basePaths)}
+			for future in as_completed(futures):
+				i = futures[future]
+				try:
+					reports[i] = future.result()
+					if recorder != None:
+						recorder.mergeTotals(reports[i].pop('_metricsTotals', {}))
+				except Exception as error:
+					# ex: worker process killed
+					reports[i] = {'basePath': os.path.abspath(basePaths[i]), 'error': f'{type(error).__name__}: {error}', 'timings': {}, 'exitCode': EXIT_ERROR}
+		signal.signal(signal.SIGINT, previousHandler)
+
+	exitCodes = [report['exitCode'] for report in reports]
+	exitCode = getMostSevereExitCode(exitCodes)
+	timings = {'batch': time.perf_counter() - batchStart}
+	if startupTime != None:
+		timings['startup'] = startupTime
+
+	print(json.dumps({
+		'summary': {
+			'total': len(reports),
+			'succeeded': exitCodes.count(EXIT_SUCCESS),
+			'validationFailed': exitCodes.count(EXIT_VALIDATION_FAILED),
+			'exportFailed': exitCodes.count(EXIT_EXPORT_FAILED),
+			'errors': exitCodes.count(EXIT_ERROR),
+			'cancelled': exitCodes.count(EXIT_CANCELLED),
+		},
+		'assets': reports,
+		'timings': timings,
+		'exitCode': exitCode,
+	}, indent=2))
+
+	return exitCode
+
+#---------------------------------------------------------------------------------------------------
+def _measureStartup(printStartupTime: bool, startTime: float | None) -> float | None:
+	""" time since program start, optionally printed to stderr. """
+	if startTime == None:
+		return None
+
+	startupTime = time.perf_counter() - startTime
+	if printStartupTime:
+		print(f'startup time: {startupTime * 1000:.1f} ms', file=sys.stderr)
+	return startupTime
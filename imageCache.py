@@ -0,0 +1,54 @@
+from customtkinter import CTkImage
+from PIL import Image
+import os
+
+# since app is intended to be run in a different working dir, CURRENT_FILE_DIR is needed for accessing certain data
+CURRENT_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# icon name -> (light image, dark image | None)
+ICONS = {
+	'reload'    : ('./images/icon_reload_light.png', './images/icon_reload_dark.png'),
+	'folder'    : ('./images/icon_folder_light.png', './images/icon_folder_dark.png'),
+	'checkmark' : ('./images/icon_checkmark.png', None),
+	'cross'     : ('./images/icon_X.png', None),
+	'warn'      : ('./images/icon_warn.png', None),
+	'info'      : ('./images/icon_info.png', None),
+}
+
+# shared by every component, images are decoded once per file and CTkImages created once per size
+# NOTE: importing customtkinter already imports PIL, only the decoding is deferred, see preloadImages
+_sourceImages = {}
+_ctkImages = {}
+
+#---------------------------------------------------------------------------------------------------
+def getImage(name: str, size: tuple[int, int]) -> CTkImage:
+	""" get the CTkImage of an icon at the given size. \n
+	name - key in ICONS, ex: 'reload'
+	"""
+	key = (name, size)
+	image = _ctkImages.get(key)
+	if image == None:
+		(lightPath, darkPath) = ICONS[name]
+		image = CTkImage(light_image=_getSourceImage(lightPath), dark_image=_getSourceImage(darkPath) if darkPath != None else None, size=size)
+		_ctkImages[key] = image
+	return image
+
+#-
+def preloadImages() -> None:
+	""" decodes all icons ahead of time. \n
+	intended to be called once the first window is displayed.
+	"""
+	for (lightPath, darkPath) in ICONS.values():
+		_getSourceImage(lightPath)
+		if darkPath != None:
+			_getSourceImage(darkPath)
+
+#-
+def _getSourceImage(path: str):
+	image = _sourceImages.get(path)
+	if image == None:
+		image = Image.open(os.path.join(CURRENT_FILE_DIR, path))
+		# force decoding now rather than on first draw
+		image.load()
+		_sourceImages[path] = image
+	return image
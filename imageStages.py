@@ -0,0 +1,297 @@
+import json
+import os
+
+# import type defs
+from concurrent.futures import CancelledError, Executor, Future
+from collections.abc import Iterable
+from typing import Callable
+from os import PathLike
+
+# NOTE: PIL is only imported by the worker functions, ie: in the worker processes
+# this module is imported in headless mode and must stay cheap to import
+
+#---------------------------------------------------------------------------------------------------
+class StageJob():
+	""" a group of image stage tasks running on a process pool. \n
+	polled like the copy subprocesses, it exposes the part of the Popen interface used by FileManager.pollFinishedJobs: \n
+	poll(), returncode, communicate() and args, ie: (stage name, input dir, output dir) \n
+	failedFiles - file name -> error, of the tasks that failed, filled once done \n
+	cancelledFiles - names of the files not processed because the job was cancelled, see cancel
+	"""
+
+	def __init__(self, stageName: str, inputPath: PathLike[str] | str, outputPath: PathLike[str] | str, tasks: dict[Future, str], onComplete: Callable[[dict, dict], None] | None = None) -> None:
+		""" tasks - future -> source file name \n
+		onComplete - called once all tasks are done with ({file name: result}, {file name: error})
+		"""
+		self.args = [stageName, os.path.abspath(inputPath), os.path.join(os.path.abspath(outputPath), '')]
+		self.tasks = tasks
+		self.onComplete = onComplete
+		self.returncode = None
+		self.messages = []
+		self.failedFiles = {}
+		self.cancelledFiles = []
+
+#---
+	def poll(self) -> int | None:
+		""" returns None while any task is running, then 0 if all tasks succeeded, 1 otherwise. """
+		if self.returncode != None:
+			return self.returncode
+		if not all(future.done() for future in self.tasks):
+			return None
+
+		results = {}
+		errors = {}
+		for (future, fileName) in self.tasks.items():
+			# tasks may also stop on their own once cancelled, ex: copies between chunks
+			if future.cancelled() or isinstance(future.exception(), CancelledError):
+				self.cancelledFiles.append(fileName)
+				continue
+			error = future.exception()
+			if error == None:
+				results[fileName] = future.result()
+			else:
+				errors[fileName] = error
+				self.failedFiles[fileName] = f'{type(error).__name__}: {error}'
+				self.messages.append(f'{self.args[0]} failed for {fileName}: {type(error).__name__}: {error}')
+		self.messages.append(f'{self.args[0]}: {len(results)} of {len(self.tasks)} files processed, output: {self.args[2]}')
+		if len(self.cancelledFiles) != 0:
+			self.messages.append(f'{self.args[0]}: {len(self.cancelledFiles)} files cancelled')
+
+		if self.onComplete != None:
+			self.onComplete(results, errors)
+		self.returncode = 0 if len(errors) == 0 and len(self.cancelledFiles) == 0 else 1
+		return self.returncode
+
+#-
+	def cancel(self) -> None:
+		""" drops the tasks that have not started, running ones finish unless they stop on their own. """
+		for future in self.tasks:
+			future.cancel()
+
+#-
+	def communicate(self) -> tuple[bytes, None]:
+		""" output of the job, same format as a Popen with stderr merged into stdout. """
+		return ('\n'.join(self.messages).encode('utf-8'), None)
+
+#---------------------------------------------------------------------------------------------------
+def dispatchImageStage(executor: Executor, stageName: str, settings: dict, inputPath: PathLike[str] | str, fileNames: Iterable[str], outputPath: PathLike[str] | str, cachePath: PathLike[str] | str, onComplete: Callable[[dict, dict], None] | None = None, onUpToDate: Callable[[dict], None] | None = None) -> StageJob | None:
+	""" runs an image stage on every file on the executor, skipping files whose outputs are up to date. \n
+	a file is up to date if the cache holds the same source identity (path, size, mtime) and settings as now, and all its outputs exist. \n
+	settings - preset settings of the stage, paths already resolved \n
+	cachePath - json file the identity and outputs of every processed file are stored in \n
+	onComplete - see StageJob, results are the outputs of the stage worker \n
+	onUpToDate - called right away with {file name: outputs} of the files that are up to date, see the stage workers \n
+	returns the job, None if every file is up to date.
+	"""
+
+	# sub function
+	@staticmethod
+	def _updateCache(cache: dict, cachePath: str, keys: dict, results: dict, errors: dict) -> None:
+		if onComplete != None:
+			onComplete(results, errors)
+
+		for (fileName, outputs) in results.items():
+			cache[fileName] = {'key': keys[fileName], 'outputs': outputs}
+		for fileName in errors:
+			cache.pop(fileName, None)
+
+		# written to a temp file then renamed, an interrupted write never corrupts the cache
+		os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+		tempPath = f'{cachePath}.tmp'
+		with open(tempPath, 'w') as file:
+			json.dump(cache, file)
+		os.replace(tempPath, cachePath)
+
+	# main function
+	stage = IMAGE_STAGES[stageName]
+	cache = _loadCache(cachePath)
+	# files the stage depends on besides the source, ex: a watermark
+	settingsKey = json.dumps([settings, [_fileIdentity(settings[key]) for key in stage['pathSettings']]], sort_keys=True)
+
+	os.makedirs(outputPath, exist_ok=True)
+	keys = {}
+	tasks = {}
+	upToDate = {}
+	for fileName in fileNames:
+		sourcePath = os.path.abspath(os.path.join(inputPath, fileName))
+		key = [_fileIdentity(sourcePath), settingsKey]
+
+		entry = cache.get(fileName)
+		# outputs without digests (ie: a list) are from before outputs were hashed
+		if entry != None and entry['key'] == key and isinstance(entry['outputs'], dict) and all(os.path.isfile(os.path.join(outputPath, output)) for output in entry['outputs']):
+			upToDate[fileName] = entry['outputs']
+			continue
+
+		keys[fileName] = key
+		tasks[executor.submit(stage['worker'], sourcePath, os.path.abspath(outputPath), settings)] = fileName
+
+	if onUpToDate != None and len(upToDate) != 0:
+		onUpToDate(upToDate)
+	if len(tasks) == 0:
+		return None
+	return StageJob(stageName, inputPath, outputPath, tasks, lambda results, errors: _updateCache(cache, cachePath, keys, results, errors))
+
+#-
+def _loadCache(cachePath: PathLike[str] | str) -> dict:
+	try:
+		with open(cachePath) as file:
+			return json.load(file)
+	except (OSError, ValueError):
+		# missing or corrupted, everything is processed again
+		return {}
+
+#-
+def _fileIdentity(path: PathLike[str] | str) -> list:
+	fileStat = os.stat(path)
+	return [os.path.abspath(path), fileStat.st_size, fileStat.st_mtime_ns]
+
+#---------------------------------------------------------------------------------------------------
+# stage workers, run in the worker processes
+# each takes (source path, output dir, settings) and returns the files written to the output dir, {name: see _saveImage}
+
+def buildMipChain(sourcePath: str, outputPath: str, settings: dict) -> dict[str, dict]:
+	""" writes every mip level of an image down to minSize, each level is downscaled from the previous one. \n
+	settings: \n
+	minSize - size of the smallest level's largest side, default 1 \n
+	maxLevels - maximum number of levels written, default unlimited \n
+	resample - 'box' (default), 'bilinear', 'bicubic', 'lanczos' or 'nearest' \n
+	format - ext of the written levels, ex: '.png', defaults to the source's \n
+	levels are named <name>_mip<level><ext>, level 0 being the source itself.
+	"""
+	from PIL import Image
+
+	resample = {
+		'box': Image.Resampling.BOX,
+		'bilinear': Image.Resampling.BILINEAR,
+		'bicubic': Image.Resampling.BICUBIC,
+		'lanczos': Image.Resampling.LANCZOS,
+		'nearest': Image.Resampling.NEAREST,
+	}[settings.get('resample', 'box')]
+	minSize = max(1, settings.get('minSize', 1))
+	maxLevels = settings.get('maxLevels')
+
+	(stem, ext) = os.path.splitext(os.path.basename(sourcePath))
+	ext = settings.get('format') or ext
+
+	outputs = {}
+	with Image.open(sourcePath) as image:
+		level = image
+		while max(level.size) > minSize and (maxLevels == None or len(outputs) < maxLevels):
+			level = level.resize((max(1, level.width // 2), max(1, level.height // 2)), resample)
+			outputName = f'{stem}_mip{len(outputs) + 1}{ext}'
+			outputs[outputName] = _saveImage(level, os.path.join(outputPath, outputName), 'mipmaps')
+
+	return outputs
+
+#-
+# per worker process caches, see _getWatermark
+# (path, size, mtime) -> source watermark
+_watermarks = {}
+# (path, size, mtime, width, height, opacity) -> watermark ready to be composited
+_scaledWatermarks = {}
+
+def applyWatermark(sourcePath: str, outputPath: str, settings: dict) -> dict[str, dict]:
+	""" composites a watermark over an image, written to the output dir under the same name. \n
+	the watermark is loaded and scaled once per worker process, then reused for every image of the same size. \n
+	settings: \n
+	watermark - path of the watermark image, ideally with transparency \n
+	scale - width of the watermark relative to the image's, default 0.25 \n
+	opacity - 0 to 1, default 0.5 \n
+	position - 'center', or a combination of 'top'/'bottom' and 'left'/'right', ex: 'bottom-right' (default) \n
+	margin - distance to the image's edges relative to its width, default 0.02 \n
+	quality - jpeg quality, default 95
+	"""
+	from PIL import Image
+
+	with Image.open(sourcePath) as image:
+		imageFormat = image.format
+		sourceMode = image.mode
+		composited = image.convert('RGBA')
+
+	watermark = _getWatermark(settings['watermark'], composited.size, settings.get('scale', 0.25), settings.get('opacity', 0.5))
+
+	# placement
+	margin = round(composited.width * settings.get('margin', 0.02))
+	position = settings.get('position', 'bottom-right')
+	x = (composited.width - watermark.width) // 2
+	y = (composited.height - watermark.height) // 2
+	if 'left' in position:
+		x = margin
+	elif 'right' in position:
+		x = composited.width - watermark.width - margin
+	if 'top' in position:
+		y = margin
+	elif 'bottom' in position:
+		y = composited.height - watermark.height - margin
+
+	composited.alpha_composite(watermark, (max(0, x), max(0, y)))
+
+	# keep the source's mode where the format allows it
+	if sourceMode not in ('RGBA', 'LA') or imageFormat == 'JPEG':
+		composited = composited.convert('L' if sourceMode in ('L', 'LA') else 'RGB')
+
+	outputName = os.path.basename(sourcePath)
+	saveOptions = {'quality': settings.get('quality', 95)} if imageFormat == 'JPEG' else {}
+	return {outputName: _saveImage(composited, os.path.join(outputPath, outputName), 'watermark', imageFormat, **saveOptions)}
+
+#-
+def _getWatermark(path: str, imageSize: tuple[int, int], scale: float, opacity: float):
+	""" the watermark scaled for an image size, cached for the lifetime of the worker process. """
+	from PIL import Image
+
+	fileStat = os.stat(path)
+	sourceKey = (path, fileStat.st_size, fileStat.st_mtime_ns)
+	source = _watermarks.get(sourceKey)
+	if source == None:
+		with Image.open(path) as watermarkImage:
+			source = watermarkImage.convert('RGBA')
+		_watermarks[sourceKey] = source
+
+	width = max(1, round(imageSize[0] * scale))
+	height = max(1, round(source.height * width / source.width))
+	scaledKey = (*sourceKey, width, height, opacity)
+	scaled = _scaledWatermarks.get(scaledKey)
+	if scaled == None:
+		scaled = source.resize((width, height), Image.Resampling.LANCZOS)
+		scaled.putalpha(scaled.getchannel('A').point(lambda value: round(value * opacity)))
+		# renders usually share a few sizes, avoids growing without bounds otherwise
+		if len(_scaledWatermarks) >= 16:
+			_scaledWatermarks.clear()
+		_scaledWatermarks[scaledKey] = scaled
+
+	return scaled
+
+#-
+def _saveImage(image, path: str, stageName: str, imageFormat: str | None = None, **saveOptions) -> dict:
+	""" saves to a temp file then renames it, an interrupted stage never leaves a partial image behind. \n
+	returns the digest of the written file for the preset's manifest, see verifiedCopy.writeManifest
+	"""
+	from PIL import Image
+	# imported here, verifiedCopy imports this module
+	from verifiedCopy import hashFile
+
+	if imageFormat == None:
+		imageFormat = Image.registered_extensions()[os.path.splitext(path)[1].lower()]
+	tempPath = f'{path}.tmp'
+	try:
+		image.save(tempPath, format=imageFormat, **saveOptions)
+		# read back before the rename, some encoders (ex: tiff) seek while writing so the data cannot be hashed as it is written
+		with open(tempPath, 'rb') as file:
+			(digest, byteCount) = hashFile(file)
+		os.replace(tempPath, path)
+	finally:
+		if os.path.exists(tempPath):
+			os.remove(tempPath)
+
+	return {'digest': digest, 'bytes': byteCount, 'method': stageName}
+
+#---------------------------------------------------------------------------------------------------
+# stage name -> definition
+# worker - function run in the worker processes, see above
+# collections - dir layout paths of the collections processed by default
+# pathSettings - settings holding file paths, resolved relative to the asset root and part of the cache key
+# replacesSource - whether the stage writes each file under its source's name, the source is then not copied if output is './'
+IMAGE_STAGES = {
+	'mipmaps': {'worker': buildMipChain, 'collections': ('texs',), 'pathSettings': (), 'replacesSource': False},
+	'watermark': {'worker': applyWatermark, 'collections': ('imgs',), 'pathSettings': ('watermark',), 'replacesSource': True},
+}
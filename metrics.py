@@ -0,0 +1,219 @@
+import threading
+import atexit
+import json
+import time
+import sys
+import os
+
+# import type defs
+from os import PathLike
+
+# NOTE: everything in this module is a no-op until enableMetrics() is called,
+# span() then only costs a global lookup, keep it that way
+
+# the active recorder, None if metrics are disabled
+_recorder = None
+
+#---------------------------------------------------------------------------------------------------
+class _NullSpan():
+	""" span returned while metrics are disabled. """
+	__slots__ = ()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *_) -> None:
+		pass
+
+	def set(self, **attrs) -> None:
+		pass
+
+# shared since it holds no state
+_NULL_SPAN = _NullSpan()
+
+#-
+class _Span():
+	""" times the enclosed block, see span(). """
+	__slots__ = ('recorder', 'name', 'attrs', 'start')
+
+	def __init__(self, recorder, name: str, attrs: dict) -> None:
+		self.recorder = recorder
+		self.name = name
+		self.attrs = attrs
+		self.start = 0.0
+
+	def __enter__(self):
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, errorType, *_) -> None:
+		if errorType != None:
+			self.attrs['error'] = errorType.__name__
+		self.recorder.record(self.name, time.perf_counter() - self.start, self.attrs)
+
+	def set(self, **attrs) -> None:
+		""" adds attributes to the span, ex: sizes only known at the end of the block. """
+		self.attrs.update(attrs)
+
+#---------------------------------------------------------------------------------------------------
+class MetricsRecorder():
+	""" writes every event as a json line to logPath, and per event name totals as a prometheus textfile to promPath. \n
+	numeric attributes are summed per event name, ex: bytes. \n
+	thread safe.
+	"""
+
+	def __init__(self, logPath: PathLike[str] | str | None = None, promPath: PathLike[str] | str | None = None) -> None:
+		self.logPath = logPath
+		self.promPath = promPath
+		self.lock = threading.Lock()
+
+		# line buffered, events are visible as they happen
+		self._logFile = open(logPath, 'a', buffering=1) if logPath != None else None
+		# event name -> {'count': int, 'seconds': float, <numeric attr>: float}
+		self.totals = {}
+
+#---
+	def record(self, name: str, duration: float, attrs: dict) -> None:
+		""" records an event that took duration seconds. """
+		with self.lock:
+			totals = self.totals.setdefault(name, {'count': 0, 'seconds': 0.0})
+			totals['count'] += 1
+			totals['seconds'] += duration
+			for (key, value) in attrs.items():
+				if isinstance(value, (int, float)) and not isinstance(value, bool):
+					totals[key] = totals.get(key, 0) + value
+
+			if self._logFile != None:
+				event = {'ts': time.time(), 'pid': os.getpid(), 'thread': threading.current_thread().name, 'event': name, 'duration': duration}
+				event.update(attrs)
+				self._logFile.write(json.dumps(event, default=str) + '\n')
+
+#-
+	def takeTotals(self) -> dict:
+		""" returns the totals recorded since the last call, and resets them. """
+		with self.lock:
+			(totals, self.totals) = (self.totals, {})
+		return totals
+
+#-
+	def mergeTotals(self, totals: dict) -> None:
+		""" adds totals recorded elsewhere, ex: by a worker process. """
+		with self.lock:
+			for (name, values) in totals.items():
+				ownValues = self.totals.setdefault(name, {'count': 0, 'seconds': 0.0})
+				for (key, value) in values.items():
+					ownValues[key] = ownValues.get(key, 0) + value
+
+#-
+	def writePrometheus(self) -> None:
+		""" writes the totals in the prometheus textfile format. \n
+		written to a temp file then renamed, so that collectors never read a partial file.
+		"""
+		if self.promPath == None:
+			return
+
+		lines = [
+			'# HELP asset_exporter_events_total number of times each phase ran',
+			'# TYPE asset_exporter_events_total counter',
+		]
+		with self.lock:
+			totals = {name: dict(values) for (name, values) in self.totals.items()}
+
+		for (name, values) in sorted(totals.items()):
+			lines.append(f'asset_exporter_events_total{{event="{name}"}} {values["count"]}')
+		lines.extend([
+			'# HELP asset_exporter_seconds_total time spent in each phase',
+			'# TYPE asset_exporter_seconds_total counter',
+		])
+		for (name, values) in sorted(totals.items()):
+			lines.append(f'asset_exporter_seconds_total{{event="{name}"}} {values["seconds"]:.6f}')
+		lines.extend([
+			'# HELP asset_exporter_attribute_total sum of the numeric attributes of each phase, ex: bytes',
+			'# TYPE asset_exporter_attribute_total counter',
+		])
+		for (name, values) in sorted(totals.items()):
+			for (key, value) in sorted(values.items()):
+				if key not in ('count', 'seconds'):
+					lines.append(f'asset_exporter_attribute_total{{event="{name}",attribute="{key}"}} {value}')
+
+		tempPath = f'{self.promPath}.{os.getpid()}.tmp'
+		with open(tempPath, 'w') as file:
+			file.write('\n'.join(lines) + '\n')
+		os.replace(tempPath, self.promPath)
+
+#-
+	def close(self) -> None:
+		self.writePrometheus()
+		if self._logFile != None:
+			self._logFile.close()
+			self._logFile = None
+
+#---------------------------------------------------------------------------------------------------
+def enableMetrics(logPath: PathLike[str] | str | None = None, promPath: PathLike[str] | str | None = None) -> MetricsRecorder:
+	""" starts recording metrics, written to disk at exit. \n
+	logPath - json lines file events are appended to \n
+	promPath - prometheus textfile (ex: for the node exporter textfile collector) the totals are written to
+	"""
+	global _recorder
+	if _recorder != None:
+		_recorder.close()
+
+	_recorder = MetricsRecorder(logPath, promPath)
+	atexit.register(_recorder.close)
+	return _recorder
+
+#-
+def isEnabled() -> bool:
+	return _recorder != None
+
+#-
+def getRecorder() -> MetricsRecorder | None:
+	return _recorder
+
+#-
+def span(name: str, **attrs):
+	""" context manager timing the enclosed block as an event. \n
+	ex: with span('scanCollection', dirPath=path) as scanSpan: ... scanSpan.set(files=count)
+	"""
+	if _recorder == None:
+		return _NULL_SPAN
+	return _Span(_recorder, name, attrs)
+
+#-
+def record(name: str, duration: float, **attrs) -> None:
+	""" records an event timed by the caller, ex: a subprocess polled to completion. """
+	if _recorder != None:
+		_recorder.record(name, duration, attrs)
+
+#---------------------------------------------------------------------------------------------------
+def startProfiling(profilePath: PathLike[str] | str, topAllocations: int = 25) -> None:
+	""" profiles the rest of the run with cProfile and tracemalloc, written to disk at exit. \n
+	profilePath - cProfile stats file, readable with pstats or snakeviz. the largest allocation sites are written to <profilePath>.tracemalloc.txt \n
+	NOTE: cProfile only sees the calling thread, tracemalloc sees every thread
+	"""
+
+	# sub function
+	@staticmethod
+	def _stopProfiling(profiler, profilePath: str, topAllocations: int) -> None:
+		profiler.disable()
+		profiler.dump_stats(profilePath)
+
+		snapshot = tracemalloc.take_snapshot()
+		(current, peak) = tracemalloc.get_traced_memory()
+		tracemalloc.stop()
+		with open(f'{profilePath}.tracemalloc.txt', 'w') as file:
+			file.write(f'current: {current / 2**20:.2f} MiB, peak: {peak / 2**20:.2f} MiB\n\n')
+			for stat in snapshot.statistics('lineno')[:topAllocations]:
+				file.write(f'{stat}\n')
+
+		print(f'profile written to: {os.path.abspath(profilePath)}', file=sys.stderr)
+
+	# main function
+	# only imported when profiling
+	import cProfile
+	import tracemalloc
+
+	tracemalloc.start()
+	profiler = cProfile.Profile()
+	profiler.enable()
+	atexit.register(_stopProfiling, profiler, profilePath, topAllocations)
@@ -1,4 +1,6 @@
 import threading
+import metrics
+import os
 
 # import type defs
 from os import PathLike
@@ -91,7 +93,8 @@ class ObjAnalyzer():
 
 #---
 	def _readFile(self, inputPathOverride: PathLike | None  = None) -> None:
-		with open(inputPathOverride or self.inputPath, 'rb') as fileData:
+		inputPath = inputPathOverride or self.inputPath
+		with metrics.span('objParse', path=inputPath) as parseSpan, open(inputPath, 'rb') as fileData:
 			for line in fileData:
 				# double if since faster than and ¯\_(ツ)_/¯
 				if line[0] == self.VERTEX_PATTERN[0]:
@@ -113,6 +116,10 @@ class ObjAnalyzer():
 					if line[1] == self.OBJECT_PATTERN[1]:
 						self.objectNames.append(line[2:-1].decode())
 
+			if metrics.isEnabled():
+				byteCount = os.path.getsize(inputPath)
+				parseSpan.set(bytes=byteCount, vertices=self.vertCount, faces=self.faceCount)
+
 #-
 	def _writeFile(self, outputPathOverride: PathLike | None = None)-> None:
 		with open(outputPathOverride or self.outputPath, 'w+') as fileData:
@@ -0,0 +1,257 @@
+from array import array
+import tempfile
+import sqlite3
+import os
+
+# import type defs
+from collections.abc import Iterable
+from typing import BinaryIO, Callable
+
+# vertex records that are merged, see optimizeObj
+VERTEX_STATEMENTS = (b'v', b'vt', b'vn')
+# statements referencing vertices, by position in a v/vt/vn reference
+_ELEMENT_STATEMENTS = {b'f', b'l', b'p'}
+# unique vertices of a kind kept in memory before the tables spill to disk, about 100 bytes each
+MAX_MEMORY_VERTICES = 2_000_000
+# lines written at once
+_WRITE_BATCH = 4096
+# reindexed element corners kept, corners are usually shared by a few neighbouring faces
+_CORNER_CACHE_SIZE = 65536
+# rows inserted at once into a spilled table
+_SPILL_BATCH = 65536
+
+#---------------------------------------------------------------------------------------------------
+def optimizeObj(source: BinaryIO, output: BinaryIO, settings: dict, rewriteLine: Callable[[bytes], bytes] | None = None) -> dict:
+	""" streams an obj file, stripping comments and blank lines, merging duplicate v/vt/vn records and reindexing the elements (f, l, p) using them. \n
+	records are duplicates if their values are the same text once whitespace is normalized, ie: '1.0' and '1' are not merged. \n
+	faces can only use previously defined vertices, so the file is read once and written as it is read, in its original order. \n
+	the dedup tables move to a temporary sqlite database past maxMemoryVertices, files larger than memory are then slower but supported. \n
+	faces left with repeated vertices by the merge lose the repeated corners, faces left with less than 3 corners are dropped. \n
+	settings: \n
+	triangulate - split faces with more than 3 corners into triangles as a fan, correct for convex faces, default False \n
+	maxMemoryVertices - see MAX_MEMORY_VERTICES \n
+	rewriteLine - applied to every other statement, ex: to rewrite mtllib paths \n
+	returns {'before': counts, 'after': counts, 'degenerateFaces': dropped face count}, counts being {'v', 'vt', 'vn', 'f', 'comments', 'bytes'}
+	"""
+	triangulate = settings.get('triangulate', False)
+	maxMemoryVertices = settings.get('maxMemoryVertices', MAX_MEMORY_VERTICES)
+	# statement -> [count before, count after]
+	counts = {b'v': [0, 0], b'vt': [0, 0], b'vn': [0, 0], b'f': [0, 0]}
+	commentCount = 0
+	degenerateCount = 0
+	writtenByteCount = 0
+
+	with tempfile.TemporaryDirectory(prefix='objOptimizer') as spillDir:
+		tables = {statement: _VertexTable(os.path.join(spillDir, f'{statement.decode()}.sqlite'), maxMemoryVertices) for statement in VERTEX_STATEMENTS}
+		# v, vt and vn tables by position in a v/vt/vn reference
+		referenceTables = [tables[b'v'], tables[b'vt'], tables[b'vn']]
+		# corner -> reindexed corner, absolute ones only since relative ones change meaning
+		corners = {}
+		lines = []
+		try:
+			for line in source:
+				tokens = line.split()
+				if len(tokens) == 0:
+					continue
+				statement = tokens[0]
+
+				table = tables.get(statement)
+				if table != None:
+					statementCounts = counts[statement]
+					statementCounts[0] += 1
+					record = b' '.join(tokens[1:])
+					if table.add(record)[1]:
+						statementCounts[1] += 1
+						lines.append(b'%s %s\n' % (statement, record))
+
+				elif statement in _ELEMENT_STATEMENTS:
+					references = []
+					for reference in tokens[1:]:
+						newReference = corners.get(reference)
+						if newReference == None:
+							newReference = _reindex(reference, referenceTables)
+							if b'-' not in reference:
+								if len(corners) >= _CORNER_CACHE_SIZE:
+									corners.clear()
+								corners[reference] = newReference
+						references.append(newReference)
+
+					if statement == b'f':
+						counts[b'f'][0] += 1
+						(references, vertices) = _dropRepeatedCorners(references)
+						faceCount = 0
+						if len(references) < 3:
+							pass
+						elif triangulate and len(references) > 3:
+							for i in range(1, len(references) - 1):
+								# corners repeated further apart than neighbours
+								if vertices[0] != vertices[i] and vertices[0] != vertices[i + 1]:
+									lines.append(b'f %s %s %s\n' % (references[0], references[i], references[i + 1]))
+									faceCount += 1
+						else:
+							lines.append(b'f ' + b' '.join(references) + b'\n')
+							faceCount = 1
+						counts[b'f'][1] += faceCount
+						if faceCount == 0:
+							degenerateCount += 1
+					else:
+						lines.append(statement + b' ' + b' '.join(references) + b'\n')
+
+				elif statement.startswith(b'#'):
+					commentCount += 1
+
+				else:
+					lines.append(rewriteLine(line) if rewriteLine != None else line)
+
+				if len(lines) >= _WRITE_BATCH:
+					writtenByteCount += _writeLines(output, lines)
+					lines = []
+			writtenByteCount += _writeLines(output, lines)
+		finally:
+			for table in tables.values():
+				table.close()
+
+	before = {statement.decode(): statementCounts[0] for (statement, statementCounts) in counts.items()}
+	after = {statement.decode(): statementCounts[1] for (statement, statementCounts) in counts.items()}
+	before.update({'comments': commentCount, 'bytes': source.tell()})
+	after.update({'comments': 0, 'bytes': writtenByteCount})
+	return {'before': before, 'after': after, 'degenerateFaces': degenerateCount}
+
+#---------------------------------------------------------------------------------------------------
+class _VertexTable():
+	""" unique records of a vertex kind and the new index of every original one, in memory until it holds maxMemoryVertices records. \n
+	indices are 1 based like in obj files.
+	"""
+
+	def __init__(self, spillPath: str, maxMemoryVertices: int) -> None:
+		self.spillPath = spillPath
+		self.maxMemoryVertices = maxMemoryVertices
+		# original vertex count, ie: the index of the last original record
+		self.count = 0
+		self.uniqueCount = 0
+		# record -> new index
+		self.indices = {}
+		# original index - 1 -> new index
+		self.remap = array('Q')
+		# see _spill
+		self.db = None
+		# rows not inserted in the database yet, see _flush, record -> new index and new indices of the original records past flushedCount
+		self.pendingRecords = {}
+		self.pendingRemap = array('Q')
+		self.flushedCount = 0
+
+#---
+	def add(self, record: bytes) -> tuple[int, bool]:
+		""" registers the next original record, returns (its new index, whether it is the first of its value). """
+		self.count += 1
+		if self.db != None:
+			return self._addSpilled(record)
+
+		index = self.indices.get(record)
+		isNew = index == None
+		if isNew:
+			self.uniqueCount += 1
+			index = self.uniqueCount
+			self.indices[record] = index
+		self.remap.append(index)
+
+		if self.uniqueCount > self.maxMemoryVertices:
+			self._spill()
+		return (index, isNew)
+
+#-
+	def get(self, originalIndex: int) -> int:
+		""" new index of an original one, negative ones being relative to the last record. """
+		if originalIndex < 0:
+			originalIndex += self.count + 1
+		if originalIndex < 1 or originalIndex > self.count:
+			raise ValueError(f'vertex index out of range: {originalIndex}')
+
+		if self.db == None:
+			return self.remap[originalIndex - 1]
+		if originalIndex > self.flushedCount:
+			return self.pendingRemap[originalIndex - self.flushedCount - 1]
+		return self.db.execute('SELECT idx FROM remap WHERE orig = ?', (originalIndex,)).fetchone()[0]
+
+#-
+	def close(self) -> None:
+		if self.db != None:
+			self.db.close()
+			self.db = None
+
+#---
+	def _spill(self) -> None:
+		""" moves the tables to a sqlite database, every later lookup goes through it. """
+		self.db = sqlite3.connect(self.spillPath, isolation_level=None)
+		# a scratch database, nothing to recover if interrupted
+		self.db.execute('PRAGMA journal_mode = OFF')
+		self.db.execute('PRAGMA synchronous = OFF')
+		self.db.execute('CREATE TABLE records (record BLOB PRIMARY KEY, idx INTEGER) WITHOUT ROWID')
+		self.db.execute('CREATE TABLE remap (orig INTEGER PRIMARY KEY, idx INTEGER)')
+		self.db.execute('BEGIN')
+		self.db.executemany('INSERT INTO records VALUES (?, ?)', self.indices.items())
+		self.db.executemany('INSERT INTO remap VALUES (?, ?)', enumerate(self.remap, 1))
+		self.flushedCount = len(self.remap)
+		self.indices = {}
+		self.remap = array('Q')
+
+#-
+	def _addSpilled(self, record: bytes) -> tuple[int, bool]:
+		index = self.pendingRecords.get(record)
+		if index == None:
+			row = self.db.execute('SELECT idx FROM records WHERE record = ?', (record,)).fetchone()
+			index = row[0] if row != None else None
+		isNew = index == None
+		if isNew:
+			self.uniqueCount += 1
+			index = self.uniqueCount
+			self.pendingRecords[record] = index
+		self.pendingRemap.append(index)
+
+		if len(self.pendingRemap) >= _SPILL_BATCH:
+			self._flush()
+		return (index, isNew)
+
+#-
+	def _flush(self) -> None:
+		""" inserts the pending rows in a single executemany per table. """
+		self.db.executemany('INSERT INTO records VALUES (?, ?)', self.pendingRecords.items())
+		self.db.executemany('INSERT INTO remap VALUES (?, ?)', enumerate(self.pendingRemap, self.flushedCount + 1))
+		self.flushedCount += len(self.pendingRemap)
+		self.pendingRecords = {}
+		self.pendingRemap = array('Q')
+
+#---------------------------------------------------------------------------------------------------
+def _reindex(reference: bytes, referenceTables: list[_VertexTable]) -> bytes:
+	""" new v/vt/vn reference of an element corner, ex: b'12/3/-1' -> b'8/3/5'. """
+	parts = reference.split(b'/')
+	for (i, part) in enumerate(parts):
+		if len(part) != 0:
+			table = referenceTables[i]
+			index = int(part)
+			# in memory absolute index, by far the most common
+			if table.db == None and 0 < index <= table.count:
+				parts[i] = b'%d' % table.remap[index - 1]
+			else:
+				parts[i] = b'%d' % table.get(index)
+	return b'/'.join(parts)
+
+#-
+def _dropRepeatedCorners(references: list[bytes]) -> tuple[list[bytes], list[bytes]]:
+	""" removes the corners of a face using the same vertex as the previous one, the first corner following the last. \n
+	returns (corners, their v indices), ex: [b'1/1', b'2/2', b'2/3', b'3/4'] -> ([b'1/1', b'2/2', b'3/4'], [b'1', b'2', b'3'])
+	"""
+	vertices = [reference.partition(b'/')[0] for reference in references]
+	if len(set(vertices)) == len(vertices):
+		return (references, vertices)
+
+	kept = [0] + [i for i in range(1, len(vertices)) if vertices[i] != vertices[i - 1]]
+	while len(kept) > 1 and vertices[kept[-1]] == vertices[0]:
+		kept.pop()
+	return ([references[i] for i in kept], [vertices[i] for i in kept])
+
+#-
+def _writeLines(output: BinaryIO, lines: Iterable[bytes]) -> int:
+	data = b''.join(lines)
+	output.write(data)
+	return len(data)
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+import json
+
+from fileDataClasses import FileCategory, PresetFileCollectionData
+
+#---------------------------------------------------------------------------------------------------
+class PresetDataCache():
+	""" LRU cache of preset structures, see FileManager.getPresetFileData. \n
+	entries are keyed on the preset name and its definition, editing a preset's settings therefore never serves the old structure. \n
+	collections whose files changed since they were last accessed are refreshed on access, the rest of the structure is reused.
+	"""
+
+	def __init__(self, maxSize: int = 8) -> None:
+		self.maxSize = maxSize
+		self._entries = OrderedDict()
+
+		# stats
+		self.hits = 0
+		self.misses = 0
+		self.refreshes = 0
+
+#---
+	def get(self, presetName: str, presetDefinition: dict) -> FileCategory | None:
+		""" get the cached structure of a preset, None if not cached. """
+
+		# sub function
+		@staticmethod
+		def _refreshStale(presetCollection, cache: PresetDataCache) -> None:
+			if isinstance(presetCollection, PresetFileCollectionData) and presetCollection.isStale():
+				presetCollection.refresh()
+				cache.refreshes += 1
+
+		# main function
+		key = self._makeKey(presetName, presetDefinition)
+		presetData = self._entries.get(key)
+		if presetData == None:
+			self.misses += 1
+			return None
+
+		self.hits += 1
+		self._entries.move_to_end(key)
+		presetData.foreachRecursive(_refreshStale, self)
+		return presetData
+
+#-
+	def set(self, presetName: str, presetDefinition: dict, presetData: FileCategory) -> None:
+		""" caches the structure of a preset, evicting the least recently used one if full. """
+		key = self._makeKey(presetName, presetDefinition)
+		self._entries[key] = presetData
+		self._entries.move_to_end(key)
+
+		while len(self._entries) > self.maxSize:
+			self._entries.popitem(last=False)
+
+#-
+	def invalidate(self, presetName: str | None = None) -> None:
+		""" removes the entries of a preset, or all entries if presetName is None. """
+		if presetName == None:
+			self._entries.clear()
+		else:
+			for key in [key for key in self._entries if key[0] == presetName]:
+				del self._entries[key]
+
+#-
+	def __len__(self) -> int:
+		return len(self._entries)
+
+#---
+	def _makeKey(self, presetName: str, presetDefinition: dict) -> tuple[str, str]:
+		return (presetName, json.dumps(presetDefinition, sort_keys=True))
@@ -0,0 +1,38 @@
+import unittest
+import tempfile
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from copyConcurrency import MAX_CONCURRENCY, CopyConcurrencyController, getDeviceKey, loadConcurrencyState, saveConcurrencyState
+
+#---------------------------------------------------------------------------------------------------
+class CopyConcurrencyTests(unittest.TestCase):
+	def test_sharedControllersSplitTheConcurrency(self) -> None:
+		controller = CopyConcurrencyController('key', {'optimum': 8}, shareCount=4)
+		self.assertEqual(controller.limit, 2)
+		self.assertEqual(controller.maxLimit, MAX_CONCURRENCY // 4)
+
+		# never below one copy, whatever the share
+		self.assertEqual(CopyConcurrencyController('key', {'optimum': 2}, shareCount=64).limit, 1)
+
+#-
+	def test_deviceKeyIncludesTheMountPoint(self) -> None:
+		with tempfile.TemporaryDirectory() as tempDir:
+			key = getDeviceKey(tempDir, os.path.join(tempDir, 'not', 'created', 'yet'))
+			(source, output) = key.split(' -> ')
+			self.assertEqual(source, output)
+			(device, mountPoint) = source.split('@', 1)
+			self.assertEqual(int(device), os.stat(tempDir).st_dev)
+			self.assertTrue(os.path.ismount(mountPoint))
+
+#-
+	def test_stateIsStoredAtTheGivenPath(self) -> None:
+		with tempfile.TemporaryDirectory() as tempDir:
+			statePath = os.path.join(tempDir, 'state', 'copyConcurrency.json')
+			saveConcurrencyState({'a': {'optimum': 3}}, statePath)
+			saveConcurrencyState({'b': {'optimum': 5}}, statePath)
+			self.assertEqual(loadConcurrencyState(statePath), {'a': {'optimum': 3}, 'b': {'optimum': 5}})
+
+if __name__ == '__main__':
+	unittest.main()
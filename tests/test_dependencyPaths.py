@@ -0,0 +1,115 @@
+import unittest
+import tempfile
+import hashlib
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dependencyPaths import rewriteDependencies
+
+#---------------------------------------------------------------------------------------------------
+class RewriteDependenciesTests(unittest.TestCase):
+	""" models in <asset>/models/ referencing textures in <asset>/models/tex/, exported to <output>/models/ and <output>/textures/. """
+
+	def setUp(self) -> None:
+		self.tempDir = tempfile.TemporaryDirectory()
+		self.sourceDir = os.path.join(self.tempDir.name, 'asset', 'models')
+		self.outputDir = os.path.join(self.tempDir.name, 'output')
+		for dirPath in (os.path.join(self.sourceDir, 'tex'), os.path.join(self.outputDir, 'models'), os.path.join(self.outputDir, 'textures')):
+			os.makedirs(dirPath)
+
+		self.pathMap = {}
+		for textureName in ('wood.png', 'my wood.png'):
+			self._addExport(os.path.join('tex', textureName), os.path.join('textures', textureName))
+		for modelName in ('model.mtl', 'my materials.mtl', 'other.mtl'):
+			self._addExport(modelName, os.path.join('models', modelName))
+
+	def tearDown(self) -> None:
+		self.tempDir.cleanup()
+
+#-
+	def test_mtlOptionsAreKept(self) -> None:
+		lines = [
+			b'newmtl wood\r\n',
+			b'map_Kd -o 0.5 0.5 -s 2 2 1 -bm 0.3 tex/wood.png\r\n',
+			b'\tmap_Bump -clamp on -mm 0 1 tex/my wood.png\n',
+			b'map_Ks -o 1 tex\\wood.png\n',
+			b'map_Ka missing.png\n',
+		]
+		(output, report) = self._rewrite('model.mtl', b''.join(lines))
+
+		self.assertEqual(output.splitlines(keepends=True), [
+			b'newmtl wood\r\n',
+			b'map_Kd -o 0.5 0.5 -s 2 2 1 -bm 0.3 ../textures/wood.png\r\n',
+			b'\tmap_Bump -clamp on -mm 0 1 ../textures/my wood.png\n',
+			b'map_Ks -o 1 ../textures/wood.png\n',
+			b'map_Ka missing.png\n',
+		])
+		self.assertEqual(report['unresolved'], ['missing.png'])
+		self.assertEqual(len(report['changed']), 3)
+
+#-
+	def test_mtllibWithSpaces(self) -> None:
+		# a single file with spaces in its name, then several files
+		(output, report) = self._rewrite('model.obj', b'mtllib my materials.mtl\nmtllib model.mtl other.mtl\nv 0 0 0\n')
+
+		self.assertEqual(output, b'mtllib my materials.mtl\nmtllib model.mtl other.mtl\nv 0 0 0\n')
+		self.assertEqual(report['changed'], [])
+		self.assertEqual(report['unresolved'], [])
+
+#-
+	def test_mtllibIsRewritten(self) -> None:
+		self.pathMap[os.path.join(self.sourceDir, 'model.mtl')] = os.path.join(self.outputDir, 'materials', 'model.mtl')
+		(output, report) = self._rewrite('model.obj', b'v 0 0 0\r\nmtllib model.mtl\r\nf 1 1 1')
+
+		self.assertEqual(output, b'v 0 0 0\r\nmtllib ../materials/model.mtl\r\nf 1 1 1')
+		self.assertEqual(report['changed'], [['model.mtl', '../materials/model.mtl']])
+
+#-
+	def test_gltfUriQuoteRoundTrip(self) -> None:
+		gltf = {'asset': {'version': '2.0'}, 'images': [{'uri': 'tex/my%20wood.png'}, {'uri': 'data:image/png;base64,AAAA'}], 'buffers': [{'byteLength': 4}]}
+		(output, report) = self._rewrite('model.gltf', json.dumps(gltf, separators=(',', ':')).encode('utf-8'))
+
+		images = json.loads(output)['images']
+		self.assertEqual(images[0]['uri'], '../textures/my%20wood.png')
+		self.assertEqual(images[1]['uri'], 'data:image/png;base64,AAAA')
+		# reported unquoted, as the file names they are
+		self.assertEqual(report['changed'], [['tex/my wood.png', '../textures/my wood.png']])
+
+#-
+	def test_unchangedGltfIsWrittenByteForByte(self) -> None:
+		# minified, with non ascii text, and a uri already matching where the texture is exported
+		self._addExport(os.path.join('tex', 'bois é.png'), os.path.join('models', 'tex', 'bois é.png'))
+		data = '{"asset":{"version":"2.0","generator":"café"},"images":[{"uri":"tex/bois%20%C3%A9.png"}]}'.encode('utf-8')
+		(output, report) = self._rewrite('model.gltf', data)
+
+		self.assertEqual(output, data)
+		self.assertEqual(report['changed'], [])
+		self.assertEqual(report['output'], {'digest': hashlib.sha256(data).hexdigest(), 'bytes': len(data), 'method': 'rewritePaths'})
+
+#-
+	def test_outputIsHashed(self) -> None:
+		(output, report) = self._rewrite('model.mtl', b'map_Kd tex/wood.png\n')
+
+		self.assertEqual(report['output']['digest'], hashlib.sha256(output).hexdigest())
+		self.assertEqual(report['output']['bytes'], len(output))
+		self.assertFalse(os.path.exists(os.path.join(self.outputDir, 'models', 'model.mtl.tmp')))
+
+#-
+	def _addExport(self, sourcePath: str, exportPath: str) -> None:
+		self.pathMap[os.path.join(self.sourceDir, sourcePath)] = os.path.join(self.outputDir, exportPath)
+
+#-
+	def _rewrite(self, fileName: str, data: bytes) -> tuple[bytes, dict]:
+		""" writes a source file, rewrites it to the models output dir, returns (output data, report). """
+		sourcePath = os.path.join(self.sourceDir, fileName)
+		outputPath = os.path.join(self.outputDir, 'models', fileName)
+		with open(sourcePath, 'wb') as file:
+			file.write(data)
+		report = rewriteDependencies(sourcePath, outputPath, self.pathMap)
+		with open(outputPath, 'rb') as file:
+			return (file.read(), report)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import tempfile
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from exportJournal import ExportJournal, isExportUnfinished, loadJournal
+
+#---------------------------------------------------------------------------------------------------
+class ExportJournalTests(unittest.TestCase):
+	def setUp(self) -> None:
+		self.tempDir = tempfile.TemporaryDirectory()
+		self.journalPath = os.path.join(self.tempDir.name, '.journal', 'Preset.jsonl')
+		self.sourcePath = self._writeFile('source.png', b'source')
+		self.outputPath = self._writeFile('output.png', b'source')
+
+	def tearDown(self) -> None:
+		self.tempDir.cleanup()
+
+#-
+	def test_truncatedLastLineIsIgnored(self) -> None:
+		journal = ExportJournal(self.journalPath)
+		journal.record('a.png', 'copy', self.sourcePath, self.outputPath, {'digest': 'a'})
+		journal.record('b.png', 'copy', self.sourcePath, self.outputPath)
+		journal.close()
+
+		# a crash while the last line was written
+		with open(self.journalPath, 'rb+') as file:
+			file.truncate(os.path.getsize(self.journalPath) - 10)
+
+		(entries, isComplete) = loadJournal(self.journalPath)
+		self.assertEqual(list(entries), ['a.png'])
+		self.assertEqual(entries['a.png']['report'], {'digest': 'a'})
+		self.assertFalse(isComplete)
+		self.assertTrue(isExportUnfinished(self.journalPath))
+
+		# a resumed export appends after the cut line, which stays ignored
+		journal = ExportJournal(self.journalPath, resume=True)
+		journal.record('b.png', 'copy', self.sourcePath, self.outputPath)
+		journal.complete()
+		journal.close()
+		(entries, isComplete) = loadJournal(self.journalPath)
+		self.assertEqual(sorted(entries), ['a.png', 'b.png'])
+		self.assertTrue(isComplete)
+
+#-
+	def test_resumeSkipsWrittenFiles(self) -> None:
+		journal = ExportJournal(self.journalPath)
+		journal.record('a.png', 'copy', self.sourcePath, self.outputPath)
+		journal.close()
+
+		journal = ExportJournal(self.journalPath, resume=True)
+		self.assertTrue(journal.isDone('a.png', self.sourcePath, self.outputPath))
+		self.assertFalse(journal.isDone('b.png', self.sourcePath, self.outputPath))
+		journal.close()
+
+		# a new export starts over
+		journal = ExportJournal(self.journalPath)
+		self.assertFalse(journal.isDone('a.png', self.sourcePath, self.outputPath))
+		journal.close()
+
+#-
+	def test_changedSourceOrOutputIsWrittenAgain(self) -> None:
+		journal = ExportJournal(self.journalPath)
+		journal.record('a.png', 'copy', self.sourcePath, self.outputPath)
+		journal.close()
+
+		# same size, newer mtime
+		os.utime(self.sourcePath, ns=(0, os.stat(self.sourcePath).st_mtime_ns + 1_000_000_000))
+		journal = ExportJournal(self.journalPath, resume=True)
+		self.assertFalse(journal.isDone('a.png', self.sourcePath, self.outputPath))
+		journal.record('a.png', 'copy', self.sourcePath, self.outputPath)
+		self.assertTrue(journal.isDone('a.png', self.sourcePath, self.outputPath))
+
+		# output cut short or removed since
+		self._writeFile('output.png', b'sou')
+		self.assertFalse(journal.isDone('a.png', self.sourcePath, self.outputPath))
+		os.remove(self.outputPath)
+		self.assertFalse(journal.isDone('a.png', self.sourcePath, self.outputPath))
+		journal.close()
+
+#-
+	def test_removedFilesAreForgotten(self) -> None:
+		journal = ExportJournal(self.journalPath)
+		journal.record('a.png', 'copy', self.sourcePath, self.outputPath)
+		journal.record('b.png', 'copy', self.sourcePath, self.outputPath)
+		journal.remove('a.png')
+		journal.close()
+
+		with open(self.journalPath, encoding='utf-8') as file:
+			self.assertEqual(json.loads(file.readlines()[-1]), {'path': 'a.png', 'removed': True})
+		self.assertEqual(list(loadJournal(self.journalPath)[0]), ['b.png'])
+
+#-
+	def _writeFile(self, fileName: str, data: bytes) -> str:
+		path = os.path.join(self.tempDir.name, fileName)
+		with open(path, 'wb') as file:
+			file.write(data)
+		return path
+
+if __name__ == '__main__':
+	unittest.main()
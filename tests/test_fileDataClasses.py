@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import fileDataClasses
+from fileDataClasses import FileCollection, PresetFileCollectionData
+
+#---------------------------------------------------------------------------------------------------
+class CompiledValidatorTests(unittest.TestCase):
+	def test_filesAreCheckedInBulk(self) -> None:
+		""" list[PathLike[str] | str] items have no subtypes, the per item validator must never run for valid files. """
+		filesValidator = dict(fileDataClasses._getValidators(FileCollection))['files']
+		(genericType, itemValidator) = filesValidator.itemValidators[0]
+		self.assertIs(genericType, list)
+		self.assertTrue(itemValidator.isLeaf)
+
+		# sub function
+		calls = []
+		def _countingValidator(value) -> None:
+			calls.append(value)
+			itemValidator(value)
+		_countingValidator.baseTypes = itemValidator.baseTypes
+		_countingValidator.isLeaf = itemValidator.isLeaf
+
+		filesValidator.itemValidators[0] = (genericType, _countingValidator)
+		try:
+			FileCollection('texs', './', [f'asset_{i}_BaseColor.png' for i in range(1000)])
+			self.assertEqual(len(calls), 0)
+
+			# the slow path still runs to report an invalid item
+			with self.assertRaises(TypeError):
+				FileCollection('texs', './', ['a.png', 1])
+		finally:
+			filesValidator.itemValidators[0] = (genericType, itemValidator)
+
+#-
+	def test_replaceFilesIsChecked(self) -> None:
+		collection = FileCollection('texs', './', [])
+		with self.assertRaises(TypeError):
+			collection.replaceFiles(['a.png', 1])
+		self.assertEqual(collection.files, [])
+
+		# the validator is looked up once per class
+		collection.replaceFiles(['a.png', 'b.png'])
+		self.assertEqual(collection.files, ['a.png', 'b.png'])
+		self.assertIs(fileDataClasses._getFieldValidator(FileCollection, 'files'), dict(fileDataClasses._getValidators(FileCollection))['files'])
+		self.assertIn(FileCollection, fileDataClasses._fieldValidatorCache)
+
+#-
+	def test_pathLikeItemsAreAccepted(self) -> None:
+		class _Path():
+			def __fspath__(self) -> str:
+				return 'a.png'
+
+		FileCollection('texs', './', [_Path(), 'b.png'])
+
+#---------------------------------------------------------------------------------------------------
+class PresetFileCollectionDataTests(unittest.TestCase):
+	def test_filteredFilesKeepCollectionOrder(self) -> None:
+		files = ['b_AO.png', 'a_AO.jpg', 'c_AO.txt', 'a_BaseColor.png', 'b_BaseColor.jpg', 'Readme.png']
+		collection = FileCollection('texs', './', files)
+		presetData = PresetFileCollectionData('texs', collection, './textures/', {'.png', '.jpg'}, ('AO', 'BaseColor'))
+
+		self.assertEqual(presetData.getFilterdFiles(), ('b_AO.png', 'a_AO.jpg', 'a_BaseColor.png', 'b_BaseColor.jpg'))
+		self.assertEqual(presetData.getFilterdFiles('AO'), ('b_AO.png', 'a_AO.jpg'))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import tempfile
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from fileIndex import FileSearchIndex
+from fileDataClasses import FileCategory, FileCollection
+from fileManager import FileManager
+
+#---------------------------------------------------------------------------------------------------
+class FileSearchIndexTests(unittest.TestCase):
+	def setUp(self) -> None:
+		self.textures = FileCollection('texs', './', ['a_BaseColor.png', 'a_Normal.png', 'b_BaseColor.jpg'])
+		self.assets = FileCollection('assets', './', ['a.obj', 'a.mtl'])
+		self.files = FileCategory('input', [self.assets, FileCategory('images', [self.textures])])
+
+#-
+	def test_findInScanOrder(self) -> None:
+		index = FileSearchIndex(self.files)
+
+		self.assertEqual(len(index), 5)
+		self.assertEqual([os.path.basename(path) for path in index.find(startsWith='a')], ['a.obj', 'a.mtl', 'a_BaseColor.png', 'a_Normal.png'])
+		self.assertEqual([os.path.basename(path) for path in index.find(endsWith='BaseColor.png', ext='.png')], ['a_BaseColor.png'])
+		self.assertEqual([os.path.basename(path) for path in index.find(pattern='*_BaseColor.*')], ['a_BaseColor.png', 'b_BaseColor.jpg'])
+		self.assertEqual([os.path.basename(path) for path in index.find(contains='Normal')], ['a_Normal.png'])
+
+#-
+	def test_changedCollectionMakesIndexStale(self) -> None:
+		index = FileSearchIndex(self.files)
+		self.assertFalse(index.isStale())
+
+		self.textures.add('c_BaseColor.png')
+		self.assertTrue(index.isStale())
+		self.assertEqual([os.path.basename(path) for path in FileSearchIndex(self.files).find(ext='.png')], ['a_BaseColor.png', 'a_Normal.png', 'c_BaseColor.png'])
+
+		index = FileSearchIndex(self.files)
+		self.textures.remove('a_Normal.png')
+		self.assertTrue(index.isStale())
+
+#-
+	def test_rescanRebuildsFileManagerIndex(self) -> None:
+		with tempfile.TemporaryDirectory() as basePath:
+			os.makedirs(os.path.join(basePath, 'textures'))
+			open(os.path.join(basePath, 'textures', 'a_BaseColor.png'), 'wb').close()
+			fileManager = FileManager(basePath, '', '', {'texs': './textures/', 'output': '../output/'}, {}, copyConcurrencyStatePath=None)
+			self.assertEqual([os.path.basename(path) for path in fileManager.findFiles(ext='.png')], ['a_BaseColor.png'])
+			index = fileManager.getFileIndex()
+
+			# an unchanged rescan keeps the index
+			fileManager.scanCollection(fileManager.files.resolve('texs'))
+			self.assertIs(fileManager.getFileIndex(), index)
+
+			open(os.path.join(basePath, 'textures', 'b_BaseColor.png'), 'wb').close()
+			fileManager.scanCollection(fileManager.files.resolve('texs'))
+			self.assertIsNot(fileManager.getFileIndex(), index)
+			self.assertEqual(sorted(os.path.basename(path) for path in fileManager.findFiles(ext='.png')), ['a_BaseColor.png', 'b_BaseColor.png'])
+
+if __name__ == '__main__':
+	unittest.main()
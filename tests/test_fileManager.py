@@ -0,0 +1,82 @@
+import unittest
+import tempfile
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from fileManager import FileManager
+
+DIR_SETTINGS = {'assets': './assets/', 'texs': './textures/', 'output': '../output/'}
+PRESET_SETTINGS = {
+	'Empty': {
+		'req': {'assets_format': ['.zip'], 'texs_format': []},
+		'output': {'assets': './assets/', 'texs': './textures/'},
+	},
+	'Models': {
+		'req': {'assets_format': ['.obj', '.mtl'], 'texs_format': []},
+		'output': {'assets': './assets/', 'texs': './textures/'},
+	},
+}
+
+#---------------------------------------------------------------------------------------------------
+class ExportTests(unittest.TestCase):
+	def setUp(self) -> None:
+		self.tempDir = tempfile.TemporaryDirectory()
+		self.basePath = os.path.join(self.tempDir.name, 'asset')
+		for dirName in ('assets', 'textures'):
+			os.makedirs(os.path.join(self.basePath, dirName))
+		with open(os.path.join(self.basePath, 'assets', 'model.obj'), 'w') as file:
+			file.write('v 0 0 0\n')
+
+	def tearDown(self) -> None:
+		self.tempDir.cleanup()
+
+#-
+	def test_exportWithoutJobsCompletesItsJournal(self) -> None:
+		fileManager = FileManager(self.basePath, '', '', DIR_SETTINGS, PRESET_SETTINGS, copyConcurrencyStatePath=None)
+		fileManager.exportFiles('Empty')
+
+		self.assertEqual(fileManager.getActiveJobCount(), 0)
+		self.assertNotIn('Empty', fileManager.journals)
+		self.assertFalse(fileManager.hasUnfinishedExport('Empty'))
+
+		# a resume with nothing left to write completes it again
+		fileManager.exportFiles('Empty', resume=True)
+		self.assertFalse(fileManager.hasUnfinishedExport('Empty'))
+
+#-
+	def test_prunedExportDeletesOutputsOfDeletedSources(self) -> None:
+		with open(os.path.join(self.basePath, 'assets', 'model.mtl'), 'w') as file:
+			file.write('newmtl a\n')
+		outputPath = os.path.join(self.tempDir.name, 'output', 'Models', 'assets')
+		self._export(FileManager(self.basePath, '', '', DIR_SETTINGS, PRESET_SETTINGS, copyConcurrencyStatePath=None), 'Models')
+		self.assertEqual(sorted(os.listdir(outputPath)), ['model.mtl', 'model.obj'])
+
+		os.remove(os.path.join(self.basePath, 'assets', 'model.mtl'))
+		fileManager = FileManager(self.basePath, '', '', DIR_SETTINGS, PRESET_SETTINGS, copyConcurrencyStatePath=None)
+		# a resume alone only adds files
+		self._export(fileManager, 'Models', resume=True)
+		self.assertEqual(sorted(os.listdir(outputPath)), ['model.mtl', 'model.obj'])
+
+		self._export(fileManager, 'Models', resume=True, prune=True)
+		self.assertEqual(os.listdir(outputPath), ['model.obj'])
+		self.assertEqual(fileManager.prunedFiles['Models'], 1)
+		self.assertEqual(fileManager.resumedFiles['Models'], 1)
+		self.assertFalse(fileManager.hasUnfinishedExport('Models'))
+
+		# the deletion is journaled, the next pruning export has nothing left to delete
+		self._export(fileManager, 'Models', resume=True, prune=True)
+		self.assertEqual(fileManager.prunedFiles['Models'], 0)
+
+#-
+	@staticmethod
+	def _export(fileManager: FileManager, preset: str, **exportOptions) -> None:
+		fileManager.exportFiles(preset, **exportOptions)
+		while fileManager.getActiveJobCount() != 0:
+			fileManager.pollFinishedJobs(noStdOut=True)
+			time.sleep(0.01)
+		fileManager.clearJobResults()
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from headless import getSharedOutputDirs, getMostSevereExitCode, EXIT_SUCCESS, EXIT_VALIDATION_FAILED, EXIT_EXPORT_FAILED, EXIT_ERROR, EXIT_CANCELLED
+
+#---------------------------------------------------------------------------------------------------
+class BatchTests(unittest.TestCase):
+	def test_siblingRootsShareTheDefaultOutputDir(self) -> None:
+		sharedOutputDirs = getSharedOutputDirs(['/assets/a', '/assets/b', '/other/c'], {'output': '../output/'})
+		self.assertEqual(sharedOutputDirs, {os.path.normpath('/assets/output'): ['/assets/a', '/assets/b']})
+
+#-
+	def test_distinctOutputDirsAreNotReported(self) -> None:
+		self.assertEqual(getSharedOutputDirs(['/assets/a', '/assets/b'], {'output': './output/'}), {})
+
+#-
+	def test_errorIsNotHiddenByCancellation(self) -> None:
+		self.assertEqual(getMostSevereExitCode([EXIT_CANCELLED, EXIT_ERROR, EXIT_SUCCESS]), EXIT_ERROR)
+		self.assertEqual(getMostSevereExitCode([EXIT_VALIDATION_FAILED, EXIT_CANCELLED, EXIT_EXPORT_FAILED]), EXIT_CANCELLED)
+		self.assertEqual(getMostSevereExitCode([EXIT_VALIDATION_FAILED, EXIT_EXPORT_FAILED]), EXIT_EXPORT_FAILED)
+		self.assertEqual(getMostSevereExitCode([]), EXIT_SUCCESS)
+
+if __name__ == '__main__':
+	unittest.main()
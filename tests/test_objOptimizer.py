@@ -0,0 +1,54 @@
+import unittest
+import sys
+import io
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import objOptimizer
+from objOptimizer import optimizeObj
+
+# v 3 duplicates v 1, which makes the first face degenerate and the second one a triangle
+SOURCE = b'''# comment
+v 0 0 0
+v 1 0 0
+v 0 0 0
+v 1 1 0
+vt 0 0
+f 1/1 2/1 3/1
+f 1/1 2/1 4/1 3/1
+f 1 2 4 -1
+'''
+
+#---------------------------------------------------------------------------------------------------
+class OptimizeObjTests(unittest.TestCase):
+	def _optimize(self, source: bytes, settings: dict) -> tuple[bytes, dict]:
+		output = io.BytesIO()
+		report = optimizeObj(io.BytesIO(source), output, settings)
+		return (output.getvalue(), report)
+
+#-
+	def test_degenerateFacesAreDropped(self) -> None:
+		(output, report) = self._optimize(SOURCE, {'triangulate': True})
+		self.assertEqual(output, b'v 0 0 0\nv 1 0 0\nv 1 1 0\nvt 0 0\nf 1/1 2/1 3/1\nf 1 2 3\n')
+		self.assertEqual(report['degenerateFaces'], 1)
+		self.assertEqual(report['after']['f'], 2)
+
+#-
+	def test_spilledTablesGiveTheSameOutput(self) -> None:
+		lines = [b'v %d 0 0\n' % (i % 700) for i in range(1000)]
+		lines += [b'f %d %d %d\n' % (i, i + 1, -1 - i % 50) for i in range(1, 998)]
+		source = b''.join(lines)
+
+		(inMemory, inMemoryReport) = self._optimize(source, {})
+		# small batches so that lookups hit both flushed and pending rows
+		spillBatch = objOptimizer._SPILL_BATCH
+		objOptimizer._SPILL_BATCH = 64
+		try:
+			(spilled, spilledReport) = self._optimize(source, {'maxMemoryVertices': 10})
+		finally:
+			objOptimizer._SPILL_BATCH = spillBatch
+		self.assertEqual(spilled, inMemory)
+		self.assertEqual(spilledReport, inMemoryReport)
+
+if __name__ == '__main__':
+	unittest.main()
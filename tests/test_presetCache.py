@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from presetCache import PresetDataCache
+from fileDataClasses import FileCategory, FileCollection, PresetFileCollectionData
+
+#---------------------------------------------------------------------------------------------------
+class PresetDataCacheTests(unittest.TestCase):
+	def setUp(self) -> None:
+		self.collection = FileCollection('texs', './', ['a_BaseColor.png', 'a_Normal.png'])
+		self.definition = {'req': {'texs_format': ['.png'], 'texs_suffix': ['BaseColor']}}
+		self.cache = PresetDataCache()
+
+#-
+	def test_changedDefinitionIsMissed(self) -> None:
+		presetData = self._createPresetData()
+		self.cache.set('Preset', self.definition, presetData)
+		self.assertIs(self.cache.get('Preset', {'req': {'texs_suffix': ['BaseColor'], 'texs_format': ['.png']}}), presetData)
+
+		# an edited preset never gets the structure built from its previous definition
+		self.assertIsNone(self.cache.get('Preset', {'req': {'texs_format': ['.png'], 'texs_suffix': ['Normal']}}))
+		self.assertIsNone(self.cache.get('Other', self.definition))
+		self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+#-
+	def test_changedCollectionIsRefreshed(self) -> None:
+		presetData = self._createPresetData()
+		self.cache.set('Preset', self.definition, presetData)
+		presetCollection = presetData.children[0]
+		self.assertEqual(list(presetCollection.getFilterdFiles()), ['a_BaseColor.png'])
+
+		self.collection.add('b_BaseColor.png')
+		self.assertTrue(presetCollection.isStale())
+		self.assertIs(self.cache.get('Preset', self.definition), presetData)
+		self.assertFalse(presetCollection.isStale())
+		self.assertEqual(list(presetCollection.getFilterdFiles()), ['a_BaseColor.png', 'b_BaseColor.png'])
+		self.assertEqual(self.cache.refreshes, 1)
+
+		# unchanged since, nothing to refresh
+		self.cache.get('Preset', self.definition)
+		self.assertEqual(self.cache.refreshes, 1)
+
+#-
+	def test_invalidate(self) -> None:
+		for presetName in ('A', 'B'):
+			self.cache.set(presetName, self.definition, self._createPresetData())
+		self.cache.set('A', {}, self._createPresetData())
+
+		self.cache.invalidate('A')
+		self.assertEqual(len(self.cache), 1)
+		self.assertIsNone(self.cache.get('A', self.definition))
+		self.assertIsNotNone(self.cache.get('B', self.definition))
+
+		self.cache.invalidate()
+		self.assertEqual(len(self.cache), 0)
+
+#-
+	def test_leastRecentlyUsedIsEvicted(self) -> None:
+		cache = PresetDataCache(maxSize=2)
+		for presetName in ('A', 'B'):
+			cache.set(presetName, self.definition, self._createPresetData())
+		cache.get('A', self.definition)
+		cache.set('C', self.definition, self._createPresetData())
+
+		self.assertIsNone(cache.get('B', self.definition))
+		self.assertIsNotNone(cache.get('A', self.definition))
+		self.assertIsNotNone(cache.get('C', self.definition))
+
+#-
+	def _createPresetData(self) -> FileCategory:
+		return FileCategory('Preset', [PresetFileCollectionData('texs', self.collection, './textures/', {'.png'}, ('BaseColor',))])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,117 @@
+import threading
+import unittest
+import tempfile
+import struct
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from textureMetadata import getTextureSetName, readTextureMetadata
+
+SUFFIXES = ('BaseColor', 'Metallic', 'Roughness', 'AO', 'Packed_MRA', 'Height', 'NormalGL', 'NormalDX', 'Emissive')
+
+#---------------------------------------------------------------------------------------------------
+class TextureSetNameTests(unittest.TestCase):
+	def test_suffixesContainingSeparators(self) -> None:
+		self.assertEqual(getTextureSetName('wood_Packed_MRA.png', SUFFIXES), 'wood')
+		self.assertEqual(getTextureSetName('old_wood_BaseColor.png', SUFFIXES), 'old_wood')
+
+#-
+	def test_unknownSuffixFallsBackToLastSeparator(self) -> None:
+		self.assertEqual(getTextureSetName('wood_Specular.png', SUFFIXES), 'wood')
+		self.assertEqual(getTextureSetName('wood.png', SUFFIXES), 'wood')
+
+#---------------------------------------------------------------------------------------------------
+def _exrAttribute(name: bytes, typeName: bytes, value: bytes, size: int | None = None) -> bytes:
+	return name + b'\x00' + typeName + b'\x00' + struct.pack('<i', len(value) if size == None else size) + value
+
+# magic and version, followed by the attributes
+EXR_START = b'\x76\x2f\x31\x01\x02\x00\x00\x00'
+EXR_CHANNELS = _exrAttribute(b'channels', b'chlist', b''.join(name + b'\x00' + struct.pack('<iB3xii', 1, 0, 1, 1) for name in (b'B', b'G', b'R')) + b'\x00')
+EXR_DATA_WINDOW = _exrAttribute(b'dataWindow', b'box2i', struct.pack('<iiii', 0, 0, 511, 255))
+
+class TextureHeaderTests(unittest.TestCase):
+	""" every reader returns None on a malformed header, without raising or looping. """
+
+	def setUp(self) -> None:
+		self.tempDir = tempfile.TemporaryDirectory()
+
+	def tearDown(self) -> None:
+		self.tempDir.cleanup()
+
+#-
+	def _read(self, data: bytes, ext: str):
+		path = os.path.join(self.tempDir.name, f'texture{ext}')
+		with open(path, 'wb') as file:
+			file.write(data)
+
+		# on a thread, so that a reader looping forever fails the test instead of hanging it
+		results = []
+		thread = threading.Thread(target=lambda: results.append(readTextureMetadata(path)), daemon=True)
+		thread.start()
+		thread.join(5)
+		self.assertFalse(thread.is_alive(), f'reading a {ext} header never ended')
+		return results[0]
+
+#-
+	def test_validExr(self) -> None:
+		metadata = self._read(EXR_START + EXR_CHANNELS + EXR_DATA_WINDOW + b'\x00', '.exr')
+		self.assertEqual((metadata.width, metadata.height, metadata.bitDepth, metadata.colorType), (512, 256, 16, 'RGB'))
+
+#-
+	def test_exrNegativeAttributeSize(self) -> None:
+		self.assertIsNone(self._read(EXR_START + _exrAttribute(b'a', b'b', b'', -8), '.exr'))
+		self.assertIsNone(self._read(EXR_START + EXR_CHANNELS + _exrAttribute(b'comments', b'string', b'', -30) + EXR_DATA_WINDOW + b'\x00', '.exr'))
+
+#-
+	def test_exrAttributeSizePastHeader(self) -> None:
+		self.assertIsNone(self._read(EXR_START + _exrAttribute(b'comments', b'string', b'abc', 1 << 30) + b'\x00', '.exr'))
+
+#-
+	def test_exrTruncated(self) -> None:
+		self.assertIsNone(self._read(EXR_START + EXR_DATA_WINDOW[:-6], '.exr'))
+
+#-
+	def test_pngWithoutIhdr(self) -> None:
+		self.assertIsNone(self._read(b'\x89PNG\r\n\x1a\n' + b'\x00\x00\x00\x0dIDAT' + bytes(13), '.png'))
+		self.assertIsNone(self._read(b'\x89PNG\r\n\x1a\n\x00\x00\x00\x0dIHDR\x00', '.png'))
+
+#-
+	def test_jpegMalformedSegments(self) -> None:
+		# segment length shorter than its own 2 bytes
+		self.assertIsNone(self._read(b'\xff\xd8\xff\xe0\x00\x00' + bytes(16), '.jpg'))
+		# not a marker
+		self.assertIsNone(self._read(b'\xff\xd8\x00\x10' + bytes(16), '.jpg'))
+		# fill bytes up to the end of the file
+		self.assertIsNone(self._read(b'\xff\xd8' + b'\xff' * 64, '.jpg'))
+		# start of frame cut short
+		self.assertIsNone(self._read(b'\xff\xd8\xff\xc0\x00\x11\x08\x01', '.jpg'))
+
+#-
+	def test_tiffMalformedIfd(self) -> None:
+		# ifd offset past the end of the file
+		self.assertIsNone(self._read(b'II*\x00' + struct.pack('<I', 1 << 20), '.tif'))
+		# more entries than the file holds
+		self.assertIsNone(self._read(b'II*\x00' + struct.pack('<IH', 8, 40) + bytes(12), '.tif'))
+		# no width or height tag
+		self.assertIsNone(self._read(b'MM\x00*' + struct.pack('>IH', 8, 1) + struct.pack('>HHI4s', 277, 3, 1, b'\x00\x03\x00\x00'), '.tif'))
+		# width stored at an offset past the end of the file
+		self.assertIsNone(self._read(b'II*\x00' + struct.pack('<IH', 8, 2) + struct.pack('<HHII', 256, 4, 4, 1 << 20) + struct.pack('<HHI4s', 257, 3, 1, b'\x10\x00\x00\x00'), '.tif'))
+
+#-
+	def test_ddsTruncated(self) -> None:
+		self.assertIsNone(self._read(b'DDS ' + struct.pack('<III', 124, 0, 256), '.dds'))
+		self.assertIsNone(self._read(b'DDS ' + bytes(80), '.dds'))
+
+#-
+	def test_bmpTruncated(self) -> None:
+		self.assertIsNone(self._read(b'BM' + bytes(20), '.bmp'))
+
+#-
+	def test_tgaMalformed(self) -> None:
+		# unsupported image type
+		self.assertIsNone(self._read(bytes([0, 0, 5]) + bytes(15), '.tga'))
+		self.assertIsNone(self._read(bytes([0, 0, 2]) + bytes(5), '.tga'))
+
+if __name__ == '__main__':
+	unittest.main()
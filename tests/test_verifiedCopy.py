@@ -0,0 +1,66 @@
+import unittest
+import threading
+import tempfile
+import hashlib
+import sys
+import os
+from concurrent.futures import CancelledError
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import verifiedCopy
+from verifiedCopy import CopyVerificationError, copyAndVerify
+
+#---------------------------------------------------------------------------------------------------
+class CopyAndVerifyTests(unittest.TestCase):
+	def setUp(self) -> None:
+		self.tempDir = tempfile.TemporaryDirectory()
+		self.sourcePath = os.path.join(self.tempDir.name, 'source.bin')
+		self.outputPath = os.path.join(self.tempDir.name, 'output.bin')
+		self.data = os.urandom(3 * verifiedCopy.CHUNK_SIZE + 17)
+		with open(self.sourcePath, 'wb') as file:
+			file.write(self.data)
+		# the destination of a previous export
+		with open(self.outputPath, 'wb') as file:
+			file.write(b'previous export')
+
+	def tearDown(self) -> None:
+		self.tempDir.cleanup()
+
+#-
+	def test_copyIsVerified(self) -> None:
+		# reflinks are not read back, the copy path is the one verified
+		with mock.patch.object(verifiedCopy, '_tryReflink', return_value=False):
+			report = copyAndVerify(self.sourcePath, self.outputPath)
+
+		self.assertEqual(report, {'digest': hashlib.sha256(self.data).hexdigest(), 'bytes': len(self.data), 'method': 'copy'})
+		self._assertOutput(self.data)
+
+#-
+	def test_digestMismatchLeavesDestinationUntouched(self) -> None:
+		# the read back of the copy returns another digest, ex: corrupted by the os
+		with mock.patch.object(verifiedCopy, '_tryReflink', return_value=False), mock.patch.object(verifiedCopy, 'hashFile', return_value=('0' * 64, len(self.data))):
+			with self.assertRaises(CopyVerificationError):
+				copyAndVerify(self.sourcePath, self.outputPath)
+
+		self._assertOutput(b'previous export')
+
+#-
+	def test_cancelLeavesDestinationUntouched(self) -> None:
+		cancelEvent = threading.Event()
+		cancelEvent.set()
+		with mock.patch.object(verifiedCopy, '_tryReflink', return_value=False):
+			with self.assertRaises(CancelledError):
+				copyAndVerify(self.sourcePath, self.outputPath, cancelEvent)
+
+		self._assertOutput(b'previous export')
+
+#-
+	def _assertOutput(self, data: bytes) -> None:
+		""" the destination holds data and no temp file is left behind. """
+		with open(self.outputPath, 'rb') as file:
+			self.assertEqual(file.read(), data)
+		self.assertEqual(sorted(os.listdir(self.tempDir.name)), ['output.bin', 'source.bin'])
+
+if __name__ == '__main__':
+	unittest.main()
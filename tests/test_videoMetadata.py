@@ -0,0 +1,79 @@
+import unittest
+import tempfile
+import struct
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from videoMetadata import readVideoMetadata
+
+#---------------------------------------------------------------------------------------------------
+def _box(boxType: bytes, *payloads: bytes) -> bytes:
+	payload = b''.join(payloads)
+	return struct.pack('>I4s', 8 + len(payload), boxType) + payload
+
+#-
+def _track(handlerType: bytes, width: int, height: int, codec: bytes = b'avc1') -> bytes:
+	""" trak of 48 frames of 1001 at a 24000 timescale, ie: 23.976 fps. """
+	# version, flags, then everything up to the display size, 16.16 fixed point
+	tkhd = _box(b'tkhd', bytes(76), struct.pack('>II', width << 16, height << 16))
+	# version, flags, creation and modification times, timescale, duration, language
+	mdhd = _box(b'mdhd', bytes(12), struct.pack('>II', 24000, 48 * 1001), bytes(4))
+	# version, flags, pre defined, handler type, reserved, name
+	hdlr = _box(b'hdlr', bytes(8), handlerType, bytes(13))
+	# version, flags, entry count, then a visual sample entry: size, format, reserved, data reference index, pre defined, width, height
+	stsd = _box(b'stsd', bytes(4), struct.pack('>I', 1), struct.pack('>I4s', 86, codec), bytes(24), struct.pack('>HH', 640, 360), bytes(50))
+	stts = _box(b'stts', bytes(4), struct.pack('>III', 1, 48, 1001))
+	stbl = _box(b'stbl', stsd, stts)
+	return _box(b'trak', tkhd, _box(b'mdia', mdhd, hdlr, _box(b'minf', stbl)))
+
+#-
+def _moov(*tracks: bytes) -> bytes:
+	# version, flags, creation and modification times, timescale, duration, then the rest of mvhd
+	mvhd = _box(b'mvhd', bytes(12), struct.pack('>II', 1000, 2002), bytes(80))
+	return _box(b'moov', mvhd, *tracks)
+
+#---------------------------------------------------------------------------------------------------
+class ReadVideoMetadataTests(unittest.TestCase):
+	def setUp(self) -> None:
+		self.tempDir = tempfile.TemporaryDirectory()
+		self.ftyp = _box(b'ftyp', b'isom', bytes(4), b'isomavc1')
+
+	def tearDown(self) -> None:
+		self.tempDir.cleanup()
+
+#-
+	def test_moovAfterMediaData(self) -> None:
+		# 64 bit sized mdat, skipped without being read
+		mdatPayload = bytes(1000)
+		mdat = struct.pack('>I4sQ', 1, b'mdat', 16 + len(mdatPayload)) + mdatPayload
+		metadata = self._read(self.ftyp + mdat + _moov(_track(b'soun', 0, 0, b'mp4a'), _track(b'vide', 1920, 1080)))
+
+		self.assertEqual((metadata.name, metadata.format, metadata.codec), ('video.mp4', 'mp4', 'avc1'))
+		self.assertEqual((metadata.width, metadata.height), (1920, 1080))
+		self.assertAlmostEqual(metadata.duration, 2.002)
+		self.assertAlmostEqual(metadata.fps, 24000 / 1001)
+		self.assertEqual(metadata.fileSize, os.path.getsize(os.path.join(self.tempDir.name, 'video.mp4')))
+
+#-
+	def test_sampleEntrySizeWithoutDisplaySize(self) -> None:
+		metadata = self._read(self.ftyp + _moov(_track(b'vide', 0, 0, b'hvc1')) + _box(b'mdat', bytes(16)))
+
+		self.assertEqual((metadata.width, metadata.height, metadata.codec), (640, 360, 'hvc1'))
+
+#-
+	def test_invalidFilesAreNone(self) -> None:
+		moov = _moov(_track(b'vide', 1920, 1080))
+		# no video track, no moov, truncated moov, moov box smaller than its header
+		for data in (self.ftyp + _moov(_track(b'soun', 0, 0, b'mp4a')), self.ftyp + _box(b'mdat', bytes(16)), self.ftyp + moov[:-20], self.ftyp + struct.pack('>I4s', 4, b'moov')):
+			self.assertIsNone(self._read(data))
+
+#-
+	def _read(self, data: bytes):
+		path = os.path.join(self.tempDir.name, 'video.mp4')
+		with open(path, 'wb') as file:
+			file.write(data)
+		return readVideoMetadata(path)
+
+if __name__ == '__main__':
+	unittest.main()
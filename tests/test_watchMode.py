@@ -0,0 +1,54 @@
+import unittest
+import tempfile
+import platform
+import shutil
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from watchMode import createWatcher
+
+#---------------------------------------------------------------------------------------------------
+@unittest.skipUnless(platform.system() == 'Linux', 'inotify is only available on linux')
+class InotifyWatcherTests(unittest.TestCase):
+	def setUp(self) -> None:
+		self.tempDir = tempfile.TemporaryDirectory()
+		self.dirPath = os.path.join(self.tempDir.name, 'textures')
+		os.makedirs(self.dirPath)
+		self.watcher = createWatcher([self.dirPath])
+		self.assertEqual(self.watcher.name, 'inotify')
+
+	def tearDown(self) -> None:
+		self.watcher.close()
+		self.tempDir.cleanup()
+
+#-
+	def test_recreatedDirIsWatchedAgain(self) -> None:
+		shutil.rmtree(self.dirPath)
+		self.assertEqual(self.watcher.wait(1.0), {self.dirPath})
+
+		# reported once recreated, then its changes are reported again
+		os.makedirs(self.dirPath)
+		self.assertEqual(self.watcher.wait(1.0), {self.dirPath})
+		self.assertEqual(self.watcher.wait(0.05), set())
+		with open(os.path.join(self.dirPath, 'a.png'), 'wb') as file:
+			file.write(b'png')
+		self.assertEqual(self.watcher.wait(1.0), {self.dirPath})
+
+#-
+	def test_dirMovedBackIsWatchedAgain(self) -> None:
+		movedPath = f'{self.dirPath}_moved'
+		os.rename(self.dirPath, movedPath)
+		self.assertEqual(self.watcher.wait(1.0), {self.dirPath})
+		# the moved dir is no longer watched
+		with open(os.path.join(movedPath, 'a.png'), 'wb') as file:
+			file.write(b'png')
+		self.assertEqual(self.watcher.wait(0.05), set())
+
+		os.rename(movedPath, self.dirPath)
+		self.assertEqual(self.watcher.wait(1.0), {self.dirPath})
+		os.remove(os.path.join(self.dirPath, 'a.png'))
+		self.assertEqual(self.watcher.wait(1.0), {self.dirPath})
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,348 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import struct
+import os
+
+from fileDataClasses import FileDataBaseClass, FileCollection
+
+# import type defs
+from collections.abc import Iterable
+from typing import BinaryIO, TextIO, Callable, Any
+from os import PathLike
+
+# most headers fit in the first read, the rest of the file is never read
+HEADER_READ_SIZE = 4096
+# upper bound for formats whose header has no fixed size, ex: jpeg with large exif segments, exr with many attributes
+MAX_HEADER_SIZE = 1024 * 1024
+
+# png color type -> (name, channel count)
+_PNG_COLOR_TYPES = {0: ('gray', 1), 2: ('RGB', 3), 3: ('indexed', 1), 4: ('gray alpha', 2), 6: ('RGBA', 4)}
+# exr pixel type -> bits
+_EXR_PIXEL_BITS = {0: 32, 1: 16, 2: 32}
+# tiff photometric interpretation -> name
+_TIFF_PHOTOMETRIC = {0: 'gray', 1: 'gray', 2: 'RGB', 3: 'indexed', 5: 'CMYK', 6: 'YCbCr'}
+
+#---------------------------------------------------------------------------------------------------
+@dataclass(slots = True)
+class TextureMetadata(FileDataBaseClass):
+	""" image properties read from a texture's header. \n
+
+	name - file name, ex: 'wood_BaseColor.png' \n
+	format - file format, ex: 'png' \n
+	width, height - in pixels \n
+	bitDepth - bits per channel, None if unknown (ex: block compressed dds) \n
+	channels - channel count, None if unknown \n
+	colorType - ex: 'RGBA', 'gray', 'indexed' \n
+	fileSize, mtimeNs - of the file when read, used to detect changes \n
+	"""
+
+	format: str
+	width: int
+	height: int
+	bitDepth: int | None
+	channels: int | None
+	colorType: str
+	fileSize: int
+	mtimeNs: int
+
+#-
+	def isPowerOfTwo(self) -> bool:
+		return _isPowerOfTwo(self.width) and _isPowerOfTwo(self.height)
+
+#---------------------------------------------------------------------------------------------------
+def readTextureMetadata(path: PathLike[str] | str) -> TextureMetadata | None:
+	""" reads the properties of an image from its header only. \n
+	supports png, jpeg, exr, tiff, tga, dds and bmp, detected from the file content rather than the ext (except tga which has no signature). \n
+	returns None if the format is unsupported or the header is invalid.
+	"""
+	fileStat = os.stat(path)
+	with open(path, 'rb') as file:
+		header = file.read(HEADER_READ_SIZE)
+
+		try:
+			if header.startswith(b'\x89PNG\r\n\x1a\n'):
+				properties = _readPng(header)
+			elif header.startswith(b'\xff\xd8'):
+				properties = _readJpeg(file)
+			elif header.startswith(b'\x76\x2f\x31\x01'):
+				properties = _readExr(file, header)
+			elif header.startswith((b'II*\x00', b'MM\x00*')):
+				properties = _readTiff(file, header)
+			elif header.startswith(b'DDS '):
+				properties = _readDds(header)
+			elif header.startswith(b'BM'):
+				properties = _readBmp(header)
+			elif os.path.splitext(path)[1].lower() == '.tga':
+				properties = _readTga(header)
+			else:
+				properties = None
+		except (struct.error, ValueError, IndexError):
+			# truncated or corrupted header
+			properties = None
+
+	if properties == None:
+		return None
+
+	(imageFormat, width, height, bitDepth, channels, colorType) = properties
+	return TextureMetadata(os.path.basename(path), imageFormat, width, height, bitDepth, channels, colorType, fileStat.st_size, fileStat.st_mtime_ns)
+
+#-
+def readCollectionMetadata(collection: FileCollection, reader: Callable[[str], Any] = readTextureMetadata, workerCount: int | None = None) -> dict:
+	""" reads the metadata of every file in a collection on a thread pool, and stores it in collection.metadata. \n
+	files unchanged since their metadata was read (same size and mtime) are skipped. \n
+	reader - function reading the metadata of a file, ex: readTextureMetadata, videoMetadata.readVideoMetadata. the metadata must have fileSize and mtimeNs \n
+	returns collection.metadata, files that could not be read are stored as None.
+	"""
+
+	# sub function
+	@staticmethod
+	def _readIfChanged(collection: FileCollection, fileName: str) -> tuple[str, Any]:
+		path = os.path.join(collection.dirPath, fileName)
+		previous = collection.metadata.get(fileName)
+		try:
+			if previous != None:
+				fileStat = os.stat(path)
+				if fileStat.st_size == previous.fileSize and fileStat.st_mtime_ns == previous.mtimeNs:
+					return (fileName, previous)
+			return (fileName, reader(path))
+		except OSError:
+			return (fileName, None)
+
+	# main function
+	# header reads are io bound, threads overlap their latency
+	with ThreadPoolExecutor(max_workers=workerCount) as executor:
+		results = list(executor.map(lambda fileName: _readIfChanged(collection, fileName), list(collection.files)))
+
+	for (fileName, metadata) in results:
+		collection.metadata[fileName] = metadata
+	return collection.metadata
+
+#---------------------------------------------------------------------------------------------------
+def getTextureSetName(fileName: str, suffixes: Iterable[str] = ()) -> str:
+	""" name of the texture set a file belongs to, ie: the name without its ext and suffix. \n
+	suffixes - known suffixes, ex: the presets' texs_suffix, the longest matching one is stripped so that suffixes can contain '_', otherwise the name is cut at its last '_' \n
+	ex: 'wood_Packed_MRA.png' -> 'wood'
+	"""
+	stem = os.path.splitext(fileName)[0]
+	for suffix in sorted(suffixes, key=len, reverse=True):
+		if stem.endswith(suffix) and len(stem) > len(suffix):
+			return stem[:-len(suffix)].rstrip('_') or stem
+	return stem.rpartition('_')[0] or stem
+
+#-
+def analyzeTextures(metadata: Iterable[TextureMetadata | None], suffixes: Iterable[str] = ()) -> dict:
+	""" flags non power of two textures, and texture sets whose textures do not all share the same resolution. \n
+	suffixes - see getTextureSetName \n
+	returns {'count', 'unreadable', 'nonPowerOfTwo': [name, ...], 'mismatchedSets': {set name: {'WxH': [name, ...]}}}
+	"""
+	report = {'count': 0, 'unreadable': 0, 'nonPowerOfTwo': [], 'mismatchedSets': {}}
+	# set name -> resolution -> names
+	resolutions = {}
+	suffixes = tuple(suffixes)
+
+	for textureMetadata in metadata:
+		report['count'] += 1
+		if textureMetadata == None:
+			report['unreadable'] += 1
+			continue
+
+		if not textureMetadata.isPowerOfTwo():
+			report['nonPowerOfTwo'].append(textureMetadata.name)
+		textureSet = resolutions.setdefault(getTextureSetName(textureMetadata.name, suffixes), {})
+		textureSet.setdefault(f'{textureMetadata.width}x{textureMetadata.height}', []).append(textureMetadata.name)
+
+	for (setName, setResolutions) in resolutions.items():
+		if len(setResolutions) > 1:
+			report['mismatchedSets'][setName] = setResolutions
+
+	return report
+
+#-
+def writeTextureStats(collection: FileCollection, file: TextIO, suffixes: Iterable[str] = ()) -> None:
+	""" writes a texture section to a stats file, from the metadata already read by readCollectionMetadata. \n
+	suffixes - see getTextureSetName
+	"""
+	metadata = [collection.metadata.get(fileName) for fileName in collection.files]
+	report = analyzeTextures(metadata, suffixes)
+
+	file.write('Textures:\n')
+	for (fileName, textureMetadata) in zip(collection.files, metadata):
+		if textureMetadata == None:
+			file.write(f'  {fileName}: unreadable\n')
+		else:
+			bitDepth = f'{textureMetadata.bitDepth} bit' if textureMetadata.bitDepth != None else 'unknown depth'
+			file.write(f'  {fileName}: {textureMetadata.width}x{textureMetadata.height}, {bitDepth}, {textureMetadata.colorType} ({textureMetadata.channels or "?"} channels), {textureMetadata.format}\n')
+	file.write('\n')
+
+	file.write(f'Texture count: {report["count"]}\n')
+	file.write(f'Unreadable count: {report["unreadable"]}\n')
+	file.write('\n')
+
+	if len(report['nonPowerOfTwo']) != 0:
+		file.write('Non power of two:\n  ' + '\n  '.join(report['nonPowerOfTwo']) + '\n')
+		file.write('\n')
+	if len(report['mismatchedSets']) != 0:
+		file.write('Mismatched resolution sets:\n')
+		for (setName, setResolutions) in report['mismatchedSets'].items():
+			file.write(f'  {setName}: ' + ', '.join(f'{resolution} ({len(names)})' for (resolution, names) in setResolutions.items()) + '\n')
+		file.write('\n')
+
+#---------------------------------------------------------------------------------------------------
+# header readers, each returns (format, width, height, bit depth, channels, color type) or None
+
+def _readPng(header: bytes) -> tuple | None:
+	# signature, then IHDR is always the first chunk
+	if header[12:16] != b'IHDR':
+		return None
+	(width, height, bitDepth, colorType) = struct.unpack_from('>IIBB', header, 16)
+	(colorName, channels) = _PNG_COLOR_TYPES.get(colorType, ('unknown', None))
+	return ('png', width, height, bitDepth, channels, colorName)
+
+#-
+def _readJpeg(file: BinaryIO) -> tuple | None:
+	# walk the segments until a start of frame marker
+	file.seek(2)
+	while file.tell() < MAX_HEADER_SIZE:
+		marker = file.read(2)
+		if len(marker) != 2 or marker[0] != 0xff:
+			return None
+		# fill bytes
+		while marker[1] == 0xff:
+			marker = marker[1:] + file.read(1)
+		markerType = marker[1]
+
+		# standalone markers, no length
+		if markerType == 0x01 or 0xd0 <= markerType <= 0xd9:
+			continue
+
+		(length,) = struct.unpack('>H', file.read(2))
+		# the length includes its own 2 bytes, a smaller one would seek backwards
+		if length < 2:
+			return None
+		# SOF0-SOF15, except DHT (c4), JPG (c8) and DAC (cc)
+		if 0xc0 <= markerType <= 0xcf and markerType not in (0xc4, 0xc8, 0xcc):
+			(bitDepth, height, width, channels) = struct.unpack('>BHHB', file.read(6))
+			colorType = {1: 'gray', 3: 'YCbCr', 4: 'CMYK'}.get(channels, 'unknown')
+			return ('jpeg', width, height, bitDepth, channels, colorType)
+		file.seek(length - 2, os.SEEK_CUR)
+
+	return None
+
+#-
+def _readExr(file: BinaryIO, header: bytes) -> tuple | None:
+	# attributes: name \0 type \0 size value, the header ends with an empty name
+	if len(header) == HEADER_READ_SIZE:
+		header += file.read(MAX_HEADER_SIZE - HEADER_READ_SIZE)
+
+	(width, height, channelBits) = (None, None, [])
+	position = 8
+	while header[position] != 0:
+		nameEnd = header.index(b'\x00', position)
+		typeEnd = header.index(b'\x00', nameEnd + 1)
+		attributeName = header[position:nameEnd]
+		(size,) = struct.unpack_from('<i', header, typeEnd + 1)
+		valueStart = typeEnd + 5
+		# a corrupted size would move backwards forever, or past the header
+		if size < 0 or valueStart + size > len(header):
+			return None
+
+		if attributeName == b'dataWindow':
+			(xMin, yMin, xMax, yMax) = struct.unpack_from('<iiii', header, valueStart)
+			(width, height) = (xMax - xMin + 1, yMax - yMin + 1)
+		elif attributeName == b'channels':
+			# name \0 pixel type, linear, reserved, x sampling, y sampling, ends with an empty name
+			channelPosition = valueStart
+			while header[channelPosition] != 0:
+				channelNameEnd = header.index(b'\x00', channelPosition)
+				(pixelType,) = struct.unpack_from('<i', header, channelNameEnd + 1)
+				channelBits.append(_EXR_PIXEL_BITS.get(pixelType, 32))
+				channelPosition = channelNameEnd + 17
+
+		position = valueStart + size
+
+	if width == None:
+		return None
+	colorType = {1: 'gray', 3: 'RGB', 4: 'RGBA'}.get(len(channelBits), 'multichannel')
+	return ('exr', width, height, max(channelBits, default=None), len(channelBits), colorType)
+
+#-
+def _readTiff(file: BinaryIO, header: bytes) -> tuple | None:
+	byteOrder = '<' if header.startswith(b'II') else '>'
+	(ifdOffset,) = struct.unpack_from(f'{byteOrder}I', header, 4)
+	file.seek(ifdOffset)
+	(entryCount,) = struct.unpack(f'{byteOrder}H', file.read(2))
+	entries = file.read(entryCount * 12)
+
+	# tag -> (type, count, raw value)
+	tags = {}
+	for i in range(entryCount):
+		(tag, valueType, count, rawValue) = struct.unpack_from(f'{byteOrder}HHI4s', entries, i * 12)
+		tags[tag] = (valueType, count, rawValue)
+
+	# sub function
+	@staticmethod
+	def _getValue(tag: int, default: int | None) -> int | None:
+		if tag not in tags:
+			return default
+		(valueType, count, rawValue) = tags[tag]
+		# short (3) or long (4)
+		valueFormat = 'H' if valueType == 3 else 'I'
+		if count * struct.calcsize(valueFormat) > 4:
+			# stored elsewhere, only the first value is needed
+			(offset,) = struct.unpack(f'{byteOrder}I', rawValue)
+			file.seek(offset)
+			rawValue = file.read(4)
+		return struct.unpack_from(f'{byteOrder}{valueFormat}', rawValue)[0]
+
+	# main function
+	width = _getValue(256, None)
+	height = _getValue(257, None)
+	if width == None or height == None:
+		return None
+	channels = _getValue(277, 1)
+	colorType = _TIFF_PHOTOMETRIC.get(_getValue(262, None), 'unknown')
+	if colorType == 'RGB' and channels == 4:
+		colorType = 'RGBA'
+	return ('tiff', width, height, _getValue(258, 1), channels, colorType)
+
+#-
+def _readDds(header: bytes) -> tuple | None:
+	# magic, header size, flags, height, width
+	(height, width) = struct.unpack_from('<II', header, 12)
+	# pixel format: size, flags, four cc, rgb bit count, masks
+	(pixelFlags, fourCC, bitCount, _, _, _, alphaMask) = struct.unpack_from('<I4sIIIII', header, 80)
+	# DDPF_FOURCC, block compressed
+	if pixelFlags & 0x4:
+		return ('dds', width, height, None, None, fourCC.decode('ascii', 'replace').strip('\x00 '))
+	# DDPF_ALPHAPIXELS
+	channels = 4 if pixelFlags & 0x1 and alphaMask != 0 else 3
+	return ('dds', width, height, bitCount // channels, channels, 'RGBA' if channels == 4 else 'RGB')
+
+#-
+def _readBmp(header: bytes) -> tuple | None:
+	(width, height, _, bitCount) = struct.unpack_from('<iiHH', header, 18)
+	# negative heights are top down images
+	height = abs(height)
+	if bitCount <= 8:
+		return ('bmp', width, height, bitCount, 1, 'indexed')
+	channels = 4 if bitCount == 32 else 3
+	return ('bmp', width, height, bitCount // channels, channels, 'RGBA' if channels == 4 else 'RGB')
+
+#-
+def _readTga(header: bytes) -> tuple | None:
+	(imageType,) = struct.unpack_from('<B', header, 2)
+	(width, height, pixelDepth) = struct.unpack_from('<HHB', header, 12)
+	# +8 is the rle compressed variant
+	baseType = imageType & ~0x8
+	if baseType == 1:
+		return ('tga', width, height, pixelDepth, 1, 'indexed')
+	if baseType == 3:
+		return ('tga', width, height, pixelDepth, 1, 'gray')
+	if baseType == 2:
+		channels = 4 if pixelDepth == 32 else 3
+		return ('tga', width, height, pixelDepth // channels, channels, 'RGBA' if channels == 4 else 'RGB')
+	return None
+
+#-
+def _isPowerOfTwo(value: int) -> bool:
+	return value > 0 and value & (value - 1) == 0
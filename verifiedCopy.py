@@ -0,0 +1,183 @@
+import platform
+import hashlib
+import shutil
+import json
+import time
+import os
+
+from imageStages import StageJob
+from copyConcurrency import CopyConcurrencyController
+
+# import type defs
+from concurrent.futures import CancelledError, Executor
+from threading import Event
+from collections.abc import Iterable
+from typing import BinaryIO, Callable
+from os import PathLike
+
+# digest of the manifests, same as sha256sum's
+DIGEST_ALGORITHM = 'sha256'
+# read and written in chunks of this size, hashlib releases the gil for chunks this large
+CHUNK_SIZE = 1024 * 1024
+# linux ioctl cloning a file's extents, see ioctl_ficlone(2)
+_FICLONE = 0x40049409
+
+#---------------------------------------------------------------------------------------------------
+class CopyVerificationError(Exception):
+	""" the copy does not hold the same data as its source. """
+
+#---------------------------------------------------------------------------------------------------
+class HashingWriter():
+	""" binary file wrapper computing the digest of everything written through it, ex: files rewritten rather than copied. \n
+	only write is forwarded, the output is expected to be written sequentially.
+	"""
+
+	def __init__(self, file: BinaryIO) -> None:
+		self.file = file
+		self.hasher = hashlib.new(DIGEST_ALGORITHM)
+		self.byteCount = 0
+
+#---
+	def write(self, data: bytes) -> int:
+		self.hasher.update(data)
+		self.byteCount += len(data)
+		return self.file.write(data)
+
+#-
+	def getReport(self, method: str) -> dict:
+		""" same format as the reports of copyAndVerify, see writeManifest. """
+		return {'digest': self.hasher.hexdigest(), 'bytes': self.byteCount, 'method': method}
+
+#---------------------------------------------------------------------------------------------------
+def dispatchVerifiedCopy(executor: Executor, inputPath: PathLike[str] | str, fileNames: Iterable[str], outputPath: PathLike[str] | str, onComplete: Callable[[dict, dict], None] | None = None, cancelEvent: Event | None = None, controller: CopyConcurrencyController | None = None) -> StageJob:
+	""" copies every file on the executor with copyAndVerify, as a single job. \n
+	onComplete - see StageJob, results are the reports of copyAndVerify \n
+	cancelEvent - see copyAndVerify \n
+	controller - limits the copies in flight, the executor's workers wait for a slot, it then needs more workers than the controller's maximum limit
+	"""
+
+	# sub function
+	@staticmethod
+	def _controlledCopy(sourcePath: str, outputPath: str) -> dict:
+		controller.acquire(cancelEvent)
+		byteCount = 0
+		try:
+			report = copyAndVerify(sourcePath, outputPath, cancelEvent)
+			byteCount = report['bytes']
+			return report
+		finally:
+			controller.release(byteCount)
+
+	# main function
+	os.makedirs(outputPath, exist_ok=True)
+	tasks = {}
+	for fileName in fileNames:
+		if controller != None:
+			tasks[executor.submit(_controlledCopy, os.path.join(inputPath, fileName), os.path.join(outputPath, fileName))] = fileName
+		else:
+			tasks[executor.submit(copyAndVerify, os.path.join(inputPath, fileName), os.path.join(outputPath, fileName), cancelEvent)] = fileName
+
+	return StageJob('copy', inputPath, outputPath, tasks, onComplete)
+
+#-
+def copyAndVerify(sourcePath: PathLike[str] | str, outputPath: PathLike[str] | str, cancelEvent: Event | None = None) -> dict:
+	""" copies a file while computing its digest, then confirms the copy with a single read of it. \n
+	if the file system supports it (ex: btrfs, xfs) the copy is a reflink sharing the source's data, only the source is read and the copy is trusted. \n
+	NOTE: the confirmation read usually hits the os cache, it catches corruption between the source read and the os, not on the disk itself \n
+	raises CopyVerificationError if the digests differ, the destination is then left untouched. \n
+	cancelEvent - once set, the copy stops at the next chunk and raises CancelledError, the destination is left untouched \n
+	returns {'digest', 'bytes', 'method': 'copy' or 'reflink'}
+	"""
+	# written to a temp file then renamed, a failed or interrupted copy never replaces the destination
+	tempPath = f'{outputPath}.tmp'
+	try:
+		# opened for reading too, the copy is read back without opening it again
+		with open(sourcePath, 'rb') as source, open(tempPath, 'w+b') as output:
+			if _tryReflink(source, output):
+				method = 'reflink'
+				(digest, byteCount) = hashFile(source)
+			else:
+				method = 'copy'
+				(digest, byteCount) = _copyAndHash(source, output, cancelEvent)
+
+				output.flush()
+				output.seek(0)
+				(outputDigest, outputByteCount) = hashFile(output)
+				if outputDigest != digest or outputByteCount != byteCount:
+					raise CopyVerificationError(f'digest mismatch for {os.path.basename(sourcePath)}: read {digest}, wrote {outputDigest}')
+
+		# same as robocopy /copy:DA, data and attributes (ie: permissions, timestamps)
+		shutil.copystat(sourcePath, tempPath)
+		os.replace(tempPath, outputPath)
+	finally:
+		if os.path.exists(tempPath):
+			os.remove(tempPath)
+
+	return {'digest': digest, 'bytes': byteCount, 'method': method}
+
+#-
+def hashFile(file: BinaryIO) -> tuple[str, int]:
+	""" (hex digest, byte count) of a file opened in binary mode. """
+	hasher = hashlib.new(DIGEST_ALGORITHM)
+	buffer = bytearray(CHUNK_SIZE)
+	view = memoryview(buffer)
+	byteCount = 0
+	while True:
+		readCount = file.readinto(buffer)
+		if readCount == 0:
+			break
+		hasher.update(view[:readCount])
+		byteCount += readCount
+	return (hasher.hexdigest(), byteCount)
+
+#-
+def writeManifest(manifestPath: PathLike[str] | str, preset: str, files: dict[str, dict], failures: dict[str, str]) -> None:
+	""" writes a preset's manifest, ie: the digest of every exported file. \n
+	files - export path relative to the preset dir -> see copyAndVerify, 'method' being the job that wrote the file for files not copied (ex: 'rewritePaths', 'mipmaps') \n
+	failures - export path relative to the preset dir -> error
+	"""
+	manifest = {
+		'preset': preset,
+		'algorithm': DIGEST_ALGORITHM,
+		'writtenAt': time.time(),
+		'files': dict(sorted(files.items())),
+		'failures': dict(sorted(failures.items())),
+	}
+
+	# written to a temp file then renamed, an interrupted write never corrupts the manifest
+	os.makedirs(os.path.dirname(manifestPath), exist_ok=True)
+	tempPath = f'{manifestPath}.tmp'
+	with open(tempPath, 'w') as file:
+		json.dump(manifest, file, indent=2)
+	os.replace(tempPath, manifestPath)
+
+#---------------------------------------------------------------------------------------------------
+def _copyAndHash(source: BinaryIO, output: BinaryIO, cancelEvent: Event | None = None) -> tuple[str, int]:
+	""" single pass over the source, each chunk is hashed then written. """
+	hasher = hashlib.new(DIGEST_ALGORITHM)
+	buffer = bytearray(CHUNK_SIZE)
+	view = memoryview(buffer)
+	byteCount = 0
+	while True:
+		if cancelEvent != None and cancelEvent.is_set():
+			raise CancelledError(f'copy of {os.path.basename(source.name)} cancelled')
+		readCount = source.readinto(buffer)
+		if readCount == 0:
+			break
+		hasher.update(view[:readCount])
+		output.write(view[:readCount])
+		byteCount += readCount
+	return (hasher.hexdigest(), byteCount)
+
+#-
+def _tryReflink(source: BinaryIO, output: BinaryIO) -> bool:
+	""" clones the source's data into the output, returns False if unsupported (ex: ext4, tmpfs, cross device). """
+	if platform.system() != 'Linux':
+		return False
+
+	import fcntl
+	try:
+		fcntl.ioctl(output.fileno(), _FICLONE, source.fileno())
+		return True
+	except OSError:
+		return False
@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+import struct
+import os
+
+from fileDataClasses import FileDataBaseClass, FileCollection
+
+# import type defs
+from collections.abc import Iterator
+from typing import BinaryIO, TextIO
+from os import PathLike
+
+# the moov box only holds the sample tables, far larger means a corrupted size
+MAX_MOOV_SIZE = 256 * 1024 * 1024
+# containers of the boxes needed, every other box is skipped
+_CONTAINER_BOXES = {b'trak', b'mdia', b'minf', b'stbl'}
+
+#---------------------------------------------------------------------------------------------------
+@dataclass(slots = True)
+class VideoMetadata(FileDataBaseClass):
+	""" video properties read from an mp4/mov container's moov box. \n
+
+	name - file name, ex: 'turntable.mp4' \n
+	format - container format, ex: 'mp4' \n
+	duration - in seconds \n
+	width, height - display size of the video track, in pixels \n
+	fps - average frame rate, None if unknown \n
+	codec - sample entry fourcc of the video track, ex: 'avc1', 'hvc1' \n
+	fileSize, mtimeNs - of the file when read, used to detect changes \n
+	"""
+
+	format: str
+	duration: float
+	width: int
+	height: int
+	fps: float | None
+	codec: str
+	fileSize: int
+	mtimeNs: int
+
+#---------------------------------------------------------------------------------------------------
+def readVideoMetadata(path: PathLike[str] | str) -> VideoMetadata | None:
+	""" reads the properties of an mp4/mov video from its moov box, no frame is decoded. \n
+	only the top level box headers are read until the moov box, which may be before or after the media data. \n
+	returns None if the file has no valid moov box or no video track.
+	"""
+	fileStat = os.stat(path)
+	with open(path, 'rb') as file:
+		moov = _readTopLevelBox(file, fileStat.st_size, b'moov')
+	if moov == None:
+		return None
+
+	try:
+		properties = _parseMoov(moov)
+	except (struct.error, ValueError, IndexError):
+		# truncated or corrupted moov
+		properties = None
+	if properties == None:
+		return None
+
+	(duration, width, height, fps, codec) = properties
+	return VideoMetadata(os.path.basename(path), 'mp4', duration, width, height, fps, codec, fileStat.st_size, fileStat.st_mtime_ns)
+
+#-
+def writeVideoStats(collection: FileCollection, file: TextIO) -> None:
+	""" writes a video section to a stats file, from the metadata already read by textureMetadata.readCollectionMetadata. """
+	file.write('Videos:\n')
+	for fileName in collection.files:
+		videoMetadata = collection.metadata.get(fileName)
+		if videoMetadata == None:
+			file.write(f'  {fileName}: unreadable\n')
+		else:
+			fps = f'{videoMetadata.fps:.3f} fps' if videoMetadata.fps != None else 'unknown fps'
+			file.write(f'  {fileName}: {videoMetadata.width}x{videoMetadata.height}, {videoMetadata.duration:.2f} s, {fps}, {videoMetadata.codec}\n')
+	file.write('\n')
+	file.write(f'Video count: {len(collection.files)}\n')
+	file.write('\n')
+
+#---------------------------------------------------------------------------------------------------
+def _readTopLevelBox(file: BinaryIO, fileSize: int, boxType: bytes) -> bytes | None:
+	""" payload of the first top level box of a given type, every other box is skipped without being read. """
+	offset = 0
+	while offset + 8 <= fileSize:
+		file.seek(offset)
+		header = file.read(8)
+		if len(header) != 8:
+			return None
+		(size, currentType) = struct.unpack('>I4s', header)
+		headerSize = 8
+
+		if size == 1:
+			# 64 bit size
+			largeSize = file.read(8)
+			if len(largeSize) != 8:
+				return None
+			(size,) = struct.unpack('>Q', largeSize)
+			headerSize = 16
+		elif size == 0:
+			# extends to the end of the file
+			size = fileSize - offset
+		if size < headerSize:
+			return None
+
+		if currentType == boxType:
+			if size > MAX_MOOV_SIZE:
+				return None
+			payload = file.read(size - headerSize)
+			return payload if len(payload) == size - headerSize else None
+		offset += size
+
+	return None
+
+#-
+def _iterBoxes(data: bytes, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+	""" yields (type, payload start, payload end) of the boxes in data[start:end]. """
+	while start + 8 <= end:
+		(size, boxType) = struct.unpack_from('>I4s', data, start)
+		headerSize = 8
+		if size == 1:
+			(size,) = struct.unpack_from('>Q', data, start + 8)
+			headerSize = 16
+		elif size == 0:
+			size = end - start
+		if size < headerSize or start + size > end:
+			return
+		yield (boxType, start + headerSize, start + size)
+		start += size
+
+#-
+def _findBoxes(data: bytes, start: int, end: int, boxes: dict) -> None:
+	""" collects the payload ranges of the boxes in data, descending into _CONTAINER_BOXES. \n
+	boxes - type -> [(payload start, payload end), ...], filled in place
+	"""
+	for (boxType, payloadStart, payloadEnd) in _iterBoxes(data, start, end):
+		boxes.setdefault(boxType, []).append((payloadStart, payloadEnd))
+		if boxType in _CONTAINER_BOXES:
+			_findBoxes(data, payloadStart, payloadEnd, boxes)
+
+#-
+def _readTimes(data: bytes, start: int) -> tuple[int, int]:
+	""" (timescale, duration) of a mvhd or mdhd box. """
+	if data[start] == 1:
+		# version, flags, 64 bit creation and modification times
+		return struct.unpack_from('>IQ', data, start + 20)
+	return struct.unpack_from('>II', data, start + 12)
+
+#-
+def _parseMoov(moov: bytes) -> tuple | None:
+	""" returns (duration, width, height, fps, codec) of the first video track. """
+	duration = None
+	for (boxType, start, _) in _iterBoxes(moov, 0, len(moov)):
+		if boxType == b'mvhd':
+			(timescale, movieDuration) = _readTimes(moov, start)
+			duration = movieDuration / timescale if timescale != 0 else None
+
+	for (boxType, trackStart, trackEnd) in _iterBoxes(moov, 0, len(moov)):
+		if boxType != b'trak':
+			continue
+
+		boxes = {}
+		_findBoxes(moov, trackStart, trackEnd, boxes)
+		# version, flags, pre defined, handler type
+		if b'hdlr' not in boxes or moov[boxes[b'hdlr'][0][0] + 8:boxes[b'hdlr'][0][0] + 12] != b'vide':
+			continue
+
+		# display size, 16.16 fixed point, the last 8 bytes of tkhd
+		(width, height) = (0, 0)
+		if b'tkhd' in boxes:
+			(width, height) = (value >> 16 for value in struct.unpack_from('>II', moov, boxes[b'tkhd'][0][1] - 8))
+
+		# first sample entry: version, flags, entry count, size, format
+		codec = 'unknown'
+		if b'stsd' in boxes:
+			stsdStart = boxes[b'stsd'][0][0]
+			codec = moov[stsdStart + 12:stsdStart + 16].decode('ascii', 'replace')
+			if width == 0 or height == 0:
+				# visual sample entry: reserved, data reference index, pre defined, width, height
+				(width, height) = struct.unpack_from('>HH', moov, stsdStart + 16 + 24)
+
+		# average frame rate from the sample durations
+		fps = None
+		if b'mdhd' in boxes and b'stts' in boxes:
+			(mediaTimescale, mediaDuration) = _readTimes(moov, boxes[b'mdhd'][0][0])
+			sttsStart = boxes[b'stts'][0][0]
+			(entryCount,) = struct.unpack_from('>I', moov, sttsStart + 4)
+			(sampleCount, totalDelta) = (0, 0)
+			for i in range(entryCount):
+				(count, delta) = struct.unpack_from('>II', moov, sttsStart + 8 + i * 8)
+				sampleCount += count
+				totalDelta += count * delta
+			if totalDelta != 0:
+				fps = sampleCount * mediaTimescale / totalDelta
+			if duration == None and mediaTimescale != 0:
+				duration = mediaDuration / mediaTimescale
+
+		return (duration or 0.0, width, height, fps, codec)
+
+	return None
@@ -0,0 +1,389 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import threading
+import platform
+import select
+import struct
+import json
+import time
+import sys
+import os
+
+from fileManager import FileManager
+from fileDataClasses import FileCollection
+from textureMetadata import analyzeTextures
+from headless import buildValidationReport, DIR_SETTINGS_PATH, PRESET_SETTINGS_PATH, EXIT_SUCCESS, EXIT_ERROR
+import metrics
+
+# import type defs
+from collections.abc import Iterable
+from os import PathLike
+
+# NOTE: like headless, this module must not import customtkinter, PIL or anything importing them
+
+# time without changes after an event before revalidating, saving a file usually fires several events
+DEBOUNCE_TIME = 0.5
+
+#---------------------------------------------------------------------------------------------------
+class _InotifyWatcher():
+	""" reports the watched dirs in which an entry was created, written, moved or deleted, using linux's inotify through ctypes. \n
+	a watched dir that is deleted or moved away loses its watch, it is reported then watched again once a dir exists at its path.
+	"""
+
+	# inotify event masks, see inotify(7)
+	_IN_ATTRIB = 0x004
+	_IN_CLOSE_WRITE = 0x008
+	_IN_MOVED_FROM = 0x040
+	_IN_MOVED_TO = 0x080
+	_IN_CREATE = 0x100
+	_IN_DELETE = 0x200
+	_IN_DELETE_SELF = 0x400
+	_IN_MOVE_SELF = 0x800
+	_IN_Q_OVERFLOW = 0x4000
+	# struct inotify_event: wd, mask, cookie, name length, then the name
+	_EVENT_HEADER = struct.Struct('iIII')
+
+	name = 'inotify'
+
+	def __init__(self, dirPaths: Iterable[str]) -> None:
+		""" raises OSError if inotify is unavailable, ex: not linux or out of watches. """
+		import ctypes
+		import ctypes.util
+
+		if platform.system() != 'Linux':
+			raise OSError('inotify is only available on linux')
+		self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+
+		self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+		if self.fd < 0:
+			raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+		# watch descriptor -> dir path
+		self.watches = {}
+		# dirs deleted or moved away, watched again once they exist, see _rewatchMissingDirs
+		self.missingDirs = set()
+		for dirPath in dirPaths:
+			wd = self._addWatch(dirPath)
+			if wd < 0:
+				errno = ctypes.get_errno()
+				self.close()
+				raise OSError(errno, f'inotify_add_watch failed for {dirPath}')
+
+#---
+	def wait(self, timeout: float) -> set[str]:
+		""" waits up to timeout seconds for events, returns the dirs they occured in. """
+		# recreated dirs may already hold files, they are reported as soon as they are watched
+		changedDirs = self._rewatchMissingDirs()
+		if len(changedDirs) != 0:
+			return changedDirs
+
+		(readable, _, _) = select.select([self.fd], [], [], timeout)
+		if len(readable) == 0:
+			return changedDirs
+
+		try:
+			data = os.read(self.fd, 64 * 1024)
+		except BlockingIOError:
+			return changedDirs
+
+		offset = 0
+		while offset + self._EVENT_HEADER.size <= len(data):
+			(wd, mask, _, nameLength) = self._EVENT_HEADER.unpack_from(data, offset)
+			offset += self._EVENT_HEADER.size + nameLength
+			if mask & self._IN_Q_OVERFLOW:
+				# events were lost, everything may have changed
+				return set(self.watches.values()) | self.missingDirs
+			if wd not in self.watches:
+				# ex: IN_IGNORED following the removal of a watch
+				continue
+			changedDirs.add(self.watches[wd])
+			if mask & (self._IN_DELETE_SELF | self._IN_MOVE_SELF):
+				# a moved dir stays watched at its new path, a deleted one is unwatched by the kernel
+				if mask & self._IN_MOVE_SELF:
+					self.libc.inotify_rm_watch(self.fd, wd)
+				self.missingDirs.add(self.watches.pop(wd))
+		return changedDirs
+
+#-
+	def close(self) -> None:
+		if self.fd >= 0:
+			os.close(self.fd)
+			self.fd = -1
+
+#-
+	def _addWatch(self, dirPath: str) -> int:
+		""" returns the watch descriptor, negative on failure. """
+		mask = self._IN_ATTRIB | self._IN_CLOSE_WRITE | self._IN_MOVED_FROM | self._IN_MOVED_TO | self._IN_CREATE | self._IN_DELETE | self._IN_DELETE_SELF | self._IN_MOVE_SELF
+		wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirPath), mask)
+		if wd >= 0:
+			self.watches[wd] = dirPath
+		return wd
+
+#-
+	def _rewatchMissingDirs(self) -> set[str]:
+		""" watches the missing dirs that exist again, returns them. """
+		rewatchedDirs = {dirPath for dirPath in self.missingDirs if os.path.isdir(dirPath) and self._addWatch(dirPath) >= 0}
+		self.missingDirs -= rewatchedDirs
+		return rewatchedDirs
+
+#-
+class _PollingWatcher():
+	""" reports the watched dirs whose entries changed (name, size or mtime) by rescanning them periodically. """
+
+	name = 'polling'
+
+	def __init__(self, dirPaths: Iterable[str], interval: float = 2.0) -> None:
+		self.interval = interval
+		self.snapshots = {dirPath: self._snapshot(dirPath) for dirPath in dirPaths}
+		self.nextPollTime = time.monotonic() + interval
+
+#---
+	def wait(self, timeout: float) -> set[str]:
+		""" waits up to timeout seconds, returns the dirs that changed if a poll was due. """
+		remainingTime = self.nextPollTime - time.monotonic()
+		if remainingTime > timeout:
+			time.sleep(timeout)
+			return set()
+		time.sleep(max(0.0, remainingTime))
+		self.nextPollTime = time.monotonic() + self.interval
+
+		changedDirs = set()
+		for (dirPath, previous) in self.snapshots.items():
+			current = self._snapshot(dirPath)
+			if current != previous:
+				self.snapshots[dirPath] = current
+				changedDirs.add(dirPath)
+		return changedDirs
+
+#-
+	def close(self) -> None:
+		pass
+
+#-
+	@staticmethod
+	def _snapshot(dirPath: str) -> frozenset:
+		try:
+			with os.scandir(dirPath) as entries:
+				return frozenset((entry.name, entryStat.st_size, entryStat.st_mtime_ns) for entry in entries for entryStat in (entry.stat(),))
+		except OSError:
+			# ex: dir removed
+			return frozenset()
+
+#-
+def createWatcher(dirPaths: Iterable[str], forcePolling: bool = False, pollInterval: float = 2.0):
+	""" inotify watcher where available, polling watcher otherwise. \n
+	both expose wait(timeout) -> set of changed dirs, close() and name.
+	"""
+	dirPaths = list(dirPaths)
+	if not forcePolling:
+		try:
+			return _InotifyWatcher(dirPaths)
+		except (OSError, AttributeError) as error:
+			# AttributeError: libc without inotify
+			print(f'inotify unavailable ({error}), falling back to polling', file=sys.stderr)
+	return _PollingWatcher(dirPaths, pollInterval)
+
+#---------------------------------------------------------------------------------------------------
+class WatchDaemon():
+	""" watches the input dirs of an asset root, revalidates presets as files change and optionally re-exports them. \n
+	only the collections whose dir changed are rescanned, and only their changed files have their metadata read again. \n
+	the status (see getStatus) is served as json over http on localhost.
+	"""
+
+	def __init__(self, basePath: PathLike[str] | str | None = None, presets: list[str] | None = None, autoExport: bool = False, port: int = 8765, forcePolling: bool = False, pollInterval: float = 2.0, dirSettings: dict | None = None, presetSettings: dict | None = None) -> None:
+		""" presets - names of the presets to validate, all presets if None \n
+		autoExport - export every valid preset after each revalidation \n
+		port - of the status endpoint, bound to 127.0.0.1 only, 0 picks a free port \n
+		dirSettings, presetSettings - already parsed settings, read from the settings dir if None
+		"""
+		self.fileManager = FileManager(basePath or './', DIR_SETTINGS_PATH, PRESET_SETTINGS_PATH, dirSettings, presetSettings)
+		self.presets = presets if presets != None else list(self.fileManager.presets)
+		unknownPresets = [preset for preset in self.presets if preset not in self.fileManager.presets]
+		if len(unknownPresets) != 0:
+			raise ValueError(f'unknown presets: {", ".join(unknownPresets)}')
+
+		self.autoExport = autoExport
+		self.isRunning = False
+		# dir path -> collection
+		self.collections = {}
+		self.fileManager.files.foreachRecursive(lambda collection: self.collections.setdefault(collection.dirPath, collection) if isinstance(collection, FileCollection) else None)
+		self.watcher = createWatcher(self.collections, forcePolling, pollInterval)
+
+		# validation state, replaced as a whole so that the http threads never see a partial update
+		self.revision = 0
+		self.validation = {}
+		self.status = {}
+		# presets waiting for the running export to finish before being exported again
+		self.pendingExports = set()
+		self.lastExportTime = None
+
+		self.server = ThreadingHTTPServer(('127.0.0.1', port), _StatusRequestHandler)
+		self.server.watchDaemon = self
+
+#---
+	def run(self) -> None:
+		""" validates, then watches until stop() is called or interrupted. """
+
+		serverThread = threading.Thread(target=self.server.serve_forever, daemon=True)
+		serverThread.start()
+		print(f'watching {len(self.collections)} dirs ({self.watcher.name}), status on http://127.0.0.1:{self.server.server_address[1]}/status', file=sys.stderr)
+
+		# already scanned by the file manager
+		self.revalidate(())
+		self.isRunning = True
+		try:
+			changedDirs = set()
+			lastChangeTime = 0.0
+			while self.isRunning:
+				newChanges = self.watcher.wait(0.25 if self.fileManager.getActiveJobCount() == 0 else 0.05)
+				if len(newChanges) != 0:
+					changedDirs.update(newChanges)
+					lastChangeTime = time.monotonic()
+				elif len(changedDirs) != 0 and time.monotonic() - lastChangeTime >= DEBOUNCE_TIME:
+					try:
+						self.revalidate(changedDirs)
+					except Exception as error:
+						# ex: a dir removed, the daemon keeps watching and reports the error until the next successful validation
+						self.validation = {**self.validation, 'error': f'{type(error).__name__}: {error}'}
+						self._updateStatus()
+						print(f'revalidation failed: {type(error).__name__}: {error}', file=sys.stderr)
+					changedDirs = set()
+
+				self._updateExports()
+		except KeyboardInterrupt:
+			pass
+		finally:
+			self.close()
+
+#-
+	def stop(self) -> None:
+		self.isRunning = False
+
+#-
+	def close(self) -> None:
+		self.server.shutdown()
+		self.server.server_close()
+		self.watcher.close()
+		self.fileManager.shutdownImageStages()
+
+#-
+	def revalidate(self, changedDirs: Iterable[str]) -> None:
+		""" rescans the changed collections and rebuilds the validation reports of every preset. """
+		with metrics.span('revalidate') as revalidateSpan:
+			changedCollections = [self.collections[dirPath] for dirPath in changedDirs if dirPath in self.collections]
+			for collection in changedCollections:
+				self.fileManager.scanCollection(collection)
+
+			# only changed files are read again, everything is read on the first validation
+			textureCollection = self.fileManager.files.resolve('texs')
+			if textureCollection in changedCollections or self.revision == 0:
+				self.fileManager.loadTextureMetadata()
+			videoCollection = self.fileManager.files.resolve('vids')
+			if videoCollection in changedCollections or self.revision == 0:
+				self.fileManager.loadVideoMetadata()
+
+			reports = {preset: buildValidationReport(self.fileManager.getPresetFileData(preset)) for preset in self.presets}
+			validation = {
+				'revision': self.revision + 1,
+				'validatedAt': time.time(),
+				'changedDirs': sorted(collection.dirPath for collection in changedCollections),
+				'valid': all(report['valid'] for report in reports.values()),
+				'presets': reports,
+			}
+			if isinstance(textureCollection, FileCollection):
+				validation['textures'] = analyzeTextures((textureCollection.metadata.get(fileName) for fileName in textureCollection.files), self.fileManager.getRequiredSuffixes('texs', self.presets))
+			revalidateSpan.set(collections=len(changedCollections))
+
+		self.validation = validation
+		self.revision += 1
+
+		summary = ', '.join(f'{preset}: {"valid" if report["valid"] else "invalid"}' for (preset, report) in reports.items())
+		print(f'revision {self.revision}: {summary}', file=sys.stderr)
+
+		if self.autoExport:
+			self.pendingExports.update(preset for (preset, report) in reports.items() if report['valid'])
+		self._updateStatus()
+
+#-
+	def getStatus(self) -> dict:
+		""" latest validation state and export progress. """
+		return self.status
+
+#---
+	def _updateExports(self) -> None:
+		""" polls the running export, and starts the pending one once it is done. """
+		if self.fileManager.getActiveJobCount() != 0:
+			if self.fileManager.pollFinishedJobs(noStdOut=True) == 0:
+				self.lastExportTime = time.time()
+			self._updateStatus()
+			return
+
+		if len(self.pendingExports) != 0:
+			self.fileManager.clearJobResults()
+			# resumed from the previous export, only the files changed since are written again and the outputs of deleted files are deleted
+			for preset in self.pendingExports:
+				self.fileManager.exportFiles(preset, resume=True, prune=True)
+			self.pendingExports.clear()
+			self._updateStatus()
+
+#-
+	def _updateStatus(self) -> None:
+		activeJobCount = self.fileManager.getActiveJobCount()
+		self.status = {
+			'basePath': os.path.abspath(self.fileManager.basePath),
+			'watcher': self.watcher.name,
+			**self.validation,
+			'export': {
+				'autoExport': self.autoExport,
+				'active': activeJobCount != 0,
+				'activeJobs': activeJobCount,
+				'progress': self.fileManager.getExportProgress() if activeJobCount != 0 else None,
+				'bytes': self.fileManager.exportByteCount,
+				'succeeded': len(self.fileManager.successfullJobs),
+				'failed': len(self.fileManager.failedJobs),
+				'resumedFiles': dict(self.fileManager.resumedFiles),
+				'prunedFiles': dict(self.fileManager.prunedFiles),
+				'pending': sorted(self.pendingExports),
+				'lastExportAt': self.lastExportTime,
+			},
+		}
+
+#---------------------------------------------------------------------------------------------------
+class _StatusRequestHandler(BaseHTTPRequestHandler):
+	""" GET /status -> the daemon's status, GET /presets/<name> -> the validation report of a preset. """
+
+	def do_GET(self) -> None:
+		status = self.server.watchDaemon.getStatus()
+		path = self.path.split('?', 1)[0].rstrip('/')
+
+		if path in ('', '/status'):
+			self._sendJson(200, status)
+		elif path.startswith('/presets/') and path[len('/presets/'):] in status.get('presets', {}):
+			self._sendJson(200, status['presets'][path[len('/presets/'):]])
+		else:
+			self._sendJson(404, {'error': f'not found: {self.path}'})
+
+#-
+	def _sendJson(self, code: int, data: dict) -> None:
+		body = json.dumps(data, indent=2).encode('utf-8')
+		self.send_response(code)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+#-
+	def log_message(self, format: str, *args) -> None:
+		# polled by dashboards, one line per request would drown the revalidation output
+		pass
+
+#---------------------------------------------------------------------------------------------------
+def runWatch(basePath: PathLike[str] | str | None = None, presets: list[str] | None = None, autoExport: bool = False, port: int = 8765, forcePolling: bool = False, pollInterval: float = 2.0) -> int:
+	""" runs the watch daemon until interrupted, returns the exit code. """
+	try:
+		daemon = WatchDaemon(basePath, presets, autoExport, port, forcePolling, pollInterval)
+	except Exception as error:
+		print(f'{type(error).__name__}: {error}', file=sys.stderr)
+		return EXIT_ERROR
+
+	daemon.run()
+	return EXIT_SUCCESS